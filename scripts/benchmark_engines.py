@@ -0,0 +1,165 @@
+"""Benchmark the requests/sec per core of the Locust HTTP engines.
+
+Runs the same headless, single-process workload once per engine and divides the number
+of requests by the CPU time the load generator used (the CLI and Locust processes), so
+the result does not depend on how fast the API answers. Without --api-address, an
+in-memory stub API is started.
+
+    python scripts/benchmark_engines.py --users 50 --run-time 30s
+"""
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import click
+
+ENGINES = ["requests", "fast"]
+STUB_ADDRESS = "http://127.0.0.1:8090"
+
+
+def cli_command(*args: str) -> list:
+    """Return a stac-api-load-testing command run by this interpreter."""
+    return [sys.executable, "-m", "stac_api_load_testing.cli", *args]
+
+
+def wait_for_port(api_address: str, timeout: float = 30):
+    """Wait until the API accepts connections."""
+    address = urlsplit(api_address)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((address.hostname, address.port or 80), 1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def children_cpu_time() -> float:
+    """Return the CPU time, in seconds, used by the waited for child processes."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_engine(engine: str, api_address: str, locust_args: list, prefix: str) -> dict:
+    """
+    Run the workload with one engine.
+
+    Returns:
+        dict: The request count, RPS, load generator CPU time and requests per CPU second.
+    """
+    cpu_before = children_cpu_time()
+    subprocess.run(
+        cli_command(
+            "--locust",
+            "--api-address",
+            api_address,
+            "--workers",
+            "0",
+            "--engine",
+            engine,
+            "--results-prefix",
+            prefix,
+            *locust_args,
+        ),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    cpu_time = children_cpu_time() - cpu_before
+    with open(f"{prefix}.json") as file:
+        aggregated = json.load(file)["endpoints"][-1]
+    return {
+        "engine": engine,
+        "requests": aggregated["num_requests"],
+        "failures": aggregated["num_failures"],
+        "rps": aggregated["rps"],
+        "cpu_seconds": round(cpu_time, 2),
+        "requests_per_core_second": round(aggregated["num_requests"] / cpu_time, 1),
+    }
+
+
+@click.command()
+@click.option(
+    "--api-address",
+    default=None,
+    help="STAC API to load, an in-memory stub API on port 8090 by default.",
+)
+@click.option("--users", default=50, help="Number of Locust users.", type=int)
+@click.option("--run-time", default="30s", help="Duration of each run.")
+@click.option("--tags", default=None, help="Comma-separated task tags to run.")
+@click.option(
+    "--engine",
+    "engines",
+    multiple=True,
+    type=click.Choice(ENGINES),
+    help="Engine to benchmark, repeatable. Both by default.",
+)
+@click.option(
+    "--output", default=None, help="Also write the results to this JSON file."
+)
+def main(api_address, users, run_time, tags, engines, output):
+    """Compare the requests/sec per core of the Locust HTTP engines."""
+    stub = None
+    if api_address is None:
+        api_address = STUB_ADDRESS
+        # Its CPU time only adds to the children's once it is reaped, after the runs
+        stub = subprocess.Popen(
+            cli_command("--stub-server", "--api-address", api_address),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        wait_for_port(api_address)
+
+    locust_args = [
+        "--headless",
+        "--users",
+        str(users),
+        "--spawn-rate",
+        str(users),
+        "--run-time",
+        run_time,
+    ]
+    if tags:
+        locust_args += ["--tags", tags]
+
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for engine in engines or ENGINES:
+                click.secho(f"Running {engine} engine for {run_time}", fg="green")
+                rows.append(
+                    run_engine(
+                        engine,
+                        api_address,
+                        locust_args,
+                        os.path.join(directory, engine),
+                    )
+                )
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+    click.echo(
+        f"{'engine':<10}{'requests':>10}{'failures':>10}{'rps':>10}{'cpu s':>8}{'req/core-s':>12}"
+    )
+    for row in rows:
+        click.echo(
+            f"{row['engine']:<10}{row['requests']:>10}{row['failures']:>10}{row['rps']:>10}"
+            + f"{row['cpu_seconds']:>8}{row['requests_per_core_second']:>12}"
+        )
+    if output:
+        with open(output, "w") as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
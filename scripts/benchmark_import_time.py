@@ -0,0 +1,110 @@
+"""Benchmark the cold-start time of the CLI and guard it against heavy imports.
+
+Imports the CLI module (and runs `--help`) in fresh interpreters, reports the median
+wall time and the slowest imports from `python -X importtime`, and exits non-zero if a
+heavy module is imported on the CLI path or, with --max-ms, if the median is too slow.
+Locust workers, which import the CLI's dependencies through the locustfile, are not
+covered.
+
+    python scripts/benchmark_import_time.py --runs 10 --max-ms 250
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+# Modules only imported by the modes that need them
+HEAVY_MODULES = [
+    "pkg_resources",
+    "yaml",
+    "requests",
+    "gevent",
+    "locust",
+    "hdrh",
+    "stac_api_load_testing.stub_server",
+    "stac_api_load_testing.workload.scenario",
+]
+IMPORT_CLI = "import stac_api_load_testing.cli"
+
+
+def run_time(args: list) -> float:
+    """Return the wall time of a fresh interpreter running `args`, in milliseconds."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def import_times() -> list:
+    """
+    Return the cumulative import time of each module imported by the CLI.
+
+    Returns:
+        list: `(microseconds, module)` pairs, slowest first.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_CLI],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times.append((int(cumulative), module.strip()))
+    return sorted(times, reverse=True)
+
+
+@click.command()
+@click.option(
+    "--runs", default=10, help="Number of fresh interpreters timed.", type=int
+)
+@click.option(
+    "--max-ms",
+    default=None,
+    help="Fail if the median time of the CLI import exceeds this, in milliseconds.",
+    type=float,
+)
+@click.option("--top", default=15, help="Number of slowest imports listed.", type=int)
+def main(runs, max_ms, top):
+    """Report and guard the cold-start time of the stac-api-load-testing CLI."""
+    baseline = statistics.median(run_time(["-c", "pass"]) for _ in range(runs))
+    cli_import = statistics.median(run_time(["-c", IMPORT_CLI]) for _ in range(runs))
+    cli_help = statistics.median(
+        run_time(["-m", "stac_api_load_testing.cli", "--help"]) for _ in range(runs)
+    )
+    click.echo(f"{'interpreter startup':<24}{baseline:>10.1f} ms")
+    click.echo(f"{'import cli':<24}{cli_import:>10.1f} ms")
+    click.echo(f"{'cli --help':<24}{cli_help:>10.1f} ms")
+
+    times = import_times()
+    click.echo("\nSlowest imports (cumulative, ms):")
+    for microseconds, module in times[:top]:
+        click.echo(f"{microseconds / 1000:>10.1f}  {module}")
+
+    failed = False
+    imported = {module for _, module in times}
+    heavy = [module for module in HEAVY_MODULES if module in imported]
+    if heavy:
+        click.secho(f"Heavy modules imported by the CLI: {', '.join(heavy)}", fg="red")
+        failed = True
+    if max_ms is not None and cli_import > max_ms:
+        click.secho(
+            f"CLI import takes {cli_import:.1f} ms, over {max_ms:g} ms", fg="red"
+        )
+        failed = True
+    if failed:
+        sys.exit(1)
+    click.secho("CLI cold start OK", fg="green")
+
+
+if __name__ == "__main__":
+    main()
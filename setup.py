@@ -15,11 +15,20 @@ setup(
     install_requires=[
         "click>=7.1.2",
         "locust",
-        "setuptools",
         "Cython",
         "bzt",
+        "requests",
+        "hdrhistogram",
     ],
-    packages=["stac_api_load_testing"],
+    packages=[
+        "stac_api_load_testing",
+        "stac_api_load_testing.data_loader",
+        "stac_api_load_testing.workload",
+    ],
+    package_data={
+        "stac_api_load_testing": ["config_files/*"],
+        "stac_api_load_testing.data_loader": ["setup_data/*"],
+    },
     entry_points={
         "console_scripts": ["stac-api-load-testing=stac_api_load_testing.cli:main"]
     },
@@ -31,5 +40,9 @@ setup(
     python_requires=">=3.7",
     extras_require={
         "test": ["pytest"],
+        "backend-stats": ["psycopg[binary]", "pymongo"],
+        "fast": ["orjson"],
+        "zstd": ["zstandard"],
+        "geoparquet": ["stac-geoparquet", "pyarrow"],
     },
 )
@@ -2,15 +2,38 @@
 import os
 import re
 import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import click
-import pkg_resources  # type: ignore
-import yaml  # type: ignore
 
+# Heavier modules (yaml, requests, gevent, hdrh, locust) are imported by the modes and
+# options that need them, so every invocation and worker spawn starts fast
+from . import runner
 from .data_loader import data_loader
+from .resources import locustfile_path, taurus_template_path
+from .workload import compare as comparison
+from .workload.backend_stats import BACKENDS, check_driver
+from .workload.hotspots import DISTRIBUTIONS, TEMPORAL_DISTRIBUTIONS
+from .workload.query_corpus import MAX_LIMIT, build_corpus
+from .workload.replay import REPLAY_MODES
+from .workload.seed_index import get_seed_index
+from .workload.writes import DEFAULT_WRITE_MIX, parse_write_mix
 
+LOAD_PROFILES = ["constant", "step", "ramp", "spike"]
+ENGINES = ["requests", "fast"]
 
-def generate_taurus_config(api_url: str, concurrency: int, ramp_up, iterations) -> str:
+
+def generate_taurus_config(
+    api_url: str,
+    concurrency: int,
+    ramp_up,
+    iterations,
+    workers: int = 0,
+    scenario: Optional[str] = None,
+) -> str:
     """
     Generate a custom Taurus configuration file based on the specified settings.
 
@@ -19,16 +42,15 @@ def generate_taurus_config(api_url: str, concurrency: int, ramp_up, iterations)
         concurrency (int): The number of concurrent users to simulate.
         ramp_up (str): The duration over which to ramp up the load test.
         iterations (int): The total number of iterations to perform.
+        workers (int): The number of Locust workers the Taurus-run master waits for. 0 runs Locust as a single process.
+        scenario (str, optional): The scenario file run instead of the built-in tasks.
 
     Returns:
         str: The path to the generated Taurus configuration file.
     """
-    template_path = pkg_resources.resource_filename(
-        __name__, "config_files/taurus_locust.yml"
-    )
-    locustfile_path = pkg_resources.resource_filename(
-        __name__, "config_files/locustfile.py"
-    )
+    import yaml  # type: ignore
+
+    template_path = taurus_template_path()
 
     safe_api_url = re.sub(r"[^a-zA-Z0-9]+", "_", api_url)
     output_path = f"taurus_config_{safe_api_url}.yml"
@@ -41,8 +63,15 @@ def generate_taurus_config(api_url: str, concurrency: int, ramp_up, iterations)
         config["execution"][0]["concurrency"] = concurrency
         config["execution"][0]["ramp-up"] = ramp_up
         config["execution"][0]["iterations"] = iterations
-        config["scenarios"]["default"]["script"] = locustfile_path
+        if workers > 0:
+            config["execution"][0]["master"] = True
+            config["execution"][0]["workers"] = workers
+        config["scenarios"]["default"]["script"] = locustfile_path()
         config["scenarios"]["default"]["default-address"] = api_url
+        if scenario:
+            config.setdefault("settings", {}).setdefault("env", {})[
+                "STAC_SCENARIO"
+            ] = os.path.abspath(scenario)
 
         with open(output_path, "w") as file:
             yaml.safe_dump(config, file)
@@ -53,6 +82,212 @@ def generate_taurus_config(api_url: str, concurrency: int, ramp_up, iterations)
         return None
 
 
+def build_ingest_options(
+    concurrency: int,
+    batch_size: int,
+    max_retries: int,
+    no_bulk: bool,
+    n_items: Optional[int],
+    n_collections: int,
+    seed: int,
+    items_file: Optional[str],
+    precheck: bool,
+) -> dict:
+    """Return the `load_items` arguments of the ingest options, the checkpoint aside."""
+    return dict(
+        concurrency=concurrency,
+        batch_size=batch_size,
+        max_retries=max_retries,
+        use_bulk=not no_bulk,
+        n_items=n_items,
+        n_collections=n_collections,
+        seed=seed,
+        items_file=items_file,
+        precheck=precheck,
+    )
+
+
+def ingest_items(api_address: str, options: dict, checkpoint: Optional[str] = None):
+    """
+    Load items into a STAC API, resuming from a checkpoint file if it exists.
+
+    Args:
+        api_address (str): The base URL of the STAC API.
+        options (dict): The `load_items` arguments, see `build_ingest_options`.
+        checkpoint (str, optional): The file the progress of the ingest is recorded in.
+    """
+    ingest_checkpoint = None
+    if checkpoint:
+        from .data_loader.checkpoint import IngestCheckpoint, ingest_source
+
+        source = ingest_source(
+            options["n_items"],
+            options["n_collections"],
+            options["seed"],
+            options["items_file"],
+        )
+        ingest_checkpoint = IngestCheckpoint(checkpoint, source)
+        try:
+            resumed = ingest_checkpoint.load()
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--checkpoint")
+        if resumed:
+            click.secho(
+                f"Resuming from {checkpoint}: {ingest_checkpoint.offset} items "
+                f"done, {len(ingest_checkpoint.failed)} failed items retried",
+                fg="yellow",
+            )
+    data_loader.load_items(
+        stac_api_base_url=api_address, checkpoint=ingest_checkpoint, **options
+    )
+
+
+def endpoint_path(path: Optional[str], name: str) -> Optional[str]:
+    """Return the file of an endpoint, e.g. `ingest_pgstac.json` for `ingest.json`."""
+    if not path:
+        return None
+    root, extension = os.path.splitext(path)
+    return f"{root}_{name}{extension}"
+
+
+def run_comparison(
+    endpoints: List[Tuple[str, str]],
+    locust_args: List[str],
+    workers: int,
+    prefix: str,
+    ingest_options: Optional[dict] = None,
+    checkpoint: Optional[str] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Run the same ingest and headless Locust workload against several endpoints, one after another.
+
+    Args:
+        endpoints (list): The (name, URL) of each STAC API to test.
+        locust_args (list): The arguments of the headless Locust runs.
+        workers (int): The number of local Locust worker processes.
+        prefix (str): The path prefix of the results, suffixed with `_{name}` per endpoint.
+        ingest_options (dict, optional): The `load_items` arguments, no ingest if None.
+        checkpoint (str, optional): The ingest checkpoint file, suffixed with `_{name}`
+            per endpoint.
+
+    Returns:
+        dict: The per-endpoint results of each run, keyed by endpoint name.
+    """
+    locust_file_path = locustfile_path()
+    all_results = {}
+    for name, api_address in endpoints:
+        click.secho(f"Testing {name} ({api_address})", fg="green", bold=True)
+        if ingest_options is not None:
+            ingest_items(api_address, ingest_options, endpoint_path(checkpoint, name))
+        os.environ["LOCUST_HOST"] = api_address
+        os.environ["STAC_RESULTS_PREFIX"] = f"{prefix}_{name}"
+        runner.run_locust(
+            locust_file_path, api_address, workers=workers, locust_args=locust_args
+        )
+        results_path = f"{prefix}_{name}.json"
+        if not os.path.exists(results_path):
+            click.secho(f"No results written for {name}", fg="red")
+            continue
+        all_results[name] = comparison.load_results(results_path)
+    return all_results
+
+
+def run_benchmark_suite(
+    endpoints: List[Tuple[str, str]],
+    scenarios: list,
+    locust_args: List[str],
+    workers: int,
+    prefix: str,
+    database,
+    key: Dict[str, str],
+    settings: Dict,
+    ingest_options: Optional[dict] = None,
+    baseline_ref: Optional[str] = None,
+    significance: float = 0.01,
+    tolerance: float = 0.1,
+    checkpoint: Optional[str] = None,
+) -> bool:
+    """
+    Run every benchmark scenario against each endpoint, store the runs and compare them to their baselines.
+
+    Args:
+        endpoints (list): The (name, URL) of each STAC API to test, the name keys the stored runs.
+        scenarios (list): The `BenchmarkScenario`s to run.
+        locust_args (list): The arguments of the headless Locust runs, without tags.
+        workers (int): The number of local Locust worker processes.
+        prefix (str): The path prefix of the results, suffixed with `_{name}_{scenario}`.
+        database (ResultsDatabase): The results database.
+        key (dict): The `version` and `git_sha` the runs are stored under.
+        settings (dict): The load settings, only runs with equal settings are compared.
+        ingest_options (dict, optional): The `load_items` arguments, no ingest if None.
+        baseline_ref (str, optional): The version or git sha of the baseline runs, the latest earlier runs if None.
+        significance (float): The p-value below which a latency shift is significant.
+        tolerance (float): The relative growth of the median latency reported as a regression.
+        checkpoint (str, optional): The ingest checkpoint file, suffixed with `_{name}`
+            per endpoint.
+
+    Returns:
+        bool: True if a scenario regressed against its baseline.
+    """
+    from .workload import benchmark
+
+    locust_file_path = locustfile_path()
+    regressed = False
+    for name, api_address in endpoints:
+        if ingest_options is not None:
+            ingest_items(api_address, ingest_options, endpoint_path(checkpoint, name))
+        os.environ["LOCUST_HOST"] = api_address
+        for scenario in scenarios:
+            click.secho(
+                f"Benchmarking {name} ({api_address}): {scenario.name}, {scenario.description}",
+                fg="green",
+                bold=True,
+            )
+            results_prefix = f"{prefix}_{name}_{scenario.name}"
+            os.environ["STAC_RESULTS_PREFIX"] = results_prefix
+            runner.run_locust(
+                locust_file_path,
+                api_address,
+                workers=workers,
+                locust_args=locust_args + runner.tag_args(",".join(scenario.tags)),
+            )
+            if not os.path.exists(f"{results_prefix}.json"):
+                click.secho(f"No results written for {name} {scenario.name}", fg="red")
+                regressed = True
+                continue
+            run_id = database.add_run(
+                scenario.name,
+                name,
+                key["version"],
+                key["git_sha"],
+                settings,
+                comparison.load_results(f"{results_prefix}.json"),
+                benchmark.load_histograms(f"{results_prefix}_histograms.json"),
+            )
+            baseline = database.find_baseline(
+                run_id, scenario.name, name, settings, baseline_ref
+            )
+            if baseline is None:
+                click.secho(
+                    f"Stored run {run_id}, no baseline for {name} {scenario.name} yet",
+                    fg="yellow",
+                )
+                continue
+            click.echo(
+                f"Run {run_id} against run {baseline.id} ({baseline.version}, "
+                f"{baseline.git_sha[:12]}, {baseline.started}):"
+            )
+            comparisons = benchmark.compare_runs(
+                database.endpoints(run_id),
+                database.endpoints(baseline.id),
+                significance,
+                tolerance,
+            )
+            benchmark.echo_comparisons(comparisons)
+            regressed |= any(c.regressed for c in comparisons)
+    return regressed
+
+
 @click.command()
 @click.option(
     "-i", "--ingest", is_flag=True, help="Ingest sample data into the STAC API."
@@ -66,6 +301,58 @@ def generate_taurus_config(api_url: str, concurrency: int, ramp_up, iterations)
     is_flag=True,
     help="Run the Taurus wrapper for performance testing against the STAC API.",
 )
+@click.option(
+    "--compare",
+    is_flag=True,
+    help="Run the same headless workload against each --endpoint and report them side by side.",
+)
+@click.option(
+    "--benchmark-suite",
+    is_flag=True,
+    help="Run the fixed benchmark scenarios against each --endpoint, store and compare them.",
+)
+@click.option(
+    "--results-db",
+    default="benchmarks.db",
+    help="SQLite database of the benchmark suite runs.",
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--suite-scenarios",
+    default=None,
+    help="Comma-separated benchmark scenarios to run, all by default.",
+)
+@click.option(
+    "--backend-version",
+    default="unknown",
+    help="Version of the benchmarked backend, e.g. 'stac-fastapi-pgstac 3.0.1'.",
+)
+@click.option(
+    "--git-sha",
+    default=None,
+    help="Git commit the benchmark runs are stored under, HEAD of the working directory by default.",
+)
+@click.option(
+    "--baseline-ref",
+    default=None,
+    help="Backend version or git sha of the benchmark baseline, the latest earlier run by default.",
+)
+@click.option(
+    "--significance",
+    default=0.01,
+    type=click.FloatRange(0, 1),
+    help="Mann-Whitney p-value below which a benchmark latency shift is significant.",
+)
+@click.option(
+    "--stub-server",
+    is_flag=True,
+    help="Serve an in-memory stand-in STAC API on the --api-address host and port.",
+)
+@click.option(
+    "--build-query-corpus",
+    is_flag=True,
+    help="Write a seeded search query corpus to the --query-corpus file.",
+)
 @click.option(
     "-c",
     "--concurrency",
@@ -87,15 +374,487 @@ def generate_taurus_config(api_url: str, concurrency: int, ramp_up, iterations)
     default="http://localhost:8080",
     help="Specify the STAC API URL to test against.",
 )
+@click.option(
+    "--endpoint",
+    "endpoints",
+    multiple=True,
+    help="Named STAC API to compare, e.g. 'pgstac=http://localhost:8083'. Repeatable.",
+)
+@click.option(
+    "--baseline",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Comparison JSON of a previous --compare run to check for regressions.",
+)
+@click.option(
+    "--regression-tolerance",
+    default=0.1,
+    help="Relative degradation from the baseline reported as a regression.",
+    type=float,
+)
+@click.option(
+    "--stub-latency",
+    default=0.0,
+    help="Mean latency injected by the stub server, in milliseconds.",
+    type=float,
+)
+@click.option(
+    "--stub-latency-jitter",
+    default=0.0,
+    help="Maximum deviation from the stub server's mean latency, in milliseconds.",
+    type=float,
+)
+@click.option(
+    "--stub-error-rate",
+    default=0.0,
+    help="Fraction of stub server requests failing with a 500.",
+    type=float,
+)
+@click.option(
+    "--stub-processes",
+    default=1,
+    help="Number of stub server processes sharing the listening socket.",
+    type=int,
+)
+@click.option(
+    "--ingest-concurrency",
+    default=8,
+    help="Number of concurrent workers for the ingest option.",
+    type=int,
+)
+@click.option(
+    "--batch-size",
+    default=100,
+    help="Number of items per bulk items request for the ingest option.",
+    type=int,
+)
+@click.option(
+    "--max-retries",
+    default=3,
+    help="Retries on 5xx responses and connection errors for the ingest option.",
+    type=int,
+)
+@click.option(
+    "--no-bulk",
+    is_flag=True,
+    help="Post items one at a time instead of using the bulk items endpoint.",
+)
+@click.option(
+    "--checkpoint",
+    default=None,
+    help="File recording the progress of the ingest option, resumed if it exists.",
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--precheck",
+    is_flag=True,
+    help="Look items up with /search?ids= before posting them when ingesting.",
+)
+@click.option(
+    "--items",
+    "n_items",
+    default=None,
+    help="Number of synthetic items to ingest, or that were ingested when load testing.",
+    type=int,
+)
+@click.option(
+    "--items-file",
+    default=None,
+    help="NDJSON (optionally .gz/.zst), FeatureCollection or stac-geoparquet file of the items to ingest, or that were ingested when load testing.",
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--collections",
+    "n_collections",
+    default=1,
+    help="Number of collections synthetic items are spread across.",
+    type=int,
+)
+@click.option(
+    "--seed",
+    default=0,
+    help="Seed of the synthetic item corpus.",
+    type=int,
+)
+@click.option(
+    "--catalog-ttl",
+    default=300,
+    help="Seconds before load test users refresh their cached collection catalog.",
+    type=int,
+)
+@click.option(
+    "--exclude-setup-stats",
+    is_flag=True,
+    help="Exclude collection catalog requests from the load test stats.",
+)
+@click.option(
+    "--page-limit",
+    default=100,
+    help="Page size of the deep paging tasks.",
+    type=int,
+)
+@click.option(
+    "--max-pages",
+    default=10,
+    help="Deepest page requested by the deep paging tasks.",
+    type=int,
+)
+@click.option(
+    "--max-paged-items",
+    default=1000,
+    help="Items after which the deep paging tasks stop following next links.",
+    type=int,
+)
+@click.option(
+    "--query-corpus",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Query corpus file written by --build-query-corpus, and replayed by the Locust search tasks.",
+)
+@click.option(
+    "--queries",
+    default=100000,
+    help="Number of queries of each kind in the built query corpus.",
+    type=int,
+)
+@click.option(
+    "--query-seed",
+    default=0,
+    help="Seed of the built query corpus, and of the hotspots of --spatial-distribution.",
+    type=int,
+)
+@click.option(
+    "--query-limit",
+    default=10,
+    help="Page size of the queries of the built query corpus.",
+    type=click.IntRange(1, MAX_LIMIT),
+)
+@click.option(
+    "--spatial-distribution",
+    default="uniform",
+    type=click.Choice(DISTRIBUTIONS),
+    help="Distribution of the points and bboxes of the generated search queries.",
+)
+@click.option(
+    "--hotspots",
+    default=100,
+    help="Number of hotspot tiles (zipf) or points (gaussian).",
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--zipf-exponent",
+    default=1.1,
+    help="Exponent of the Zipf law over the hotspot tiles.",
+    type=click.FloatRange(min=0, min_open=True),
+)
+@click.option(
+    "--hotspot-sigma",
+    default=0.5,
+    help="Standard deviation around the gaussian hotspots, in degrees.",
+    type=click.FloatRange(min=0, min_open=True),
+)
+@click.option(
+    "--hotspot-tile-size",
+    default=1.0,
+    help="Edge of the hotspot tiles and largest edge of the searched bboxes, in degrees.",
+    type=click.FloatRange(min=0, min_open=True),
+)
+@click.option(
+    "--temporal-distribution",
+    default="none",
+    type=click.Choice(TEMPORAL_DISTRIBUTIONS),
+    help="Distribution of the datetime intervals of the generated search queries.",
+)
+@click.option(
+    "--recent-half-life",
+    default=90.0,
+    help="Half-life of the recent datetimes, in days.",
+    type=click.FloatRange(min=0, min_open=True),
+)
+@click.option(
+    "-w",
+    "--workers",
+    default=None,
+    help="Number of local Locust worker processes (defaults to the CPU count for Locust, 0 for a single process).",
+    type=int,
+)
+@click.option(
+    "--worker-hosts",
+    default=None,
+    help="Comma-separated ssh hosts to start additional Locust workers on.",
+)
+@click.option(
+    "--master-host",
+    default=None,
+    help="Only start local Locust workers, attached to the master on this host.",
+)
+@click.option(
+    "--engine",
+    default="requests",
+    type=click.Choice(ENGINES),
+    help="HTTP engine of the Locust users: python-requests or geventhttpclient (fast).",
+)
+@click.option(
+    "--headless",
+    is_flag=True,
+    help="Run Locust without the web UI and write the results to files.",
+)
+@click.option(
+    "--users", default=10, help="Number of Locust users for headless runs.", type=int
+)
+@click.option(
+    "--spawn-rate",
+    default=10.0,
+    help="Locust users started per second for headless runs.",
+    type=float,
+)
+@click.option(
+    "--run-time",
+    default=None,
+    help="Stop headless runs after this time, e.g. 300s, 20m, 1h30m.",
+)
+@click.option(
+    "--arrival-rate",
+    default=None,
+    help="Issue requests at this rate (requests/s) regardless of response times (open model).",
+    type=float,
+)
+@click.option(
+    "--load-profile",
+    default="constant",
+    type=click.Choice(LOAD_PROFILES),
+    help="Shape of the arrival rate over time.",
+)
+@click.option(
+    "--profile-period",
+    default=60.0,
+    help="Step interval, ramp duration or spike start of the load profile, in seconds.",
+    type=float,
+)
+@click.option(
+    "--profile-steps",
+    default=5,
+    help="Number of steps of the step load profile.",
+    type=int,
+)
+@click.option(
+    "--spike-factor",
+    default=5.0,
+    help="Arrival rate multiplier during the spike of the spike load profile.",
+    type=float,
+)
+@click.option(
+    "--spike-duration",
+    default=30.0,
+    help="Duration of the spike of the spike load profile, in seconds.",
+    type=float,
+)
+@click.option(
+    "--replay",
+    "replay_log",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Re-issue the requests of an access log (common/combined log format or JSON lines, optionally gzipped).",
+)
+@click.option(
+    "--replay-mode",
+    default="timed",
+    type=click.Choice(REPLAY_MODES),
+    help="Keep the logged request timing or replay as fast as possible.",
+)
+@click.option(
+    "--replay-speed",
+    default=1.0,
+    help="Timing acceleration factor of timed replays, e.g. 10 replays an hour in 6 minutes.",
+    type=float,
+)
+@click.option(
+    "--replay-shards",
+    default=None,
+    help="Number of workers the access log is split across (defaults to the local worker count).",
+    type=int,
+)
+@click.option(
+    "--write-ratio",
+    default=0.0,
+    help="Fraction of Locust task runs that are writes (create, update, delete, bulk), e.g. 0.2.",
+    type=float,
+)
+@click.option(
+    "--write-mix",
+    default=DEFAULT_WRITE_MIX,
+    help="Relative weights of the write operations.",
+)
+@click.option(
+    "--write-batch-size",
+    default=10,
+    help="Number of items per bulk insertion of the write workload.",
+    type=int,
+)
+@click.option(
+    "--write-collection",
+    default="test-collection",
+    help="Collection the write workload writes to.",
+)
+@click.option(
+    "--backend-stats",
+    default=None,
+    type=click.Choice(BACKENDS),
+    help="Sample this backend's resource usage during Locust runs and export it with the results.",
+)
+@click.option(
+    "--backend-url",
+    default=None,
+    help="Elasticsearch/OpenSearch URL, Postgres DSN or Mongo URI of the sampled backend (defaults to the docker-compose setup).",
+)
+@click.option(
+    "--backend-stats-interval",
+    default=5.0,
+    help="Seconds between two backend samples.",
+    type=float,
+)
+@click.option(
+    "--scenario",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="YAML or JSON scenario file of weighted request templates, run instead of the built-in Locust tasks.",
+)
+@click.option(
+    "--validate-sample-rate",
+    default=0.0,
+    type=click.FloatRange(0, 1),
+    help="Fraction of responses checked for correctness in a background process, e.g. 0.01.",
+)
+@click.option(
+    "--validate-max-pending",
+    default=1000,
+    help="Sampled responses waiting for validation before new samples are dropped.",
+    type=int,
+)
+@click.option(
+    "--repeat-ratio",
+    default=None,
+    type=click.FloatRange(0, 1),
+    help="Fraction of searches repeating a recent query, the others are unique. Reports them apart.",
+)
+@click.option(
+    "--repeat-pool",
+    default=1000,
+    help="Number of recent queries per search kind that repeated searches are drawn from.",
+    type=int,
+)
+@click.option(
+    "--warm-up",
+    "warmup",
+    default=0.0,
+    help="Seconds of load run before the stats are reset, excluded from the results.",
+    type=float,
+)
+@click.option(
+    "--tags", default=None, help="Comma-separated task tags to run in Locust."
+)
+@click.option(
+    "--exclude-tags",
+    default=None,
+    help="Comma-separated task tags to exclude in Locust.",
+)
+@click.option(
+    "--results-prefix",
+    default=None,
+    help="Write Locust results to PREFIX.json and PREFIX.csv (default 'results' for headless runs).",
+)
+@click.option(
+    "--slo",
+    multiple=True,
+    help="Fail the Locust run if an SLO is breached, e.g. 'post-search-bbox:p95<300'. Repeatable.",
+)
 @click.version_option(version="0.2.0")
 def main(
     ingest: bool,
     locust: bool,
     taurus: bool,
+    compare: bool,
+    benchmark_suite: bool,
+    results_db: str,
+    suite_scenarios: str,
+    backend_version: str,
+    git_sha: str,
+    baseline_ref: str,
+    significance: float,
+    stub_server: bool,
+    build_query_corpus: bool,
     api_address: str,
     concurrency: int,
     ramp_up: str,
     iterations: int,
+    endpoints: Tuple[str, ...],
+    baseline: str,
+    regression_tolerance: float,
+    stub_latency: float,
+    stub_latency_jitter: float,
+    stub_error_rate: float,
+    stub_processes: int,
+    ingest_concurrency: int,
+    batch_size: int,
+    max_retries: int,
+    no_bulk: bool,
+    checkpoint: str,
+    precheck: bool,
+    n_items: int,
+    items_file: str,
+    n_collections: int,
+    seed: int,
+    catalog_ttl: int,
+    exclude_setup_stats: bool,
+    page_limit: int,
+    max_pages: int,
+    max_paged_items: int,
+    query_corpus: str,
+    queries: int,
+    query_seed: int,
+    query_limit: int,
+    spatial_distribution: str,
+    hotspots: int,
+    zipf_exponent: float,
+    hotspot_sigma: float,
+    hotspot_tile_size: float,
+    temporal_distribution: str,
+    recent_half_life: float,
+    workers: int,
+    worker_hosts: str,
+    master_host: str,
+    engine: str,
+    headless: bool,
+    users: int,
+    spawn_rate: float,
+    run_time: str,
+    arrival_rate: float,
+    load_profile: str,
+    profile_period: float,
+    profile_steps: int,
+    spike_factor: float,
+    spike_duration: float,
+    replay_log: str,
+    replay_mode: str,
+    replay_speed: float,
+    replay_shards: int,
+    write_ratio: float,
+    write_mix: str,
+    write_batch_size: int,
+    write_collection: str,
+    backend_stats: str,
+    backend_url: str,
+    backend_stats_interval: float,
+    scenario: str,
+    validate_sample_rate: float,
+    validate_max_pending: int,
+    repeat_ratio: float,
+    repeat_pool: int,
+    warmup: float,
+    tags: str,
+    exclude_tags: str,
+    results_prefix: str,
+    slo: Tuple[str, ...],
 ):
     """
     Entry point for the stac-api-load-testing CLI tool.
@@ -107,34 +866,409 @@ def main(
         ingest (bool): If True, ingest sample data into the specified STAC API.
         locust (bool): If True, execute Locust load tests against the specified STAC API.
         taurus (bool): If True, perform Taurus performance testing with custom settings against the specified STAC API.
+        compare (bool): If True, run the same headless Locust workload (after the same ingest with `ingest`) against each endpoint in turn and report their results side by side.
+        benchmark_suite (bool): If True, run each scenario of the benchmark suite (item-lookup, browse, spatial-search, filter-search, deep-paging) headless for `run_time` against each endpoint, store the runs in `results_db` and compare their latencies to the stored baseline with a Mann-Whitney test; the run exits non-zero on a regression.
+        results_db (str): Specifies the SQLite database the benchmark runs are stored in, keyed by scenario, backend (the endpoint name), backend version and git sha. Default is 'benchmarks.db'.
+        suite_scenarios (str): Comma-separated names of the benchmark scenarios to run. Default is all of them.
+        backend_version (str): Specifies the version of the benchmarked backend the runs are stored under. Default is 'unknown'.
+        git_sha (str): Specifies the git commit the benchmark runs are stored under. Default is HEAD of the working directory.
+        baseline_ref (str): If set, compare benchmark runs to the latest run of this backend version or git sha (prefix) instead of the latest earlier run. Only runs with the same users, spawn rate, run time, workers, engine and warm-up are compared.
+        significance (float): Specifies the one-sided Mann-Whitney p-value below which a latency shift is significant; a significant shift whose median grows by more than `regression_tolerance` is a regression. Default is 0.01.
+        stub_server (bool): If True, serve an in-memory STAC API on the host and port of `api_address`, holding the sample (or `n_items` generated) items, to measure the load generator's own ceiling without a backend.
+        build_query_corpus (bool): If True, write a seeded query corpus to the `query_corpus` file, anchored on the sample (or `n_items` generated) items.
         concurrency (int): Specifies the number of concurrent users for Taurus testing. Default is 10.
         ramp_up (str): Specifies the ramp-up period for Taurus testing, in Taurus notation (e.g., '1m' for 1 minute). Default is '1m'.
         iterations (int): Specifies the number of iterations each virtual user will execute in Taurus testing. Default is 100.
         api_address (str): The base URL of the STAC API to be tested.
+        endpoints (tuple): The named STAC APIs to compare, in NAME=URL notation.
+        baseline (str): A comparison JSON file written by a previous `compare` run; the run exits non-zero if a metric regressed.
+        regression_tolerance (float): Specifies the relative degradation from the baseline reported as a regression. Default is 0.1.
+        stub_latency (float): Specifies the mean latency injected by the stub server, in milliseconds. Default is 0.
+        stub_latency_jitter (float): Specifies the maximum deviation from the stub server's mean latency, in milliseconds. Default is 0.
+        stub_error_rate (float): Specifies the fraction of stub server requests failing with a 500. Default is 0.
+        stub_processes (int): Specifies the number of stub server processes, each holding its own copy of the items. Default is 1.
+        ingest_concurrency (int): Specifies the number of concurrent workers used to ingest data. Default is 8.
+        batch_size (int): Specifies the number of items sent per bulk items request when ingesting. Default is 100.
+        max_retries (int): Specifies the number of retries on 5xx responses and connection errors when ingesting. Default is 3.
+        no_bulk (bool): If True, post items one at a time instead of using the Transaction extension's bulk items endpoint.
+        checkpoint (str): If set, record the progress of the ingest in this file, and resume from it if it exists. Items are tracked by their offset in the ingested stream, so resume with the same `n_items`, `n_collections` and `seed`, or the same `items_file`. With `compare`, each endpoint has its own checkpoint, the name of the endpoint appended to the file name.
+        precheck (bool): If True, look each batch up with `GET /search?ids=` before posting it when ingesting, and skip the items the API already holds.
+        n_items (int): If set, ingest this many synthetic items generated from the sample data instead of the sample data itself. When load testing, tasks also target the generated items.
+        items_file (str): If set, stream the items of this file into the API instead of the sample data, creating their collections as they are reached. Newline-delimited JSON (optionally gzip or zstd compressed), FeatureCollection JSON and stac-geoparquet files are supported. When load testing, tasks target the items of the file.
+        n_collections (int): Specifies the number of collections synthetic items are spread across. Default is 1.
+        seed (int): Specifies the seed of the synthetic item corpus. Default is 0.
+        catalog_ttl (int): Specifies the number of seconds before load test users refresh their cached collection catalog. Default is 300.
+        exclude_setup_stats (bool): If True, collection catalog requests are excluded from the load test stats.
+        page_limit (int): Specifies the page size of the deep paging tasks. Default is 100.
+        max_pages (int): Specifies the deepest page requested by the deep paging tasks. Default is 10.
+        max_paged_items (int): Specifies the number of items after which the deep paging tasks stop. Default is 1000.
+        query_corpus (str): The query corpus file. When load testing, the intersects and bbox search tasks issue its queries, in order, instead of random ones, so runs against different backends send identical workloads.
+        queries (int): Specifies the number of queries of each kind in the built query corpus. Default is 100000.
+        query_seed (int): Specifies the seed of the built query corpus and of the hotspots. Default is 0.
+        query_limit (int): Specifies the page size of the queries of the built query corpus, from 1 to 65535. Default is 10.
+        spatial_distribution (str): Specifies where the intersects and bbox search tasks search without a query corpus: 'uniform' inside the bbox of a random collection, 'zipf' over hotspot tiles holding seed items, 'gaussian' around the centers of seed items or 'footprint', inside the bbox of a random seed item. The query counts per tile, hotspot and month are written to PREFIX_spatial.json. Default is 'uniform'.
+        hotspots (int): Specifies the number of hotspot tiles (zipf) or points (gaussian). Default is 100.
+        zipf_exponent (float): Specifies the exponent of the Zipf law over the hotspot tiles. Default is 1.1.
+        hotspot_sigma (float): Specifies the standard deviation around the gaussian hotspots, in degrees. Default is 0.5.
+        hotspot_tile_size (float): Specifies the edge of the hotspot tiles and the largest edge of the searched bboxes, in degrees. Default is 1.
+        temporal_distribution (str): Specifies the datetime intervals of the intersects and bbox search tasks: 'none', 'uniform' within the collection's temporal extent or 'recent', decaying exponentially from its end. Default is 'none'.
+        recent_half_life (float): Specifies the half-life of the recent datetimes, in days. Default is 90.
+        workers (int): Specifies the number of local Locust worker processes. Defaults to the CPU count for Locust and to a single process for Taurus; 0 runs a single Locust process.
+        worker_hosts (str): Comma-separated ssh hosts on which to start additional Locust workers.
+        master_host (str): If set, only start local Locust workers attached to the master on this host.
+        engine (str): Specifies the HTTP engine of the Locust users: 'requests' (python-requests) or 'fast' (Locust's FastHttpUser, on geventhttpclient), which sends several times more requests per core. Default is 'requests'.
+        headless (bool): If True, run Locust without the web UI.
+        users (int): Specifies the number of Locust users for headless runs. Default is 10.
+        spawn_rate (float): Specifies the number of Locust users started per second for headless runs. Default is 10.
+        run_time (str): Specifies when to stop headless runs, e.g. '20m'. Runs until stopped by default.
+        arrival_rate (float): If set, issue requests at this total rate (requests/s) on a fixed schedule regardless of response times, measuring latency from each request's intended start. `--users` sets the number of dispatcher users.
+        load_profile (str): Specifies how the arrival rate evolves: constant, step, ramp or spike. Default is constant.
+        profile_period (float): Specifies the step interval, ramp duration or spike start of the load profile, in seconds. Default is 60.
+        profile_steps (int): Specifies the number of steps of the step load profile. Default is 5.
+        spike_factor (float): Specifies the arrival rate multiplier during the spike. Default is 5.
+        spike_duration (float): Specifies the duration of the spike, in seconds. Default is 30.
+        replay_log (str): If set, re-issue the GET and POST requests of this access log instead of running the Locust tasks. Each worker replays its own shard of the log, which restarts from the top when exhausted.
+        replay_mode (str): Specifies whether to keep the logged request timing ('timed') or to replay as fast as possible ('max-speed'). Default is 'timed'.
+        replay_speed (float): Specifies the timing acceleration factor of timed replays. Default is 1.
+        replay_shards (int): Specifies the number of workers the access log is split across. Defaults to the number of local workers; set it to the total worker count when using remote workers.
+        write_ratio (float): Specifies the fraction of Locust task runs that are writes; with `--tags writes`, only writes run. Default is 0.
+        write_mix (str): Specifies the relative weights of the create, update, delete and bulk write operations. Default is 'create=4,update=2,delete=1,bulk=1'.
+        write_batch_size (int): Specifies the number of items per bulk insertion of the write workload. Default is 10.
+        write_collection (str): Specifies the collection the write workload writes to. Default is 'test-collection'.
+        backend_stats (str): If set, sample the resource usage of this backend (elasticsearch, opensearch, pgstac or mongo) during Locust runs, next to the request stats, and export the samples to PREFIX_backend.json and PREFIX_backend.csv.
+        backend_url (str): Specifies the Elasticsearch/OpenSearch URL, Postgres DSN or Mongo URI of the sampled backend. Defaults to the docker-compose.yml setup.
+        backend_stats_interval (float): Specifies the number of seconds between two backend samples. Default is 5.
+        scenario (str): If set, the Locust and Taurus runs send the weighted request templates of this YAML or JSON scenario file instead of running the built-in tasks. See config_files/scenario_example.yml.
+        validate_sample_rate (float): Specifies the fraction of successful responses of the built-in tasks checked for correctness (item counts, bbox/intersects containment, datetime, sort order and STAC item fields) by a validator process per Locust process. Invalid responses count as failures of their endpoint. Default is 0 (no validation).
+        validate_max_pending (int): Specifies the number of sampled responses waiting for validation before new samples are dropped, so validation never slows the load down. Default is 1000.
+        repeat_ratio (float): If set, this fraction of the point and bbox searches repeats one of the worker's recent queries (cache-hit candidates) and the others are queries the worker never sent (cache-miss candidates), reported apart with `-repeat` and `-unique` name suffixes.
+        repeat_pool (int): Specifies the number of recent queries per search kind that repeated searches are drawn from, roughly the working set a backend cache must hold. Default is 1000.
+        warmup (float): Specifies the seconds of load run before the stats, histograms and query counts are reset, so the results only cover the warmed-up backend. The run time includes it. Default is 0 (no warm-up).
+        tags (str): Comma-separated tags of the Locust tasks to run.
+        exclude_tags (str): Comma-separated tags of the Locust tasks to exclude.
+        results_prefix (str): Specifies the path prefix of the JSON and CSV results. Default is 'results' for headless runs.
+        slo (tuple): SLOs in NAME:METRIC<THRESHOLD notation; the run exits non-zero if one is breached.
     """
     os.environ["LOCUST_HOST"] = api_address
+    if items_file:
+        if n_items:
+            raise click.UsageError("--items-file cannot be combined with --items.")
+        from .data_loader.item_files import check_item_file
+
+        try:
+            check_item_file(items_file)
+        except (ValueError, ImportError) as e:
+            raise click.BadParameter(str(e), param_hint="--items-file")
+        # Index the items of the file in the locustfile's seed index
+        os.environ["STAC_ITEMS_FILE"] = os.path.abspath(items_file)
+    if n_items:
+        # Describe the generated corpus to the locustfile's seed index
+        os.environ["STAC_LOAD_ITEMS"] = str(n_items)
+        os.environ["STAC_LOAD_COLLECTIONS"] = str(n_collections)
+        os.environ["STAC_LOAD_SEED"] = str(seed)
+    os.environ["STAC_HTTP_ENGINE"] = engine
+    os.environ["STAC_CATALOG_TTL"] = str(catalog_ttl)
+    if exclude_setup_stats:
+        os.environ["STAC_EXCLUDE_SETUP_STATS"] = "1"
+    os.environ["STAC_PAGE_LIMIT"] = str(page_limit)
+    os.environ["STAC_MAX_PAGES"] = str(max_pages)
+    os.environ["STAC_MAX_PAGED_ITEMS"] = str(max_paged_items)
+    if arrival_rate:
+        os.environ["STAC_ARRIVAL_RATE"] = str(arrival_rate)
+        os.environ["STAC_ARRIVAL_USERS"] = str(users)
+        os.environ["STAC_LOAD_PROFILE"] = load_profile
+        os.environ["STAC_PROFILE_PERIOD"] = str(profile_period)
+        os.environ["STAC_PROFILE_STEPS"] = str(profile_steps)
+        os.environ["STAC_SPIKE_FACTOR"] = str(spike_factor)
+        os.environ["STAC_SPIKE_DURATION"] = str(spike_duration)
+    if workers is None:
+        workers = (
+            runner.default_worker_count() if locust or compare or benchmark_suite else 0
+        )
+    if replay_log:
+        os.environ["STAC_REPLAY_LOG"] = os.path.abspath(replay_log)
+        os.environ["STAC_REPLAY_MODE"] = replay_mode
+        os.environ["STAC_REPLAY_SPEED"] = str(replay_speed)
+        os.environ["STAC_REPLAY_SHARDS"] = str(replay_shards or max(workers, 1))
+    try:
+        parse_write_mix(write_mix)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--write-mix")
+    os.environ["STAC_WRITE_RATIO"] = str(write_ratio)
+    os.environ["STAC_WRITE_MIX"] = write_mix
+    os.environ["STAC_WRITE_BATCH_SIZE"] = str(write_batch_size)
+    os.environ["STAC_WRITE_COLLECTION"] = write_collection
+    # Shared by every local worker so written item ids never collide across runs
+    os.environ.setdefault("STAC_RUN_ID", f"{time.time_ns():x}")
+    if backend_stats:
+        try:
+            check_driver(backend_stats)
+        except ImportError as e:
+            raise click.BadParameter(str(e), param_hint="--backend-stats")
+        os.environ["STAC_BACKEND_STATS"] = backend_stats
+        os.environ["STAC_BACKEND_STATS_INTERVAL"] = str(backend_stats_interval)
+        if backend_url:
+            os.environ["STAC_BACKEND_URL"] = backend_url
+    if scenario:
+        import yaml  # type: ignore
+
+        from .workload.scenario import load_scenario
+
+        try:
+            load_scenario(scenario)
+        except (ValueError, yaml.YAMLError) as e:
+            raise click.BadParameter(str(e), param_hint="--scenario")
+        os.environ["STAC_SCENARIO"] = os.path.abspath(scenario)
+    os.environ["STAC_SPATIAL_DISTRIBUTION"] = spatial_distribution
+    os.environ["STAC_SPATIAL_HOTSPOTS"] = str(hotspots)
+    os.environ["STAC_SPATIAL_ZIPF_EXPONENT"] = str(zipf_exponent)
+    os.environ["STAC_SPATIAL_SIGMA"] = str(hotspot_sigma)
+    os.environ["STAC_SPATIAL_TILE_SIZE"] = str(hotspot_tile_size)
+    os.environ["STAC_TEMPORAL_DISTRIBUTION"] = temporal_distribution
+    os.environ["STAC_TEMPORAL_HALF_LIFE"] = str(recent_half_life)
+    os.environ["STAC_QUERY_SEED"] = str(query_seed)
+    if repeat_ratio is not None:
+        os.environ["STAC_REPEAT_RATIO"] = str(repeat_ratio)
+        os.environ["STAC_REPEAT_POOL"] = str(repeat_pool)
+    if warmup:
+        os.environ["STAC_WARMUP"] = str(warmup)
+    if validate_sample_rate:
+        os.environ["STAC_VALIDATE_SAMPLE_RATE"] = str(validate_sample_rate)
+        os.environ["STAC_VALIDATE_MAX_PENDING"] = str(validate_max_pending)
+    if query_corpus and not build_query_corpus:
+        if not os.path.exists(query_corpus):
+            raise click.BadParameter(
+                f"'{query_corpus}' does not exist, build it with --build-query-corpus.",
+                param_hint="--query-corpus",
+            )
+        os.environ["STAC_QUERY_CORPUS"] = os.path.abspath(query_corpus)
+        os.environ["STAC_QUERY_SHARDS"] = str(max(workers, 1))
+    if headless and not results_prefix:
+        results_prefix = "results"
+    if results_prefix:
+        os.environ["STAC_RESULTS_PREFIX"] = results_prefix
+    if slo:
+        from .workload import results
+
+        try:
+            results.parse_slos(";".join(slo))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--slo")
+        os.environ["STAC_SLO"] = ";".join(slo)
+
+    if benchmark_suite:
+        # Run the fixed scenarios against each backend and gate on the stored baselines
+        from .data_loader.checkpoint import ingest_source
+        from .workload import benchmark
 
-    if ingest:
+        try:
+            named_endpoints = [comparison.parse_endpoint(text) for text in endpoints]
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--endpoint")
+        if not named_endpoints:
+            raise click.UsageError(
+                "--benchmark-suite requires at least one --endpoint, its name keys the stored runs."
+            )
+        try:
+            scenarios = benchmark.select_scenarios(suite_scenarios)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--suite-scenarios")
+        ingest_options = None
+        if ingest:
+            ingest_options = build_ingest_options(
+                ingest_concurrency,
+                batch_size,
+                max_retries,
+                no_bulk,
+                n_items,
+                n_collections,
+                seed,
+                items_file,
+                precheck,
+            )
+        settings = {
+            "users": users,
+            "spawn_rate": spawn_rate,
+            "run_time": run_time or "1m",
+            "workers": workers,
+            "engine": engine,
+            "warmup": warmup,
+            # Runs are only compared to baselines on the same items
+            "corpus": ingest_source(n_items, n_collections, seed, items_file),
+        }
+        database = benchmark.ResultsDatabase(results_db)
+        try:
+            regressed = run_benchmark_suite(
+                named_endpoints,
+                scenarios,
+                runner.headless_args(users, spawn_rate, run_time or "1m"),
+                workers,
+                results_prefix or "benchmark",
+                database,
+                {
+                    "version": backend_version,
+                    "git_sha": git_sha or benchmark.current_git_sha(),
+                },
+                settings,
+                ingest_options,
+                baseline_ref,
+                significance,
+                regression_tolerance,
+                checkpoint,
+            )
+        finally:
+            database.close()
+        click.echo(f"Benchmark runs stored in {results_db}")
+        if regressed:
+            click.secho("Benchmark regression against the baseline", fg="red")
+            sys.exit(1)
+        click.secho("No benchmark regression", fg="green")
+    elif compare:
+        # Run the same workload against each backend, one after another
+        try:
+            named_endpoints = [comparison.parse_endpoint(text) for text in endpoints]
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--endpoint")
+        if not named_endpoints:
+            raise click.UsageError("--compare requires at least one --endpoint.")
+        ingest_options = None
+        if ingest:
+            ingest_options = build_ingest_options(
+                ingest_concurrency,
+                batch_size,
+                max_retries,
+                no_bulk,
+                n_items,
+                n_collections,
+                seed,
+                items_file,
+                precheck,
+            )
+        prefix = results_prefix or "compare"
+        all_results = run_comparison(
+            named_endpoints,
+            runner.headless_args(users, spawn_rate, run_time or "1m")
+            + runner.tag_args(tags, exclude_tags),
+            workers,
+            prefix,
+            ingest_options,
+            checkpoint,
+        )
+        if not all_results:
+            sys.exit(1)
+        table = comparison.compare_results(all_results)
+        comparison.echo_comparison(table, list(all_results))
+        comparison.write_comparison(all_results, table, prefix)
+        click.echo(f"Comparison written to {prefix}.json and {prefix}.csv")
+        if baseline:
+            regressions = comparison.find_regressions(
+                all_results,
+                comparison.load_baseline(baseline),
+                regression_tolerance,
+            )
+            for regression in regressions:
+                click.secho(f"Regression: {regression}", fg="red")
+            if regressions:
+                sys.exit(1)
+            click.secho("No regression against the baseline", fg="green")
+    elif ingest:
         # Load data into the STAC API
-        data_loader.load_items(stac_api_base_url=api_address)
-    elif locust:
-        # Execute Locust load tests
-        locust_file_path = pkg_resources.resource_filename(
-            __name__, "config_files/locustfile.py"
+        ingest_items(
+            api_address,
+            build_ingest_options(
+                ingest_concurrency,
+                batch_size,
+                max_retries,
+                no_bulk,
+                n_items,
+                n_collections,
+                seed,
+                items_file,
+                precheck,
+            ),
+            checkpoint,
+        )
+    elif stub_server:
+        # Serve the stand-in STAC API until interrupted
+        from . import stub_server as stub
+
+        address = urlsplit(api_address)
+        stub.serve(
+            address.hostname or "localhost",
+            address.port or 80,
+            stub.build_store(n_items, n_collections, seed, items_file=items_file),
+            latency=stub_latency,
+            latency_jitter=stub_latency_jitter,
+            error_rate=stub_error_rate,
+            processes=stub_processes,
         )
-        subprocess.run(
-            ["locust", "--locustfile", locust_file_path, "--host", api_address],
-            check=True,
+    elif build_query_corpus:
+        # Pre-generate the search queries of the load tests
+        if not query_corpus:
+            raise click.UsageError("--build-query-corpus requires --query-corpus.")
+        header = build_corpus(
+            query_corpus,
+            get_seed_index(),
+            n_queries=queries,
+            seed=query_seed,
+            limit=query_limit,
+        )
+        click.secho(
+            f"Wrote {queries * len(header['tables'])} queries to {query_corpus}",
+            fg="green",
+        )
+    elif locust:
+        # Execute Locust load tests, distributed across worker processes
+        locust_file_path = locustfile_path()
+        selected_tags = runner.tag_args(tags, exclude_tags)
+        locust_args = selected_tags
+        if replay_log:
+            # Only spawn the replaying users, tasks are not run
+            selected_tags = []
+            locust_args = ["LogReplayUser"]
+            if headless:
+                locust_args = (
+                    runner.headless_args(users, spawn_rate, run_time) + locust_args
+                )
+        elif headless and arrival_rate:
+            # The arrival-rate load shape sets the number of users
+            locust_args = ["--headless"] + selected_tags
+            if run_time:
+                locust_args += ["--run-time", run_time]
+        elif headless:
+            locust_args = (
+                runner.headless_args(users, spawn_rate, run_time) + selected_tags
+            )
+        exit_code = runner.run_locust(
+            locust_file_path,
+            api_address,
+            workers=workers,
+            worker_hosts=runner.parse_worker_hosts(worker_hosts),
+            master_host=master_host,
+            locust_args=locust_args,
+            worker_args=selected_tags,
         )
+        if exit_code:
+            sys.exit(exit_code)
     elif taurus:
         # Generate and run a custom Taurus configuration for performance testing
         config_file_path = generate_taurus_config(
-            api_address, concurrency, ramp_up, iterations
+            api_address,
+            concurrency,
+            ramp_up,
+            iterations,
+            workers=workers,
+            scenario=scenario,
         )
         if config_file_path:
+            locust_file_path = locustfile_path()
+            processes = runner.start_local_workers(
+                locust_file_path, api_address, workers
+            )
             try:
                 subprocess.run(["bzt", config_file_path], check=True)
             finally:
+                runner.stop_processes(processes)
                 if os.path.exists(config_file_path):
                     os.remove(config_file_path)  # Cleanup after running
 
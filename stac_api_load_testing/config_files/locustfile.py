@@ -1,74 +1,129 @@
 """stac-api-load-testing locustfile.py config."""
-import json
 import os
 import random
 
-from locust import HttpUser, run_single_user, tag, task
-from pkg_resources import resource_filename  # type: ignore
-
-test_item = {
-    "stac_version": "1.0.0",
-    "stac_extensions": [],
-    "type": "Feature",
-    "id": "20201211_223832_CS2",
-    "bbox": [
-        172.91173669923782,
-        1.3438851951615003,
-        172.95469614953714,
-        1.3690476620161975,
-    ],
-    "geometry": {
-        "type": "Polygon",
-        "coordinates": [
-            [
-                [172.91173669923782, 1.3438851951615003],
-                [172.95469614953714, 1.3438851951615003],
-                [172.95469614953714, 1.3690476620161975],
-                [172.91173669923782, 1.3690476620161975],
-                [172.91173669923782, 1.3438851951615003],
-            ]
-        ],
-    },
-    "properties": {"datetime": "2020-12-11T22:38:32.125000Z"},
-    "collection": "simple-collection",
-    "links": [
-        {
-            "rel": "collection",
-            "href": "./collection.json",
-            "type": "application/json",
-            "title": "Simple Example Collection",
-        },
-        {
-            "rel": "root",
-            "href": "./collection.json",
-            "type": "application/json",
-            "title": "Simple Example Collection",
-        },
-        {
-            "rel": "parent",
-            "href": "./collection.json",
-            "type": "application/json",
-            "title": "Simple Example Collection",
-        },
-    ],
-    "assets": {
-        "visual": {
-            "href": "https://storage.googleapis.com/open-cogs/stac-examples/20201211_223832_CS2.tif",
-            "type": "image/tiff; application=geotiff; profile=cloud-optimized",
-            "title": "3-Band Visual",
-            "roles": ["visual"],
-        },
-        "thumbnail": {
-            "href": "https://storage.googleapis.com/open-cogs/stac-examples/20201211_223832_CS2.jpg",
-            "title": "Thumbnail",
-            "type": "image/jpeg",
-            "roles": ["thumbnail"],
-        },
-    },
-}
-
-
-class WebsiteTestUser(HttpUser):
+from locust import constant, events, run_single_user, tag, task
+
+from stac_api_load_testing.workload import backend_stats, results, validation
+from stac_api_load_testing.workload.arrival import (
+    ArrivalProfile,
+    ArrivalRateShape,
+    OpenLoopMixin,
+    ScheduledClient,
+)
+from stac_api_load_testing.workload.catalog import get_collection_catalog
+from stac_api_load_testing.workload.codec import json_body, response_json
+from stac_api_load_testing.workload.filters import (
+    cql2_json,
+    cql2_text,
+    datetime_interval,
+    fields_parameter,
+    query_extension,
+    random_fields,
+    random_predicates,
+)
+from stac_api_load_testing.workload.histograms import get_histogram_recorder
+from stac_api_load_testing.workload.hotspots import (
+    export_stats,
+    get_query_sampler,
+    get_spatial_stats,
+)
+from stac_api_load_testing.workload.paging import PagingSettings, walk_pages
+from stac_api_load_testing.workload.query_corpus import (
+    SORT_FIELDS,
+    Query,
+    get_query_corpus,
+)
+from stac_api_load_testing.workload.repeats import (
+    get_query_mix,
+    register_warmup,
+    start_warmup,
+    stop_warmup,
+)
+from stac_api_load_testing.workload.replay import ReplaySettings, get_replay_source
+from stac_api_load_testing.workload.scenario import get_scenario
+from stac_api_load_testing.workload.seed_index import get_seed_index
+from stac_api_load_testing.workload.writes import (
+    ItemWriter,
+    WriteSettings,
+    get_id_allocator,
+)
+
+
+@events.request.add_listener
+def on_request(request_type, name, response_time, **kwargs):
+    """Record every request latency into its endpoint's HdrHistogram."""
+    get_histogram_recorder().record(request_type, name, response_time)
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data, **kwargs):
+    """Ship the histograms and query counts recorded since the last report to the master."""
+    recorder = get_histogram_recorder()
+    data["hdr_histograms"] = recorder.encode()
+    recorder.reset()
+    spatial_stats = get_spatial_stats()
+    data["spatial_stats"] = spatial_stats.encode()
+    spatial_stats.reset()
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data, **kwargs):
+    """Merge the histograms and query counts shipped by a worker."""
+    get_histogram_recorder().merge(data.get("hdr_histograms", {}))
+    get_spatial_stats().merge(data.get("spatial_stats", {}))
+
+
+@events.reset_stats.add_listener
+def on_reset_stats(**kwargs):
+    """Drop the recorded histograms and query counts along with the Locust stats."""
+    get_histogram_recorder().reset()
+    get_spatial_stats().reset()
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    """Let workers reset their stats when the master ends the warm-up, if enabled."""
+    register_warmup(environment)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    """Start sampling the backend, validating responses and the warm-up, if enabled."""
+    backend_stats.start_sampling(environment)
+    validation.start_validation(environment)
+    start_warmup(environment)
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    """Stop sampling the backend and export the samples next to the results."""
+    backend_stats.stop_sampling(environment)
+    validation.stop_validation(environment)
+    stop_warmup(environment)
+
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    """Write the run results and enforce SLOs before Locust exits."""
+    results.report_results(environment)
+    export_stats(environment)
+
+
+# The HTTP engine of the users (`--engine`): python-requests, or geventhttpclient for
+# several times more requests per core
+if os.getenv("STAC_HTTP_ENGINE") == "fast":
+    from locust import FastHttpUser as EngineUser
+else:
+    from locust import HttpUser as EngineUser  # type: ignore
+
+
+def worker_index(user):
+    """Return the index of the worker running a user, 0 outside of distributed runs."""
+    return getattr(user.environment.runner, "worker_index", 0)
+
+
+class WebsiteTestUser(EngineUser):
     """
     Simulates a user performing various API requests to test a web application's performance and behavior.
 
@@ -78,52 +133,51 @@ class WebsiteTestUser(HttpUser):
     Attributes:
         host (str): The base URL for the API, defaulted to 'http://localhost:8083' but can be overridden.
         default_load_multiplier (int): A default multiplier to adjust the load each task generates.
+        paging (PagingSettings): The page size and depth limits of the deep paging tasks.
+        writes (WriteSettings): The read/write ratio and mix of the write tasks.
+        validator (ResponseValidator): The sampled response checks, None if disabled.
     """
 
     host = os.getenv("LOCUST_HOST", "http://localhost:8083")
+    # A scenario file (`--scenario`) replaces the built-in tasks
+    abstract = get_scenario() is not None
     default_load_multiplier = 1
+    paging = PagingSettings.from_env()
+    writes = WriteSettings.from_env()
+    validator = validation.get_response_validator()
 
     def on_start(self):
         """Initialize resources before any task is executed."""
-        pass
+        # Build the shared seed index and collection catalog before the first task.
+        # The fixed-collection tasks target `test-collection`, or with --items-file the
+        # first collection of the file.
+        self.collection_id = get_seed_index().collection_ids[0]
+        self.catalog = get_collection_catalog()
+        self.catalog.ensure(self)
+        self.query_corpus = get_query_corpus(worker_index(self))
+        self.query_sampler = get_query_sampler(worker_index(self))
+        self.query_mix = get_query_mix()
+        self.writer = ItemWriter(
+            self, self.writes, get_id_allocator(worker_index(self))
+        )
+        # Weight the write tasks against the read tasks left after tag filtering
+        self.tasks = self.writes.mix_tasks(self.tasks, WebsiteTestUser.write_workload)
 
     def on_stop(self):
         """Clean up resources after tasks are completed."""
         pass
 
-    def load_file(self, file) -> dict:
-        """
-        Load JSON data from a specified file.
-
-        Args:
-            file (str): The path to the file to be loaded.
-
-        Returns:
-            dict: A dictionary containing the loaded JSON data.
-        """
-        try:
-            file_path = resource_filename(
-                "stac_api_load_testing.data_loader", f"setup_data/{file}"
-            )
-            with open(file_path, "r") as file:
-                return json.load(file)
-        except FileNotFoundError as e:
-            print(f"File not found: {e}")
-            return {}
-
     def get_collection_ids(self):
         """
-        Fetch and return all available collection IDs from the API.
+        Return all available collection IDs from the shared collection catalog.
+
+        The catalog is fetched from the API once per worker and refreshed when it expires.
 
         Returns:
             list: A list of collection IDs.
         """
-        collections_response = self.client.get("/collections", name="get-collections")
-        collections_body = collections_response.json()
-        collection_ids = [
-            collection["id"] for collection in collections_body["collections"]
-        ]
-        return collection_ids
+        self.catalog.ensure(self)
+        return self.catalog.collection_ids
 
     def parse_request_items(self, collection_id, items_response):
         """
@@ -133,7 +187,7 @@ class WebsiteTestUser(HttpUser):
             collection_id (str): The ID of the collection the items belong to.
             items_response: The response object containing the items data.
         """
-        items_body = items_response.json()
+        items_body = response_json(items_response)
         item_ids = [feature["id"] for feature in items_body["features"]]
 
         # Request between 1 and min(10, result count) Items, serially
@@ -142,9 +196,24 @@ class WebsiteTestUser(HttpUser):
                 f"/collections/{collection_id}/items/{item_id}", name="get-item"
             )
 
+    def validate_response(self, response, method, name, **expectation):
+        """
+        Check a sample of the responses in the background (`--validate-sample-rate`).
+
+        Invalid responses are logged as failures of their endpoint once checked.
+
+        Args:
+            response: The response to check.
+            method (str): The request method.
+            name (str): The stats name of the request.
+            **expectation: The checks of the request, see `validation.validate`.
+        """
+        if self.validator is not None:
+            self.validator.submit(response, method, name, expectation)
+
     def get_collection_bbox(self, collection_id):
         """
-        Retrieve the bounding box (bbox) of a specified collection.
+        Retrieve the bounding box (bbox) of a specified collection from the collection catalog.
 
         Args:
             collection_id (str): The ID of the collection to fetch the bbox for.
@@ -152,10 +221,109 @@ class WebsiteTestUser(HttpUser):
         Returns:
             list: A list representing the bbox of the collection.
         """
-        collection_response = self.client.get(
-            f"/collections/{collection_id}", name="get-collection"
+        return self.catalog.bbox(collection_id)
+
+    def next_query(self, kind):
+        """
+        Return the next search query of a kind, repeated or fresh with `--repeat-ratio`.
+
+        Args:
+            kind (str): `intersects` or `bbox`.
+
+        Returns:
+            Query: The search query.
+        """
+        if self.query_mix is not None:
+            return self.query_mix.next(kind, lambda: self.draw_query(kind))
+        return self.draw_query(kind)
+
+    def search_name(self, name):
+        """
+        Return the stats name of the last `next_query` search.
+
+        With `--repeat-ratio`, repeated and fresh queries (cache-hit and cache-miss
+        candidates) are reported apart, e.g. `post-multisearch-bbox-repeat` and
+        `post-multisearch-bbox-unique`.
+
+        Args:
+            name (str): The stats name of the task.
+
+        Returns:
+            str: The stats name of the search.
+        """
+        if self.query_mix is not None:
+            return self.query_mix.name(name)
+        return name
+
+    def draw_query(self, kind):
+        """
+        Draw a new search query of a kind, from the query corpus if one is loaded.
+
+        Without a corpus, the query targets a random point (`intersects`) or a random
+        bbox (`bbox`) inside the bbox of a random collection, with a random sort order.
+        With a spatial or temporal distribution (`--spatial-distribution`,
+        `--temporal-distribution`), points, bboxes and datetimes are drawn from it.
+
+        Args:
+            kind (str): `intersects` or `bbox`.
+
+        Returns:
+            Query: The search query.
+        """
+        if self.query_corpus is not None:
+            return self.query_corpus.next(kind)
+        if self.query_sampler is not None:
+            self.catalog.ensure(self)
+            return self.query_sampler.next_query(kind, self.catalog)
+
+        # Get the bbox of a random collection
+        collection_id = random.choice(self.get_collection_ids())
+        bbox = self.get_collection_bbox(collection_id)
+
+        # Create a random point or search bbox inside collection bbox
+        x = [random.random() * (bbox[2] - bbox[0]) + bbox[0] for _ in range(2)]
+        y = [random.random() * (bbox[3] - bbox[1]) + bbox[1] for _ in range(2)]
+        if kind == "intersects":
+            search_bbox = [x[0], y[0], x[0], y[0]]
+        else:
+            search_bbox = [min(x), min(y), max(x), max(y)]
+
+        return Query(
+            method="POST" if kind == "intersects" else random.choice(["GET", "POST"]),
+            collection_id=collection_id,
+            bbox=search_bbox,
+            datetime=None,
+            sortby=[(field, random.random() < 0.5) for field in SORT_FIELDS],
+            limit=None,
+        )
+
+    def query_expectation(self, query, **expectation):
+        """
+        Return the response checks of a search query, for `validate_response`.
+
+        Corpus bbox queries without a datetime contain the bbox of an ingested item, so
+        they must return at least one item.
+
+        Args:
+            query (Query): The search query.
+            **expectation: The spatial checks, `bbox` or `point`.
+
+        Returns:
+            dict: The checks of the query's collection, datetime, sort order and limit.
+        """
+        expectation.update(
+            collections=[query.collection_id],
+            datetime=query.datetime,
+            sortby=query.sortby,
+            limit=query.limit,
         )
-        return collection_response.json()["extent"]["spatial"]["bbox"][0]
+        if (
+            self.query_corpus is not None
+            and "bbox" in expectation
+            and not query.datetime
+        ):
+            expectation["min_count"] = 1
+        return expectation
 
     def get_sortby(self, get_post):
         """
@@ -168,7 +336,7 @@ class WebsiteTestUser(HttpUser):
             list: A list of strings or dictionaries representing the sort order for items.
         """
         # TODO retrieve all sortable fields common to items in collection
-        fields = ["id", "properties.datetime", "properties.eo:cloud_cover"]
+        fields = SORT_FIELDS
         directions = [random.choice(["+", "-"]) for _ in fields]
         sym2text = {"+": "asc", "-": "desc"}
 
@@ -198,13 +366,13 @@ class WebsiteTestUser(HttpUser):
     @task(default_load_multiplier)
     def get_collection(self):
         """Fetch a specific collection by ID."""
-        self.client.get("/collections/test-collection", name="get-collection")
+        self.client.get(f"/collections/{self.collection_id}", name="get-collection")
 
     @tag("item_collection")
     @task(default_load_multiplier)
     def get_item_collection(self):
         """Fetch items within a specific collection."""
-        self.client.get("/collections/test-collection/items", name="get-items")
+        self.client.get(f"/collections/{self.collection_id}/items", name="get-items")
 
     @tag("get_item")
     @task(default_load_multiplier)
@@ -212,13 +380,19 @@ class WebsiteTestUser(HttpUser):
         """
         Fetch a specific item by ID within a collection.
 
-        Selects an item ID at random from a predefined list and requests it.
+        Selects an item at random from the ingested sample (and generated) items and requests it.
         """
-        random_number = random.randint(1, 11)
-        item = self.load_file("sentinel-s2-l2a-cogs_0_100.json")
-        random_id = item["features"][random_number]["id"]
-        self.client.get(
-            f"/collections/test-collection/items/{random_id}", name="get-item"
+        collection_id, item_id = get_seed_index().random_item()
+        response = self.client.get(
+            f"/collections/{collection_id}/items/{item_id}", name="get-item"
+        )
+        self.validate_response(
+            response,
+            "GET",
+            "get-item",
+            collections=[collection_id],
+            ids=[item_id],
+            min_count=1,
         )
 
     @tag("get_bbox")
@@ -244,11 +418,11 @@ class WebsiteTestUser(HttpUser):
         This method sends a JSON payload with a bounding box to search for items within
         that geographical area using a POST request.
         """
-        self.client.post(
-            "/search",
-            json={"bbox": [16.171875, -79.095963, 179.992188, 19.824820]},
-            name="post-search-bbox",
+        bbox = [16.171875, -79.095963, 179.992188, 19.824820]
+        response = self.client.post(
+            "/search", **json_body({"bbox": bbox}), name="post-search-bbox"
         )
+        self.validate_response(response, "POST", "post-search-bbox", bbox=bbox)
 
     @tag("point_intersects")
     @task(default_load_multiplier)
@@ -264,10 +438,12 @@ class WebsiteTestUser(HttpUser):
         """
         self.client.post(
             "/search",
-            json={
-                "collections": ["test-collection"],
-                "intersects": {"type": "Point", "coordinates": [150.04, -33.14]},
-            },
+            **json_body(
+                {
+                    "collections": [self.collection_id],
+                    "intersects": {"type": "Point", "coordinates": [150.04, -33.14]},
+                }
+            ),
             name="post-search-intersects",
         )
 
@@ -287,16 +463,19 @@ class WebsiteTestUser(HttpUser):
         # Randomize GET / POST
         get_post = random.choice(["GET", "POST"])
         if get_post == "GET":
+            name = "get-search-collection"
             items_response = self.client.get(
-                f"/search?collections={collection_id}", name="get-search-collection"
+                f"/search?collections={collection_id}", name=name
             )
         elif get_post == "POST":
+            name = "post-search-collection"
             items_response = self.client.post(
-                "/search",
-                json={"collections": [collection_id]},
-                name="post-search-collection",
+                "/search", **json_body({"collections": [collection_id]}), name=name
             )
 
+        self.validate_response(
+            items_response, get_post, name, collections=[collection_id]
+        )
         self.parse_request_items(collection_id, items_response)
 
     @tag("intersects_sortby")
@@ -308,29 +487,24 @@ class WebsiteTestUser(HttpUser):
         This method simulates a more complex user interaction by selecting a random point
         within the bounding box of a randomly chosen collection. It then performs a search
         to find items that intersect with this point, also applying a randomized sort order.
+        With a query corpus (`--query-corpus`), the query is the corpus's next one instead.
         """
-        # Get the bbox of a random collection
-        collection_ids = self.get_collection_ids()
-        collection_id = random.choice(collection_ids)
-        bbox = self.get_collection_bbox(collection_id)
-
-        # Create random point inside bbox for /search intersects
-        x = random.random() * (bbox[2] - bbox[0]) + bbox[0]
-        y = random.random() * (bbox[3] - bbox[1]) + bbox[1]
-
         # Search (only POST possible for "intersects")
-        sortby = self.get_sortby("POST")
+        query = self.next_query("intersects")
+        name = self.search_name("post-multisearch-intersects")
         items_response = self.client.post(
             "/search",
-            json={
-                "collections": [collection_id],
-                "intersects": {"type": "Point", "coordinates": [x, y]},
-                "sortby": sortby,
-            },
-            name="post-multisearch-intersects",
+            **json_body(query.search_body("intersects")),
+            name=name,
         )
 
-        self.parse_request_items(collection_id, items_response)
+        self.validate_response(
+            items_response,
+            "POST",
+            name,
+            **self.query_expectation(query, point=query.bbox[:2]),
+        )
+        self.parse_request_items(query.collection_id, items_response)
 
     @tag("user_bbox")
     @task(default_load_multiplier)
@@ -341,40 +515,186 @@ class WebsiteTestUser(HttpUser):
         This method demonstrates a scenario where a user specifies an Area of Interest (AOI)
         as a bounding box within the bounding box of a randomly selected collection. It then
         performs a search (either GET or POST) to find items within this user-defined AOI,
-        applying a randomized sort order.
+        applying a randomized sort order. With a query corpus (`--query-corpus`), the query
+        is the corpus's next one instead.
         """
-        # Get the bbox of a random collection
-        collection_ids = self.get_collection_ids()
-        collection_id = random.choice(collection_ids)
-        bbox = self.get_collection_bbox(collection_id)
+        # Search, randomly using GET or POST
+        query = self.next_query("bbox")
+        if query.method == "GET":
+            name = self.search_name("get-multisearch-bbox")
+            items_response = self.client.get(query.search_url(), name=name)
+        elif query.method == "POST":
+            name = self.search_name("post-multisearch-bbox")
+            items_response = self.client.post(
+                "/search", **json_body(query.search_body("bbox")), name=name
+            )
 
-        # Create a random search bbox inside collection bbox
-        x = [random.random() * (bbox[2] - bbox[0]) + bbox[0] for _ in range(2)]
-        y = [random.random() * (bbox[3] - bbox[1]) + bbox[1] for _ in range(2)]
-        search_bbox = [min(x), min(y), max(x), max(y)]
+        self.validate_response(
+            items_response,
+            query.method,
+            name,
+            **self.query_expectation(query, bbox=query.bbox),
+        )
+        self.parse_request_items(query.collection_id, items_response)
 
-        # Search, randomly using GET or POST
+    @tag("filter_search", "datetime_search")
+    @task(default_load_multiplier)
+    def datetime_search(self):
+        """
+        Search a random collection over a datetime interval, with GET or POST.
+
+        Intervals fall within the collection's temporal extent and last from a day to
+        a quarter of it; some are open-ended (`../end` or `start/..`).
+        """
+        collection_id = random.choice(self.get_collection_ids())
+        interval = datetime_interval(self.catalog.interval(collection_id))
+        get_post = random.choice(["GET", "POST"])
+        if get_post == "GET":
+            name = "get-search-datetime"
+            response = self.client.get(
+                "/search",
+                params={"collections": collection_id, "datetime": interval},
+                name=name,
+            )
+        else:
+            name = "post-search-datetime"
+            response = self.client.post(
+                "/search",
+                **json_body({"collections": [collection_id], "datetime": interval}),
+                name=name,
+            )
+        self.validate_response(
+            response, get_post, name, collections=[collection_id], datetime=interval
+        )
+
+    @tag("filter_search", "cql2_json")
+    @task(default_load_multiplier)
+    def cql2_json_search(self):
+        """
+        Search a random collection with a CQL2-JSON filter (Filter extension).
+
+        The filter compares one or two of the properties the collection summarizes
+        (e.g. `platform`) and `eo:cloud_cover` to values within their summarized ranges.
+        """
+        collection_id = random.choice(self.get_collection_ids())
+        predicates = random_predicates(self.catalog.summary(collection_id))
+        self.client.post(
+            "/search",
+            **json_body(
+                {
+                    "collections": [collection_id],
+                    "filter-lang": "cql2-json",
+                    "filter": cql2_json(predicates),
+                }
+            ),
+            name="post-search-cql2-json",
+        )
+
+    @tag("filter_search", "cql2_text")
+    @task(default_load_multiplier)
+    def cql2_text_search(self):
+        """Search a random collection with a CQL2-text filter, as `cql2_json_search` but with GET."""
+        collection_id = random.choice(self.get_collection_ids())
+        predicates = random_predicates(self.catalog.summary(collection_id))
+        self.client.get(
+            "/search",
+            params={
+                "collections": collection_id,
+                "filter-lang": "cql2-text",
+                "filter": cql2_text(predicates),
+            },
+            name="get-search-cql2-text",
+        )
+
+    @tag("filter_search", "fields")
+    @task(default_load_multiplier)
+    def fields_search(self):
+        """Search a random collection, including and excluding random fields (Fields extension)."""
+        collection_id = random.choice(self.get_collection_ids())
+        fields = random_fields()
+        if random.choice(["GET", "POST"]) == "GET":
+            self.client.get(
+                "/search",
+                params={
+                    "collections": collection_id,
+                    "fields": fields_parameter(fields),
+                },
+                name="get-search-fields",
+            )
+        else:
+            self.client.post(
+                "/search",
+                **json_body({"collections": [collection_id], "fields": fields}),
+                name="post-search-fields",
+            )
+
+    @tag("filter_search", "query")
+    @task(default_load_multiplier)
+    def query_search(self):
+        """Search a random collection with the Query extension, on the same properties as the CQL2 tasks."""
+        collection_id = random.choice(self.get_collection_ids())
+        predicates = random_predicates(self.catalog.summary(collection_id))
+        self.client.post(
+            "/search",
+            **json_body(
+                {"collections": [collection_id], "query": query_extension(predicates)}
+            ),
+            name="post-search-query",
+        )
+
+    @tag("deep_paging", "paged_search")
+    @task(default_load_multiplier)
+    def deep_paged_search(self):
+        """
+        Page deep into a sorted collection search by following `next` links.
+
+        This method randomly chooses between GET (token in the `next` href) and POST
+        (body merged from the `next` link) pagination, and walks pages until the
+        configured depth or item count is reached. Each page depth is reported under
+        its own name, e.g. `post-search-paged-page-5`.
+        """
+        collection_id = random.choice(self.get_collection_ids())
         get_post = random.choice(["GET", "POST"])
         sortby = self.get_sortby(get_post)
         if get_post == "GET":
-            search_bbox_str = ",".join([str(x) for x in search_bbox])
-            items_response = self.client.get(
-                f"/search?collections={collection_id}&bbox={search_bbox_str}"
+            walk_pages(
+                self.client,
+                "GET",
+                f"/search?collections={collection_id}&limit={self.paging.limit}"
                 + f"&sortby={','.join(sortby)}",
-                name="get-multisearch-bbox",
+                "get-search-paged",
+                self.paging,
             )
         elif get_post == "POST":
-            items_response = self.client.post(
+            walk_pages(
+                self.client,
+                "POST",
                 "/search",
-                json={
+                "post-search-paged",
+                self.paging,
+                body={
                     "collections": [collection_id],
-                    "bbox": search_bbox,
+                    "limit": self.paging.limit,
                     "sortby": sortby,
                 },
-                name="post-multisearch-bbox",
             )
 
-        self.parse_request_items(collection_id, items_response)
+    @tag("deep_paging", "paged_item_collection")
+    @task(default_load_multiplier)
+    def deep_paged_item_collection(self):
+        """
+        Page deep into a collection's items by following `next` links.
+
+        Each page depth is reported under its own name, e.g. `get-items-paged-page-5`.
+        """
+        collection_id = random.choice(self.get_collection_ids())
+        walk_pages(
+            self.client,
+            "GET",
+            f"/collections/{collection_id}/items?limit={self.paging.limit}",
+            "get-items-paged",
+            self.paging,
+        )
 
     @tag("create_item")
     @task(0)
@@ -383,16 +703,98 @@ class WebsiteTestUser(HttpUser):
         Create a new item in a specified collection.
 
         This method simulates the creation of a new item in a test collection by posting
-        a JSON payload representing the item. The item ID is generated randomly to ensure
-        uniqueness.
+        a JSON payload representing the item. Item ids are built from the run, the worker
+        and a per-worker counter, so they never collide across users and workers.
         """
-        random_number = random.randint(1, 100000)
-        item = test_item
-        item["id"] = f"test-item-{random_number}"
-        item["collection"] = "test-collection"
-        self.client.post(
-            "/collections/test-collection/items", json=item, name="post-create-item"
-        )
+        self.writer.create()
+
+    @tag("writes")
+    @task(default_load_multiplier)
+    def write_workload(self):
+        """
+        Run a write operation: create, update (PUT), delete or bulk insert.
+
+        The operation is picked from the write mix (`--write-mix`). Only runs when a write
+        ratio is set (`--write-ratio`), or alone with `--tags writes`. Users only update and
+        delete the items they created.
+        """
+        self.writer.run()
+
+
+class ArrivalRateUser(OpenLoopMixin, WebsiteTestUser):
+    """
+    Issues the WebsiteTestUser tasks on a fixed arrival schedule (open model).
+
+    Requests are started at the rate of the arrival profile regardless of response times,
+    and their latency is measured from their intended start time. Only spawned in
+    arrival-rate mode (`--arrival-rate`).
+    """
+
+    arrival_profile = ArrivalProfile.from_env()
+    abstract = not arrival_profile.enabled
+
+
+if ArrivalRateUser.arrival_profile.enabled:
+    # Locust picks up shape classes defined in the locustfile, so only define it when needed
+
+    class ArrivalRateLoadShape(ArrivalRateShape):
+        """Run the arrival-rate dispatchers for the whole test."""
+
+        user_class = ArrivalRateUser
+        arrival_profile = ArrivalRateUser.arrival_profile
+
+
+class ScenarioUser(EngineUser):
+    """
+    Sends the weighted requests of a declarative scenario file (`--scenario`).
+
+    The scenario is compiled once per process into request builders, which draw their
+    parameters (collections, bboxes inside the collection extents, datetime windows,
+    CQL2 filters, limits) on every request. Only spawned when a scenario is set.
+
+    Attributes:
+        scenario (Scenario): The compiled scenario.
+    """
+
+    host = os.getenv("LOCUST_HOST", "http://localhost:8083")
+    scenario = get_scenario()
+    abstract = scenario is None
+    if scenario is not None:
+        tasks = scenario.tasks()
+        wait_time = scenario.wait_time()
+
+    def on_start(self):
+        """Fetch the shared collection catalog before the first request."""
+        self.catalog = get_collection_catalog()
+        self.catalog.ensure(self)
+
+
+class LogReplayUser(EngineUser):
+    """
+    Re-issues the requests of a production access log (`--replay`).
+
+    Each worker streams its own shard of the log, shared by its users. In timed mode
+    requests are sent at their logged pace (scaled by `--replay-speed`) and their latency
+    is measured from when they were due; in max-speed mode they are sent back to back.
+
+    Attributes:
+        replay (ReplaySettings): The access log and replay mode.
+    """
+
+    host = os.getenv("LOCUST_HOST", "http://localhost:8083")
+    wait_time = constant(0)
+    replay = ReplaySettings.from_env()
+    abstract = not replay.enabled
+
+    def on_start(self):
+        """Attach the user to its worker's shard of the log."""
+        self.client = ScheduledClient(self.client)
+        self.source = get_replay_source(worker_index(self))
+
+    @task
+    def replay_request(self):
+        """Send the next request of the log once it is due."""
+        self.source.replay_next(self.client)
 
 
 # Run tests in debugger if launched directly,
@@ -0,0 +1,149 @@
+"""On-disk checkpoints of ingest runs."""
+import json
+import os
+import threading
+import time
+from typing import Iterable, List, Optional, Set
+
+# Seconds between two writes of the checkpoint file during a run
+CHECKPOINT_INTERVAL = 5.0
+
+
+def to_ranges(offsets: Iterable[int]) -> List[List[int]]:
+    """Return sorted offsets as `[start, end)` ranges of consecutive offsets."""
+    ranges: List[List[int]] = []
+    for offset in sorted(offsets):
+        if ranges and ranges[-1][1] == offset:
+            ranges[-1][1] += 1
+        else:
+            ranges.append([offset, offset + 1])
+    return ranges
+
+
+def from_ranges(ranges: Iterable[List[int]]) -> Set[int]:
+    """Return the offsets of `[start, end)` ranges."""
+    return {offset for start, end in ranges for offset in range(start, end)}
+
+
+def ingest_source(
+    n_items: Optional[int] = None,
+    n_collections: int = 1,
+    seed: int = 0,
+    items_file: Optional[str] = None,
+) -> str:
+    """
+    Describe the items of an ingest, so a checkpoint is only resumed on the same items.
+
+    Args:
+        n_items (int, optional): The number of synthetic items, the sample items if None.
+        n_collections (int): The number of collections synthetic items are spread across.
+        seed (int): The seed of the synthetic corpus.
+        items_file (str, optional): The item file the items are read from.
+
+    Returns:
+        str: The description, e.g. `generated:items=1000000,collections=20,seed=0`.
+    """
+    if items_file is not None:
+        path = os.path.abspath(items_file)
+        return f"file:{path}:{os.path.getsize(path)}"
+    if n_items is not None:
+        return f"generated:items={n_items},collections={n_collections},seed={seed}"
+    return "sample"
+
+
+class IngestCheckpoint:
+    """
+    Compact on-disk record of the progress of an ingest run, to resume it.
+
+    The items of an ingest always come in the same order for the same source, so
+    progress is recorded as offsets in that order instead of item ids: every item
+    below `offset` was resolved, and the ones that failed are kept as ranges to be
+    retried. Workers resolve batches out of order, so resolved offsets past `offset`
+    wait in memory until the gap below them closes. They are bounded by the items in
+    flight and in the per-collection buffers, and are posted again after a crash.
+
+    Attributes:
+        path (str): The checkpoint file.
+        source (str): The description of the ingested items, see `ingest_source`.
+        offset (int): The offset below which every item was resolved.
+        failed (set): The offsets of the items that failed.
+        interval (float): The seconds between two writes of the checkpoint file.
+    """
+
+    def __init__(self, path: str, source: str, interval: float = CHECKPOINT_INTERVAL):
+        """Start an empty checkpoint, written to `path`."""
+        self.path = path
+        self.source = source
+        self.interval = interval
+        self.offset = 0
+        self.failed: Set[int] = set()
+        self._resolved: Set[int] = set()
+        self._saved = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """
+        Load the checkpoint file, if any.
+
+        Returns:
+            bool: True if a previous run is resumed.
+
+        Raises:
+            ValueError: If the checkpoint was written for other items.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r") as file:
+            state = json.load(file)
+        if state.get("source") != self.source:
+            raise ValueError(
+                f"Checkpoint {self.path} was written for {state.get('source')}, not "
+                + f"{self.source}. Delete it to start over."
+            )
+        self.offset = state["offset"]
+        self.failed = from_ranges(state["failed"])
+        return True
+
+    def committed(self, offset: int) -> bool:
+        """Return True if the item at `offset` was ingested, or already existed."""
+        return offset < self.offset and offset not in self.failed
+
+    def resolve(self, offsets: List[int], failed: bool = False):
+        """
+        Record the outcome of items, writing the checkpoint file if it is due.
+
+        Args:
+            offsets (list): The offsets of the items.
+            failed (bool): True if the items could not be ingested.
+        """
+        with self._lock:
+            for offset in offsets:
+                if failed:
+                    self.failed.add(offset)
+                else:
+                    self.failed.discard(offset)
+                if offset >= self.offset:
+                    self._resolved.add(offset)
+            while self.offset in self._resolved:
+                self._resolved.remove(self.offset)
+                self.offset += 1
+            if time.monotonic() - self._saved >= self.interval:
+                self._save()
+
+    def save(self):
+        """Write the checkpoint file."""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        """Write the checkpoint file atomically, holding the lock."""
+        state = {
+            "source": self.source,
+            "offset": self.offset,
+            "failed": to_ranges(o for o in self.failed if o < self.offset),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.path)
+        self._saved = time.monotonic()
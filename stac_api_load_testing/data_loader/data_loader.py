@@ -1,16 +1,21 @@
 """data loader."""
 import json
+from typing import Iterable, Iterator, List, Optional
 
 import click
-import requests
-from pkg_resources import resource_filename  # type: ignore
+
+from ..resources import resource_path
+from .generator import DEFAULT_COLLECTION_ID, collection_ids, generate_items
+from .item_files import read_items
+
+SAMPLE_ITEMS_FILE = "sentinel-s2-l2a-cogs_0_100.ndjson.gz"
 
 
 def load_data(filename):
     """Load json data."""
     try:
         # Adjust the path to reflect the setup_data location within the data_loader directory
-        file_path = resource_filename(__name__, f"setup_data/{filename}")
+        file_path = resource_path(__name__, f"setup_data/{filename}")
         with open(file_path, "r") as file:
             return json.load(file)
     except FileNotFoundError:
@@ -18,13 +23,30 @@ def load_data(filename):
         return None
 
 
-def load_collection(collection_id: str, stac_api_base_url: str):
+def load_sample_items() -> List[dict]:
+    """Load the bundled sample items, stored as gzipped NDJSON."""
+    try:
+        return list(
+            read_items(resource_path(__name__, f"setup_data/{SAMPLE_ITEMS_FILE}"))
+        )
+    except FileNotFoundError:
+        click.secho(
+            f"File {SAMPLE_ITEMS_FILE} not found in package resources.", fg="red"
+        )
+        return []
+
+
+def load_collection(collection_id: str, stac_api_base_url: str, session=None):
     """Load stac collection into the database."""
+    # Imported here, the seed index and the stub server only read the sample data
+    import requests
+
     collection = load_data("collection.json")
     if collection:
         collection["id"] = collection_id
         try:
-            resp = requests.post(f"{stac_api_base_url}/collections", json=collection)
+            post = session.post if session is not None else requests.post
+            resp = post(f"{stac_api_base_url}/collections", json=collection)
             if resp.status_code in [200, 201]:  # Added 201 for created status code
                 click.secho(f"Added collection: {collection['id']}", fg="green")
             elif resp.status_code == 409:
@@ -37,24 +59,123 @@ def load_collection(collection_id: str, stac_api_base_url: str):
             click.secho("Failed to connect to API.", fg="red")
 
 
-def load_items(stac_api_base_url: str):
-    """Load stac items into the database."""
-    feature_collection = load_data("sentinel-s2-l2a-cogs_0_100.json")
-    if feature_collection:
-        collection = "test-collection"
-        load_collection(collection_id=collection, stac_api_base_url=stac_api_base_url)
+def create_collections(
+    items: Iterable[dict], stac_api_base_url: str, session=None
+) -> Iterator[dict]:
+    """
+    Stream items, creating each collection before the first of its items is sent.
 
-        for feature in feature_collection["features"]:
-            try:
-                feature["collection"] = collection
-                resp = requests.post(
-                    f"{stac_api_base_url}/collections/{collection}/items", json=feature
-                )
-                if resp.status_code in [200, 201]:  # Added 201 for created status code
-                    click.secho(f"Added item: {feature['id']}", fg="green")
-                elif resp.status_code == 409:
-                    click.secho(f"Item: {feature['id']} already exists", fg="yellow")
-                else:
-                    click.secho(f"Error {resp.status_code}: {resp.text}", fg="red")
-            except requests.ConnectionError:
-                click.secho("Failed to connect to API.", fg="red")
+    Items without a collection are added to `test-collection`.
+
+    Args:
+        items (Iterable[dict]): The items, e.g. streamed from an item file.
+        stac_api_base_url (str): The base URL of the STAC API.
+        session (requests.Session, optional): The session the collections are posted with.
+
+    Returns:
+        Iterator[dict]: The items.
+    """
+    created = set()
+    for item in items:
+        collection_id = item["collection"] = (
+            item.get("collection") or DEFAULT_COLLECTION_ID
+        )
+        if collection_id not in created:
+            load_collection(collection_id, stac_api_base_url, session=session)
+            created.add(collection_id)
+        yield item
+
+
+def load_items(
+    stac_api_base_url: str,
+    concurrency: int = 8,
+    batch_size: int = 100,
+    max_retries: int = 3,
+    use_bulk: bool = True,
+    n_items: Optional[int] = None,
+    n_collections: int = 1,
+    seed: int = 0,
+    items_file: Optional[str] = None,
+    checkpoint=None,
+    precheck: bool = False,
+):
+    """
+    Load stac items into the database.
+
+    By default the bundled sample items are loaded into `test-collection`. When `n_items`
+    is set, that many synthetic items are generated from the sample items instead and
+    streamed into the API across `n_collections` collections. When `items_file` is set,
+    its items are streamed into the API instead, into their own collections.
+
+    With a checkpoint, the items it records as committed are skipped and progress is
+    saved as the run goes, so an interrupted ingest resumes where it stopped.
+
+    Args:
+        stac_api_base_url (str): The base URL of the STAC API.
+        concurrency (int): The number of concurrent ingest workers.
+        batch_size (int): The number of items per bulk items request.
+        max_retries (int): The number of retries on 5xx responses and connection errors.
+        use_bulk (bool): Use the bulk items endpoint when the server supports it.
+        n_items (int, optional): The number of synthetic items to generate.
+        n_collections (int): The number of collections synthetic items are spread across.
+        seed (int): The seed of the synthetic corpus.
+        items_file (str, optional): An NDJSON, FeatureCollection or stac-geoparquet file
+            of items, read incrementally while the items are sent.
+        checkpoint (IngestCheckpoint, optional): The loaded checkpoint of the run.
+        precheck (bool): Look items up with `GET /search?ids=` before posting them.
+
+    Returns:
+        IngestReport: The throughput report of the run, or None if no data was loaded.
+    """
+    from .ingest import BulkIngester, create_session
+
+    features = load_sample_items() if items_file is None else []
+    if features or items_file is not None:
+        session = create_session(concurrency, max_retries=max_retries)
+
+        collections: List[str] = []
+        items: Iterable[dict]
+        if items_file is not None:
+            # Collections are created as the reader reaches them
+            items = create_collections(
+                read_items(items_file), stac_api_base_url, session=session
+            )
+        elif n_items is None:
+            collections = [DEFAULT_COLLECTION_ID]
+            items = features
+            for feature in features:
+                feature["collection"] = DEFAULT_COLLECTION_ID
+        else:
+            collections = collection_ids(n_collections)
+            items = generate_items(
+                features,
+                n_items,
+                n_collections=n_collections,
+                seed=seed,
+            )
+
+        for collection in collections:
+            load_collection(
+                collection_id=collection,
+                stac_api_base_url=stac_api_base_url,
+                session=session,
+            )
+
+        ingester = BulkIngester(
+            stac_api_base_url,
+            session,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            use_bulk=use_bulk,
+            checkpoint=checkpoint,
+            precheck=precheck,
+        )
+        report = ingester.run(items)
+        report.echo()
+        if checkpoint is not None:
+            click.echo(
+                f"Checkpoint {checkpoint.path}: {checkpoint.offset} items done, "
+                f"{len(checkpoint.failed)} failed"
+            )
+        return report
+    return None
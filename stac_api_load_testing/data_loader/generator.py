@@ -0,0 +1,182 @@
+"""Synthetic STAC item generator."""
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
+
+DEFAULT_COLLECTION_ID = "test-collection"
+DATETIME_START = datetime(2015, 6, 27, tzinfo=timezone.utc)
+DATETIME_END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+MAX_LATITUDE = 80.0
+MAX_TEMPLATE_WIDTH = 10.0
+
+
+def collection_id_for(index: int) -> str:
+    """
+    Return the id of a generated collection.
+
+    The first collection keeps the name used by the bundled sample data, so tasks
+    targeting `test-collection` work against both seed and generated corpora.
+
+    Args:
+        index (int): The collection number.
+
+    Returns:
+        str: The collection id.
+    """
+    return DEFAULT_COLLECTION_ID if index == 0 else f"{DEFAULT_COLLECTION_ID}-{index}"
+
+
+def collection_ids(n_collections: int) -> List[str]:
+    """Return the ids of all generated collections."""
+    return [collection_id_for(index) for index in range(max(n_collections, 1))]
+
+
+def item_id_for(index: int) -> str:
+    """Return the id of the generated item at `index`."""
+    return f"synthetic-{index:010d}"
+
+
+class ItemGenerator:
+    """
+    Generate synthetic STAC items from the bundled features used as templates.
+
+    Every item is a pure function of the seed and its index: its footprint is a template
+    footprint moved to a random location, with a random datetime and `eo:cloud_cover`.
+    Items are assigned to collections round-robin. Because nothing is kept between items,
+    the same item can be rebuilt in O(1) anywhere (e.g. in Locust workers) and streaming
+    any number of items uses constant memory.
+
+    Attributes:
+        templates (list): The template features.
+        n_collections (int): The number of collections the items are spread across.
+        seed (int): The seed of the generated corpus.
+    """
+
+    def __init__(self, templates: List[dict], n_collections: int = 1, seed: int = 0):
+        """Initialize the generator from a list of template features."""
+        self.templates = [
+            feature
+            for feature in templates
+            if feature["bbox"][2] - feature["bbox"][0] <= MAX_TEMPLATE_WIDTH
+        ]
+        if not self.templates:
+            raise ValueError("No usable template features to generate items from.")
+        self.n_collections = max(n_collections, 1)
+        self.seed = seed
+        self._cloud_covers = [
+            feature["properties"].get("eo:cloud_cover", 0.0)
+            for feature in self.templates
+        ]
+        self._time_span = (DATETIME_END - DATETIME_START).total_seconds()
+
+    def _rng(self, index: int) -> random.Random:
+        """Return the random generator dedicated to the item at `index`."""
+        return random.Random(self.seed * 1_000_003 + index)
+
+    def collection_id(self, index: int) -> str:
+        """Return the collection of the item at `index`."""
+        return collection_id_for(index % self.n_collections)
+
+    def footprint(self, index: int):
+        """
+        Return the template and the longitude/latitude offsets of the item at `index`.
+
+        Returns:
+            tuple: The template feature, the x offset, the y offset and the item's random
+                generator, positioned to draw the remaining properties.
+        """
+        rng = self._rng(index)
+        template = self.templates[rng.randrange(len(self.templates))]
+        minx, miny, maxx, maxy = template["bbox"]
+        half_width, half_height = (maxx - minx) / 2, (maxy - miny) / 2
+
+        # Uniform over the sphere's area, away from the poles and the antimeridian
+        lon = rng.uniform(-180.0 + half_width, 180.0 - half_width)
+        sin_lat = rng.uniform(
+            math.sin(math.radians(-MAX_LATITUDE)), math.sin(math.radians(MAX_LATITUDE))
+        )
+        lat = math.degrees(math.asin(sin_lat))
+        return template, lon - (minx + half_width), lat - (miny + half_height), rng
+
+    def bbox(self, index: int) -> List[float]:
+        """Return the bbox of the item at `index` without building the item."""
+        template, dx, dy, _ = self.footprint(index)
+        minx, miny, maxx, maxy = template["bbox"]
+        return [minx + dx, miny + dy, maxx + dx, maxy + dy]
+
+    def item(self, index: int) -> dict:
+        """
+        Build the item at `index`.
+
+        The returned item shares its assets with the template, so it must not be mutated
+        in place.
+
+        Args:
+            index (int): The item number.
+
+        Returns:
+            dict: The STAC item.
+        """
+        template, dx, dy, rng = self.footprint(index)
+        minx, miny, maxx, maxy = template["bbox"]
+        coordinates = [
+            [[x + dx, y + dy] for x, y in ring]
+            for ring in template["geometry"]["coordinates"]
+        ]
+
+        timestamp = DATETIME_START + timedelta(seconds=rng.random() * self._time_span)
+        cloud_cover = rng.choice(self._cloud_covers) + rng.uniform(-5.0, 5.0)
+
+        properties = dict(template["properties"])
+        properties["datetime"] = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        properties["eo:cloud_cover"] = round(min(max(cloud_cover, 0.0), 100.0), 2)
+
+        item = dict(template)
+        item["id"] = item_id_for(index)
+        item["collection"] = self.collection_id(index)
+        item["bbox"] = [minx + dx, miny + dy, maxx + dx, maxy + dy]
+        item["geometry"] = {
+            "type": template["geometry"]["type"],
+            "coordinates": coordinates,
+        }
+        item["properties"] = properties
+        item["links"] = []
+        return item
+
+    def generate(self, n_items: int, start: int = 0) -> Iterator[dict]:
+        """
+        Lazily yield `n_items` items.
+
+        Args:
+            n_items (int): The number of items to generate.
+            start (int): The index of the first item.
+
+        Yields:
+            dict: The next STAC item.
+        """
+        for index in range(start, start + n_items):
+            yield self.item(index)
+
+
+def generate_items(
+    templates: List[dict],
+    n_items: int,
+    n_collections: int = 1,
+    seed: int = 0,
+) -> Iterator[dict]:
+    """
+    Lazily yield `n_items` synthetic items spread across `n_collections` collections.
+
+    Args:
+        templates (list): The template features.
+        n_items (int): The number of items to generate.
+        n_collections (int): The number of collections the items are spread across.
+        seed (int): The seed of the generated corpus.
+
+    Returns:
+        Iterator[dict]: The generated items.
+    """
+    return ItemGenerator(templates, n_collections=n_collections, seed=seed).generate(
+        n_items
+    )
@@ -0,0 +1,408 @@
+"""Concurrent bulk ingest engine."""
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import click
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..workload.histograms import new_histogram
+from .checkpoint import IngestCheckpoint
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+BULK_UNSUPPORTED_STATUS_CODES = (404, 405, 501)
+# Body of the Transaction extension's bulk items response, e.g. "Successfully added 10 Items."
+BULK_ADDED_PATTERN = re.compile(r"Successfully added (\d+) items", re.IGNORECASE)
+
+# An item and its offset in the ingested stream
+Entry = Tuple[int, dict]
+
+
+def create_session(
+    concurrency: int, max_retries: int = 3, backoff_factor: float = 0.5
+) -> requests.Session:
+    """
+    Create a pooled HTTP session that retries 5xx responses and connection errors.
+
+    Args:
+        concurrency (int): The number of worker threads sharing the session, used to size the connection pool.
+        max_retries (int): The maximum number of retries per request.
+        backoff_factor (float): The exponential backoff factor between retries, in seconds.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=None,  # retry POSTs too, a duplicate create is reported as a 409
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=concurrency, pool_maxsize=concurrency, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class IngestReport:
+    """
+    Thread-safe counters and per-POST latencies collected during an ingest run.
+
+    Latencies are recorded into an HdrHistogram, whose size is fixed whatever the
+    number of requests.
+
+    Attributes:
+        created (int): The number of items the API created.
+        existing (int): The number of items rejected as already existing (409), or left
+            out of a bulk insert's count of added items. A bulk insert rejected with a
+            409 is posted again item by item.
+        accepted (int): The number of items of bulk requests the API accepted without
+            saying how many it added.
+        failed (int): The number of items that could not be ingested.
+        skipped (int): The number of items not posted, because a checkpoint or the
+            existence pre-check showed they were already ingested.
+        latencies (HdrHistogram): The latencies of the POST requests, in microseconds.
+    """
+
+    def __init__(self):
+        """Start the run clock with empty counters."""
+        self.created = 0
+        self.existing = 0
+        self.accepted = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latencies = new_histogram()
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, created=0, existing=0, failed=0, accepted=0):
+        """Record the outcome of a single POST request."""
+        with self._lock:
+            self.latencies.record_value(max(int(latency * 1_000_000), 1))
+            self.created += created
+            self.existing += existing
+            self.accepted += accepted
+            self.failed += failed
+
+    def record_failure(self, count: int):
+        """Record items that failed without a response from the API."""
+        with self._lock:
+            self.failed += count
+
+    def record_skipped(self, count: int):
+        """Record items that were not posted because they were already ingested."""
+        with self._lock:
+            self.skipped += count
+
+    def finish(self):
+        """Stop the run clock."""
+        self.finished = time.perf_counter()
+
+    @property
+    def total(self) -> int:
+        """Return the number of items processed, skipped items excluded."""
+        return self.created + self.existing + self.accepted + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        """Return the wall-clock duration of the run, in seconds."""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    @property
+    def items_per_second(self) -> float:
+        """Return the ingest throughput."""
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Return a per-POST latency percentile, at the histogram's 3 significant figures.
+
+        Args:
+            q (float): The percentile to compute, between 0 and 100.
+
+        Returns:
+            float: The latency in seconds, or 0.0 if nothing was posted.
+        """
+        if not self.latencies.get_total_count():
+            return 0.0
+        return self.latencies.get_value_at_percentile(q) / 1_000_000
+
+    def echo(self):
+        """Print the throughput report."""
+        accepted = f"{self.accepted} accepted, " if self.accepted else ""
+        click.secho(
+            f"Ingested {self.total} items in {self.elapsed:.2f}s "
+            f"({self.items_per_second:.1f} items/s): {self.created} created, "
+            f"{self.existing} already existed, {accepted}{self.failed} failed, "
+            f"{self.skipped} skipped",
+            fg="red" if self.failed else "green",
+        )
+        click.echo(
+            f"POST latency over {self.latencies.get_total_count()} requests: "
+            f"p50 {self.percentile(50) * 1000:.1f} ms, "
+            f"p99 {self.percentile(99) * 1000:.1f} ms"
+        )
+
+
+class BulkIngester:
+    """
+    Post STAC items to an API from a bounded pool of worker threads.
+
+    Items are grouped per collection and sent to the Transaction extension's
+    `POST /collections/{id}/bulk_items` endpoint. If the server does not expose it,
+    the ingester falls back to one `POST /collections/{id}/items` per item.
+
+    With a checkpoint, items committed by a previous run are skipped and the outcome of
+    every item is recorded. With `precheck`, each batch is first looked up with
+    `GET /search?ids=` and the items the API already holds are skipped.
+
+    Attributes:
+        stac_api_base_url (str): The base URL of the STAC API.
+        session (requests.Session): The pooled session shared by the workers.
+        concurrency (int): The number of worker threads.
+        batch_size (int): The number of items per bulk request.
+        use_bulk (bool): Whether the bulk items endpoint is used.
+        checkpoint (IngestCheckpoint, optional): The progress of the run.
+        precheck (bool): Whether items are looked up before being posted.
+    """
+
+    def __init__(
+        self,
+        stac_api_base_url: str,
+        session: requests.Session,
+        concurrency: int = 8,
+        batch_size: int = 100,
+        use_bulk: bool = True,
+        checkpoint: Optional[IngestCheckpoint] = None,
+        precheck: bool = False,
+    ):
+        """Initialize the ingester."""
+        self.stac_api_base_url = stac_api_base_url
+        self.session = session
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = max(batch_size, 1)
+        self.use_bulk = use_bulk
+        self.checkpoint = checkpoint
+        self.precheck = precheck
+
+    def run(self, items: Iterable[dict]) -> IngestReport:
+        """
+        Ingest items, keeping at most a few batches in memory at once.
+
+        Args:
+            items (Iterable[dict]): The items to ingest, each with its `collection` set.
+
+        Returns:
+            IngestReport: The counters and latencies of the run.
+        """
+        report = IngestReport()
+        stream: Iterator[Entry] = self._pending(items, report)
+
+        try:
+            if self.use_bulk:
+                # Probe bulk support synchronously with the first batch
+                head = list(itertools.islice(stream, self.batch_size))
+                if head:
+                    collection_id = head[0][1]["collection"]
+                    probe = [e for e in head if e[1]["collection"] == collection_id]
+                    self._ingest_batch(collection_id, probe, report)
+                    head = [e for e in head if e[1]["collection"] != collection_id]
+                stream = itertools.chain(head, stream)
+            batches = self._batches(stream)
+
+            max_in_flight = self.concurrency * 2
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                pending: Set[Future] = set()
+                for collection_id, batch in batches:
+                    if len(pending) >= max_in_flight:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(
+                        executor.submit(
+                            self._ingest_batch, collection_id, batch, report
+                        )
+                    )
+                for future in wait(pending).done:
+                    future.result()
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.save()
+
+        report.finish()
+        return report
+
+    def _pending(self, items: Iterable[dict], report: IngestReport) -> Iterator[Entry]:
+        """Yield the items with their offset, skipping those committed by a previous run."""
+        for offset, item in enumerate(items):
+            if self.checkpoint is not None and self.checkpoint.committed(offset):
+                report.record_skipped(1)
+            else:
+                yield offset, item
+
+    def _batches(self, entries: Iterator[Entry]) -> Iterator[Tuple[str, List[Entry]]]:
+        """Group items into per-collection batches of `batch_size` (1 without bulk)."""
+        size = self.batch_size if self.use_bulk else 1
+        buffers: Dict[str, List[Entry]] = {}
+        for entry in entries:
+            collection_id = entry[1]["collection"]
+            buffer = buffers.setdefault(collection_id, [])
+            buffer.append(entry)
+            if len(buffer) >= size:
+                yield collection_id, buffer
+                buffers[collection_id] = []
+        for collection_id, buffer in buffers.items():
+            if buffer:
+                yield collection_id, buffer
+
+    def _resolve(self, batch: List[Entry], failed: bool = False):
+        """Record the outcome of items in the checkpoint, if any."""
+        if self.checkpoint is not None:
+            self.checkpoint.resolve([offset for offset, _ in batch], failed=failed)
+
+    def _ingest_batch(
+        self, collection_id: str, batch: List[Entry], report: IngestReport
+    ):
+        """Post a batch, counting its items as failed if posting it raises."""
+        try:
+            self._post_batch(collection_id, batch, report)
+        except Exception as e:
+            click.secho(
+                f"Failed to ingest {len(batch)} items of {collection_id}: {e!r}",
+                fg="red",
+            )
+            report.record_failure(len(batch))
+            self._resolve(batch, failed=True)
+
+    def _post_batch(self, collection_id: str, batch: List[Entry], report: IngestReport):
+        """Post a batch through the bulk endpoint, or item by item without it."""
+        if self.precheck:
+            batch = self._missing(collection_id, batch, report)
+            if not batch:
+                return
+        if self.use_bulk:
+            if self._post_bulk(collection_id, batch, report):
+                return
+            if self.use_bulk:
+                self.use_bulk = False
+                click.secho(
+                    "Bulk items endpoint not available, falling back to per-item POSTs.",
+                    fg="yellow",
+                )
+        for entry in batch:
+            self._post_item(collection_id, entry, report)
+
+    def _missing(
+        self, collection_id: str, batch: List[Entry], report: IngestReport
+    ) -> List[Entry]:
+        """
+        Return the items of a batch that the API does not hold yet.
+
+        The batch is looked up with a single `GET /search?ids=` request. If the lookup
+        fails, every item is posted and the existing ones are reported as 409s.
+        """
+        ids = [item["id"] for _, item in batch]
+        try:
+            resp = self.session.get(
+                f"{self.stac_api_base_url}/search",
+                params={
+                    "collections": collection_id,
+                    "ids": ",".join(ids),
+                    "limit": str(len(ids)),
+                    "fields": "id",
+                },
+            )
+            if resp.status_code != 200:
+                return batch
+            existing = {feature["id"] for feature in resp.json()["features"]}
+        except (requests.RequestException, ValueError, KeyError):
+            return batch
+
+        found = [entry for entry in batch if entry[1]["id"] in existing]
+        report.record_skipped(len(found))
+        self._resolve(found)
+        return [entry for entry in batch if entry[1]["id"] not in existing]
+
+    def _post_bulk(
+        self, collection_id: str, batch: List[Entry], report: IngestReport
+    ) -> bool:
+        """
+        Post a batch to the bulk items endpoint.
+
+        Returns:
+            bool: False if the server does not support bulk items, True otherwise.
+        """
+        url = f"{self.stac_api_base_url}/collections/{collection_id}/bulk_items"
+        body: Dict[str, Any] = {
+            "items": {item["id"]: item for _, item in batch},
+            "method": "insert",
+        }
+        try:
+            start = time.perf_counter()
+            resp = self.session.post(url, json=body)
+            latency = time.perf_counter() - start
+        except requests.RequestException as e:
+            click.secho(f"Failed to connect to API: {e}", fg="red")
+            report.record_failure(len(batch))
+            self._resolve(batch, failed=True)
+            return True
+
+        if resp.status_code in BULK_UNSUPPORTED_STATUS_CODES:
+            return False
+        if resp.status_code in [200, 201]:
+            added = BULK_ADDED_PATTERN.search(resp.text)
+            if added is None:
+                report.record(latency, accepted=len(batch))
+            else:
+                created = min(int(added.group(1)), len(batch))
+                report.record(latency, created=created, existing=len(batch) - created)
+            self._resolve(batch)
+        elif resp.status_code == 409:
+            # An insert is rejected as a whole if any item exists, so the new items of
+            # the batch were not written: post them one by one to tell them apart
+            report.record(latency)
+            for entry in batch:
+                self._post_item(collection_id, entry, report)
+        else:
+            click.secho(f"Error {resp.status_code}: {resp.text}", fg="red")
+            report.record(latency, failed=len(batch))
+            self._resolve(batch, failed=True)
+        return True
+
+    def _post_item(self, collection_id: str, entry: Entry, report: IngestReport):
+        """Post a single item to the items endpoint."""
+        url = f"{self.stac_api_base_url}/collections/{collection_id}/items"
+        try:
+            start = time.perf_counter()
+            resp = self.session.post(url, json=entry[1])
+            latency = time.perf_counter() - start
+        except requests.RequestException as e:
+            click.secho(f"Failed to connect to API: {e}", fg="red")
+            report.record_failure(1)
+            self._resolve([entry], failed=True)
+            return
+
+        if resp.status_code in [200, 201]:
+            report.record(latency, created=1)
+            self._resolve([entry])
+        elif resp.status_code == 409:
+            report.record(latency, existing=1)
+            self._resolve([entry])
+        else:
+            click.secho(f"Error {resp.status_code}: {resp.text}", fg="red")
+            report.record(latency, failed=1)
+            self._resolve([entry], failed=True)
@@ -0,0 +1,157 @@
+"""Streaming readers of STAC item files."""
+import gzip
+import io
+import json
+import os
+from importlib import import_module
+from typing import IO, Callable, Iterator
+
+from ..workload.codec import loads
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl", ".geojsonl")
+GEOPARQUET_SUFFIXES = (".parquet", ".geoparquet")
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+# Rows converted to items at once when reading stac-geoparquet
+PARQUET_BATCH_SIZE = 1000
+
+
+def split_compression(path: str) -> tuple:
+    """Return the path without its compression suffix, and the suffix (empty if none)."""
+    root, suffix = os.path.splitext(path)
+    if suffix.lower() in COMPRESSION_SUFFIXES:
+        return root, suffix.lower()
+    return path, ""
+
+
+def import_optional(module: str, extra: str, purpose: str):
+    """
+    Import an optional dependency.
+
+    Args:
+        module (str): The module, e.g. `zstandard`.
+        extra (str): The package extra installing it, e.g. `zstd`.
+        purpose (str): What requires it, e.g. `Reading .zst files`.
+
+    Returns:
+        module: The imported module.
+
+    Raises:
+        ImportError: If the module is missing, with the command installing it.
+    """
+    try:
+        return import_module(module)
+    except ImportError:
+        raise ImportError(
+            f"{purpose} requires {module.partition('.')[0]}, install it with "
+            + f"`pip install stac-api-load-testing[{extra}]`"
+        )
+
+
+def open_text(path: str) -> IO[str]:
+    """
+    Open a text file for reading, decompressing `.gz` and `.zst` files on the fly.
+
+    Raises:
+        ImportError: If the file is zstd-compressed and zstandard is missing.
+    """
+    _, compression = split_compression(path)
+    if compression == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == ".zst":
+        zstandard = import_optional("zstandard", "zstd", "Reading .zst files")
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+            encoding="utf-8",
+        )
+    return open(path, "r", encoding="utf-8")
+
+
+def read_ndjson(path: str) -> Iterator[dict]:
+    """Stream the items of a newline-delimited JSON file, one item per line."""
+    with open_text(path) as file:
+        for line in file:
+            if line.strip():
+                yield loads(line)
+
+
+def read_feature_collection(path: str) -> Iterator[dict]:
+    """Return the items of a FeatureCollection JSON file, which is parsed at once."""
+    with open_text(path) as file:
+        yield from json.load(file)["features"]
+
+
+def read_geoparquet(path: str) -> Iterator[dict]:
+    """
+    Stream the items of a stac-geoparquet file, a batch of rows at a time.
+
+    Raises:
+        ImportError: If stac-geoparquet or pyarrow is missing.
+    """
+    pa = import_optional("pyarrow", "geoparquet", "Reading stac-geoparquet files")
+    parquet = import_optional(
+        "pyarrow.parquet", "geoparquet", "Reading stac-geoparquet files"
+    )
+    arrow = import_optional(
+        "stac_geoparquet.arrow", "geoparquet", "Reading stac-geoparquet files"
+    )
+    for batch in parquet.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_SIZE):
+        yield from arrow.stac_table_to_items(pa.Table.from_batches([batch]))
+
+
+def item_reader(path: str) -> Callable[[str], Iterator[dict]]:
+    """
+    Return the reader of an item file, picked from its extension.
+
+    Args:
+        path (str): An NDJSON (`.ndjson`, `.jsonl`, `.geojsonl`), FeatureCollection
+            (`.json`, `.geojson`) or stac-geoparquet (`.parquet`, `.geoparquet`) file.
+            JSON files may be gzip (`.gz`) or zstd (`.zst`) compressed.
+
+    Returns:
+        callable: The reader, streaming the items of the file.
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    root, compression = split_compression(path)
+    extension = os.path.splitext(root)[1].lower()
+    if extension in NDJSON_SUFFIXES:
+        return read_ndjson
+    if extension in (".json", ".geojson"):
+        return read_feature_collection
+    if extension in GEOPARQUET_SUFFIXES and not compression:
+        return read_geoparquet
+    raise ValueError(
+        f"Unsupported item file '{path}', expected .ndjson, .jsonl, .json or .parquet "
+        + "(JSON files optionally .gz or .zst compressed)"
+    )
+
+
+def read_items(path: str) -> Iterator[dict]:
+    """
+    Stream the items of a file, keeping only the current line or batch in memory.
+
+    FeatureCollection JSON files are the exception: they are parsed at once.
+
+    Args:
+        path (str): The item file, see `item_reader`.
+
+    Returns:
+        Iterator[dict]: The items, in file order.
+    """
+    return item_reader(path)(path)
+
+
+def check_item_file(path: str):
+    """
+    Check that an item file can be read, without reading it.
+
+    Raises:
+        ValueError: If the extension is not supported.
+        ImportError: If the reader's optional dependencies are missing.
+    """
+    if item_reader(path) is read_geoparquet:
+        for module in ("pyarrow.parquet", "stac_geoparquet.arrow"):
+            import_optional(module, "geoparquet", "Reading stac-geoparquet files")
+    elif split_compression(path)[1] == ".zst":
+        import_optional("zstandard", "zstd", "Reading .zst files")
@@ -0,0 +1,35 @@
+"""Paths of the data files shipped in the package."""
+import os
+from importlib import import_module
+
+
+def resource_path(module: str, name: str) -> str:
+    """
+    Return the filesystem path of a data file shipped next to a module.
+
+    The file is looked up relative to the module's own file, as `pkg_resources` did for
+    installed packages, without scanning the installed distributions. `__file__` of a
+    namespace package is None, so the module must be a plain module, not a package.
+
+    Args:
+        module (str): The module the file is shipped next to, e.g. `__name__`.
+        name (str): The path of the file relative to the module's directory, e.g.
+            `config_files/locustfile.py`.
+
+    Returns:
+        str: The path of the file.
+    """
+    module_file = import_module(module).__file__
+    if module_file is None:
+        raise ValueError(f"{module} has no file to locate {name} from")
+    return os.path.join(os.path.dirname(os.path.abspath(module_file)), name)
+
+
+def locustfile_path() -> str:
+    """Return the path of the bundled locustfile."""
+    return resource_path(__name__, "config_files/locustfile.py")
+
+
+def taurus_template_path() -> str:
+    """Return the path of the bundled Taurus configuration template."""
+    return resource_path(__name__, "config_files/taurus_locust.yml")
@@ -0,0 +1,194 @@
+"""Locust process orchestration for the stac-api-load-testing cli tool."""
+import os
+import shlex
+import socket
+import subprocess
+from typing import List, Optional
+
+import click
+
+LOCAL_MASTER_HOST = "127.0.0.1"
+
+
+def default_worker_count() -> int:
+    """Return the number of local worker processes to start by default, one per core."""
+    return os.cpu_count() or 1
+
+
+def parse_worker_hosts(worker_hosts: Optional[str]) -> List[str]:
+    """Split a comma-separated list of worker hosts."""
+    if not worker_hosts:
+        return []
+    return [host.strip() for host in worker_hosts.split(",") if host.strip()]
+
+
+def locust_command(locustfile_path: str, api_address: str) -> List[str]:
+    """Return the base locust command for the packaged locustfile."""
+    return ["locust", "--locustfile", locustfile_path, "--host", api_address]
+
+
+def headless_args(
+    users: int,
+    spawn_rate: float,
+    run_time: Optional[str] = None,
+) -> List[str]:
+    """Return the locust arguments of a headless, optionally time-boxed, run."""
+    args = ["--headless", "--users", str(users), "--spawn-rate", str(spawn_rate)]
+    if run_time:
+        args += ["--run-time", run_time]
+    return args
+
+
+def tag_args(
+    tags: Optional[str] = None, exclude_tags: Optional[str] = None
+) -> List[str]:
+    """Return the locust arguments selecting tasks from comma-separated tag lists."""
+    args: List[str] = []
+    if tags:
+        args += ["--tags"] + [tag.strip() for tag in tags.split(",") if tag.strip()]
+    if exclude_tags:
+        args += ["--exclude-tags"] + [
+            tag.strip() for tag in exclude_tags.split(",") if tag.strip()
+        ]
+    return args
+
+
+def start_local_workers(
+    locustfile_path: str,
+    api_address: str,
+    count: int,
+    master_host: str = LOCAL_MASTER_HOST,
+    extra_args: Optional[List[str]] = None,
+) -> List[subprocess.Popen]:
+    """
+    Start local Locust worker processes connected to a master.
+
+    Args:
+        locustfile_path (str): The path to the locustfile.
+        api_address (str): The base URL of the STAC API to be tested.
+        count (int): The number of worker processes.
+        master_host (str): The address of the Locust master.
+        extra_args (list, optional): Additional locust arguments, e.g. tags.
+
+    Returns:
+        list: The worker processes.
+    """
+    command = locust_command(locustfile_path, api_address) + [
+        "--worker",
+        "--master-host",
+        master_host,
+    ]
+    command += extra_args or []
+    return [subprocess.Popen(command) for _ in range(count)]
+
+
+def start_remote_workers(
+    worker_hosts: List[str], api_address: str, master_host: Optional[str] = None
+) -> List[subprocess.Popen]:
+    """
+    Start workers on other machines over ssh, one worker per core on each host.
+
+    Each host must have stac-api-load-testing installed. The `STAC_*` settings of this
+    run are forwarded so remote users target the same corpus.
+
+    Args:
+        worker_hosts (list): The ssh destinations of the worker machines.
+        api_address (str): The base URL of the STAC API to be tested.
+        master_host (str, optional): The address the workers use to reach this master.
+
+    Returns:
+        list: The ssh processes.
+    """
+    master_host = master_host or socket.getfqdn()
+    settings = [
+        f"{key}={shlex.quote(value)}"
+        for key, value in os.environ.items()
+        if key.startswith("STAC_")
+    ]
+    remote_command = " ".join(
+        ["env"]
+        + settings
+        + [
+            "stac-api-load-testing",
+            "--locust",
+            "--master-host",
+            shlex.quote(master_host),
+            "--api-address",
+            shlex.quote(api_address),
+        ]
+    )
+    processes = []
+    for host in worker_hosts:
+        click.secho(f"Starting workers on {host}", fg="green")
+        processes.append(subprocess.Popen(["ssh", host, remote_command]))
+    return processes
+
+
+def stop_processes(processes: List[subprocess.Popen], timeout: float = 10):
+    """Terminate processes, killing the ones that do not exit in time."""
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run_locust(
+    locustfile_path: str,
+    api_address: str,
+    workers: int,
+    worker_hosts: Optional[List[str]] = None,
+    master_host: Optional[str] = None,
+    locust_args: Optional[List[str]] = None,
+    worker_args: Optional[List[str]] = None,
+) -> int:
+    """
+    Run Locust as a single process, as a master with workers, or as workers only.
+
+    Args:
+        locustfile_path (str): The path to the locustfile.
+        api_address (str): The base URL of the STAC API to be tested.
+        workers (int): The number of local worker processes. 0 runs a single Locust process.
+        worker_hosts (list, optional): The ssh destinations of remote worker machines.
+        master_host (str, optional): Join the master on this host with local workers only.
+        locust_args (list, optional): Additional arguments of the master or single process.
+        worker_args (list, optional): Additional arguments of the local worker processes.
+
+    Returns:
+        int: The exit code of the master or single Locust process.
+    """
+    locust_args = locust_args or []
+    worker_args = worker_args or []
+    if master_host:
+        processes = start_local_workers(
+            locustfile_path,
+            api_address,
+            max(workers, 1),
+            master_host=master_host,
+            extra_args=worker_args,
+        )
+        try:
+            return max(process.wait() for process in processes)
+        finally:
+            stop_processes(processes)
+
+    worker_hosts = worker_hosts or []
+    command = locust_command(locustfile_path, api_address) + locust_args
+    if workers <= 0 and not worker_hosts:
+        return subprocess.run(command).returncode
+
+    processes = start_local_workers(
+        locustfile_path, api_address, workers, extra_args=worker_args
+    )
+    processes += start_remote_workers(worker_hosts, api_address)
+    command.append("--master")
+    if "--headless" in locust_args:
+        # Remote worker counts are unknown, they join once the local ones are ready
+        command += ["--expect-workers", str(max(workers, 1))]
+    try:
+        return subprocess.run(command).returncode
+    finally:
+        stop_processes(processes)
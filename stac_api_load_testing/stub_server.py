@@ -0,0 +1,634 @@
+"""In-memory stand-in STAC API for benchmarking the load generator itself."""
+import json
+import math
+import os
+import random
+import re
+from functools import lru_cache
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlencode
+
+import click
+
+from .data_loader.data_loader import load_data, load_sample_items
+from .data_loader.generator import (
+    DEFAULT_COLLECTION_ID,
+    ItemGenerator,
+    collection_ids,
+    item_id_for,
+)
+from .data_loader.item_files import read_items
+
+CELL_SIZE = 1.0
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 10000
+# Searches over larger areas (in square degrees) scan every item instead of the grid
+MAX_INDEXED_AREA = 10000.0
+# Encoded generated items kept in memory, posted items are always kept encoded
+ENCODED_CACHE_SIZE = 100_000
+ROUTES: List[Tuple[str, "re.Pattern[str]", str]] = [
+    ("GET", re.compile(r"^/?$"), "landing"),
+    ("GET", re.compile(r"^/collections/?$"), "get_collections"),
+    ("POST", re.compile(r"^/collections/?$"), "create_collection"),
+    ("GET", re.compile(r"^/collections/(?P<collection_id>[^/]+)/?$"), "get_collection"),
+    (
+        "GET",
+        re.compile(r"^/collections/(?P<collection_id>[^/]+)/items/?$"),
+        "get_items",
+    ),
+    (
+        "POST",
+        re.compile(r"^/collections/(?P<collection_id>[^/]+)/items/?$"),
+        "create_item",
+    ),
+    (
+        "POST",
+        re.compile(r"^/collections/(?P<collection_id>[^/]+)/bulk_items/?$"),
+        "bulk_items",
+    ),
+    (
+        "GET",
+        re.compile(r"^/collections/(?P<collection_id>[^/]+)/items/(?P<item_id>[^/]+)$"),
+        "get_item",
+    ),
+    (
+        "PUT",
+        re.compile(r"^/collections/(?P<collection_id>[^/]+)/items/(?P<item_id>[^/]+)$"),
+        "update_item",
+    ),
+    (
+        "DELETE",
+        re.compile(r"^/collections/(?P<collection_id>[^/]+)/items/(?P<item_id>[^/]+)$"),
+        "delete_item",
+    ),
+    ("GET", re.compile(r"^/search/?$"), "get_search"),
+    ("POST", re.compile(r"^/search/?$"), "post_search"),
+]
+# The status code and the JSON body of a handler's response, possibly already encoded
+Response = Tuple[int, Any]
+STATUS_LINES = {
+    200: "200 OK",
+    201: "201 Created",
+    204: "204 No Content",
+    400: "400 Bad Request",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+    409: "409 Conflict",
+    500: "500 Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """An error response of the stub API."""
+
+    def __init__(self, status: int, description: str):
+        """Initialize the error with its status code and description."""
+        super().__init__(description)
+        self.status = status
+        self.description = description
+
+
+def geometry_bbox(geometry: dict) -> List[float]:
+    """Return the bbox of a GeoJSON geometry."""
+    coordinates = geometry["coordinates"]
+    while isinstance(coordinates[0], list) and isinstance(coordinates[0][0], list):
+        coordinates = [point for part in coordinates for point in part]
+    if not isinstance(coordinates[0], list):
+        coordinates = [coordinates]
+    xs = [point[0] for point in coordinates]
+    ys = [point[1] for point in coordinates]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def intersects(a: List[float], b: List[float]) -> bool:
+    """Return True if two bboxes intersect."""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def parse_interval(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return the (start, end) of an RFC 3339 datetime or interval, open ends as empty or `..`."""
+    if not value:
+        return None
+    start, _, end = value.partition("/")
+    if not _:
+        return value, value
+    return ("" if start == ".." else start), ("\uffff" if end in ("", "..") else end)
+
+
+class ItemStore:
+    """
+    Items of the stub API, indexed on a grid of `CELL_SIZE` degree cells.
+
+    Generated items are only indexed by bbox and rebuilt by the generator when served,
+    so a large synthetic corpus fits in memory. Items are served from their JSON
+    encoding, cached for the most recently served generated items, so the stub
+    spends as little CPU per request as possible.
+
+    Attributes:
+        collections (dict): The collections, keyed by id.
+        generator (ItemGenerator, optional): The generator of the synthetic corpus.
+    """
+
+    def __init__(self, generator: Optional[ItemGenerator] = None):
+        """Initialize an empty store."""
+        self.collections: Dict[str, dict] = {}
+        self.generator = generator
+        self._items: Dict[Tuple[str, str], Union[dict, int]] = {}
+        self._bboxes: Dict[Tuple[str, str], List[float]] = {}
+        self._grid: Dict[Tuple[int, int], List[Tuple[str, str]]] = {}
+        self._order: Dict[Tuple[str, str], int] = {}
+        self._positions = count()
+        self._encoded: Dict[Tuple[str, str], bytes] = {}
+        self._encode_generated = lru_cache(maxsize=ENCODED_CACHE_SIZE)(
+            lambda index: json.dumps(self.generator.item(index)).encode()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self._items)
+
+    @staticmethod
+    def _cells(bbox: List[float]) -> Iterator[Tuple[int, int]]:
+        """Yield the grid cells covered by a bbox."""
+        for x in range(
+            math.floor(bbox[0] / CELL_SIZE), math.floor(bbox[2] / CELL_SIZE) + 1
+        ):
+            for y in range(
+                math.floor(bbox[1] / CELL_SIZE), math.floor(bbox[3] / CELL_SIZE) + 1
+            ):
+                yield x, y
+
+    def _index(self, key: Tuple[str, str], value: Union[dict, int], bbox: List[float]):
+        """Store an item and index its bbox."""
+        self._items[key] = value
+        self._bboxes[key] = bbox
+        self._order[key] = next(self._positions)
+        for cell in self._cells(bbox):
+            self._grid.setdefault(cell, []).append(key)
+
+    def add(self, item: dict) -> bool:
+        """
+        Store a posted item.
+
+        Args:
+            item (dict): The STAC item, with its `collection` set.
+
+        Returns:
+            bool: False if the item already exists.
+        """
+        key = (item["collection"], item["id"])
+        if key in self._items:
+            return False
+        bbox = item.get("bbox") or geometry_bbox(item["geometry"])
+        self._index(key, item, bbox)
+        self._encoded[key] = json.dumps(item).encode()
+        return True
+
+    def remove(self, collection_id: str, item_id: str) -> bool:
+        """
+        Delete an item.
+
+        Args:
+            collection_id (str): The collection of the item.
+            item_id (str): The item id.
+
+        Returns:
+            bool: False if the item does not exist.
+        """
+        key = (collection_id, item_id)
+        if key not in self._items:
+            return False
+        for cell in self._cells(self._bboxes.pop(key)):
+            self._grid[cell].remove(key)
+        del self._items[key], self._order[key]
+        self._encoded.pop(key, None)
+        return True
+
+    def add_generated(self, n_items: int):
+        """Index the first `n_items` items of the generator without building them."""
+        for index in range(n_items):
+            key = (self.generator.collection_id(index), item_id_for(index))
+            self._index(key, index, self.generator.bbox(index))
+
+    def get(self, collection_id: str, item_id: str) -> Optional[dict]:
+        """Return an item, building generated ones."""
+        value = self._items.get((collection_id, item_id))
+        if isinstance(value, int):
+            return self.generator.item(value)
+        return value
+
+    def encoded(self, collection_id: str, item_id: str) -> Optional[bytes]:
+        """Return the JSON encoding of an item."""
+        key = (collection_id, item_id)
+        value = self._items.get(key)
+        if isinstance(value, int):
+            return self._encode_generated(value)
+        return self._encoded.get(key)
+
+    def search(
+        self,
+        collections: Optional[List[str]] = None,
+        bbox: Optional[List[float]] = None,
+        ids: Optional[List[str]] = None,
+        datetime: Optional[Tuple[str, str]] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Yield the keys of the items matching a search, in insertion order.
+
+        Generated items are only built when filtering on datetime.
+
+        Args:
+            collections (list, optional): The collection ids to search.
+            bbox (list, optional): The area of interest.
+            ids (list, optional): The item ids.
+            datetime (tuple, optional): The (start, end) datetime interval.
+
+        Yields:
+            tuple: The collection id and item id of the next matching item.
+        """
+        candidates: Iterable[Tuple[str, str]] = self._items.keys()
+        if ids:
+            candidates = sorted(
+                (
+                    (collection_id, item_id)
+                    for collection_id in collections or self.collections
+                    for item_id in ids
+                    if (collection_id, item_id) in self._items
+                ),
+                key=self._order.__getitem__,
+            )
+        elif (
+            bbox is not None
+            and (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) <= MAX_INDEXED_AREA
+        ):
+            cell_keys = {
+                key for cell in self._cells(bbox) for key in self._grid.get(cell, [])
+            }
+            candidates = sorted(cell_keys, key=self._order.__getitem__)
+        wanted_collections = set(collections) if collections else None
+        wanted_ids = set(ids) if ids else None
+        for key in candidates:
+            if wanted_collections is not None and key[0] not in wanted_collections:
+                continue
+            if wanted_ids is not None and key[1] not in wanted_ids:
+                continue
+            if bbox is not None and not intersects(bbox, self._bboxes[key]):
+                continue
+            if datetime is not None:
+                value = self.get(*key)["properties"].get("datetime") or ""
+                if not datetime[0] <= value <= datetime[1]:
+                    continue
+            yield key
+
+
+class StubStacApi:
+    """
+    WSGI application serving the endpoints hit by the locustfile and the ingest.
+
+    Supports `/`, `/collections`, `/collections/{id}`, `/collections/{id}/items`
+    (GET, POST and `bulk_items`), `/collections/{id}/items/{item_id}` (GET, PUT and
+    DELETE) and `/search`
+    (GET and POST, with `collections`, `bbox`, `intersects`, `ids`, `datetime`, `limit`
+    and token pagination through `next` links). `sortby` is accepted and ignored.
+
+    Attributes:
+        store (ItemStore): The served items.
+        latency (float): The mean injected latency, in milliseconds.
+        latency_jitter (float): The maximum deviation from the mean latency, in milliseconds.
+        error_rate (float): The fraction of requests failing with a 500.
+        sleep (callable): The sleep function used to inject latency.
+    """
+
+    def __init__(
+        self,
+        store: ItemStore,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        """Initialize the application."""
+        self.store = store
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.sleep = sleep
+
+    def __call__(self, environ, start_response):
+        """Handle a WSGI request."""
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO", "/")
+        delay = self.latency + random.uniform(-1, 1) * self.latency_jitter
+        if delay > 0 and self.sleep is not None:
+            self.sleep(delay / 1000)
+        # Per request, the app is shared by the greenlets of every connection
+        host = environ.get("HTTP_HOST", environ["SERVER_NAME"])
+        base_url = f"{environ['wsgi.url_scheme']}://{host}"
+
+        try:
+            if self.error_rate and random.random() < self.error_rate:
+                raise HttpError(500, "Injected error")
+            status, body = self.route(method, path, environ, base_url)
+        except HttpError as e:
+            status, body = e.status, {"code": e.status, "description": e.description}
+        except (KeyError, TypeError, ValueError) as e:
+            status, body = 400, {"code": 400, "description": repr(e)}
+
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        start_response(
+            STATUS_LINES[status],
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(payload))),
+            ],
+        )
+        return [payload]
+
+    def route(self, method: str, path: str, environ, base_url: str) -> Response:
+        """Dispatch a request to its handler, with the base URL of the links."""
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            query = {
+                key: values[0]
+                for key, values in parse_qs(environ.get("QUERY_STRING", "")).items()
+            }
+            body = None
+            if method in ("POST", "PUT"):
+                length = int(environ.get("CONTENT_LENGTH") or 0)
+                body = json.loads(environ["wsgi.input"].read(length) or b"{}")
+            return getattr(self, handler)(
+                query=query, body=body, base_url=base_url, **match.groupdict()
+            )
+        if allowed:
+            raise HttpError(405, "Method not allowed")
+        raise HttpError(404, f"{path} not found")
+
+    def _collection(self, collection_id: str) -> dict:
+        """Return a collection or raise a 404."""
+        collection = self.store.collections.get(collection_id)
+        if collection is None:
+            raise HttpError(404, f"Collection {collection_id} not found")
+        return collection
+
+    def landing(self, base_url: str, **kwargs) -> Response:
+        """Return the landing page."""
+        return 200, {
+            "type": "Catalog",
+            "id": "stub",
+            "stac_version": "1.0.0",
+            "description": "stac-api-load-testing stub API",
+            "conformsTo": [
+                "https://api.stacspec.org/v1.0.0/core",
+                "https://api.stacspec.org/v1.0.0/item-search",
+                "https://api.stacspec.org/v1.0.0/ogcapi-features",
+            ],
+            "links": [
+                {"rel": "self", "href": f"{base_url}/"},
+                {"rel": "data", "href": f"{base_url}/collections"},
+                {"rel": "search", "href": f"{base_url}/search", "method": "GET"},
+                {"rel": "search", "href": f"{base_url}/search", "method": "POST"},
+            ],
+        }
+
+    def get_collections(self, **kwargs) -> Response:
+        """Return all collections."""
+        return 200, {"collections": list(self.store.collections.values()), "links": []}
+
+    def create_collection(self, body: dict, **kwargs) -> Response:
+        """Create a collection."""
+        if body["id"] in self.store.collections:
+            raise HttpError(409, f"Collection {body['id']} already exists")
+        self.store.collections[body["id"]] = body
+        return 201, body
+
+    def get_collection(self, collection_id: str, **kwargs) -> Response:
+        """Return a collection."""
+        return 200, self._collection(collection_id)
+
+    def get_item(self, collection_id: str, item_id: str, **kwargs) -> Response:
+        """Return an item."""
+        item = self.store.encoded(collection_id, item_id)
+        if item is None:
+            raise HttpError(404, f"Item {item_id} not found")
+        return 200, item
+
+    def create_item(self, collection_id: str, body: dict, **kwargs) -> Response:
+        """Create an item."""
+        self._collection(collection_id)
+        body = dict(body, collection=collection_id)
+        if not self.store.add(body):
+            raise HttpError(409, f"Item {body['id']} already exists")
+        return 201, body
+
+    def bulk_items(self, collection_id: str, body: dict, **kwargs) -> Response:
+        """Create items in bulk, as the Transaction extension's bulk items endpoint."""
+        self._collection(collection_id)
+        added = 0
+        for item in body["items"].values():
+            added += self.store.add(dict(item, collection=collection_id))
+        return 200, f"Successfully added {added} Items."
+
+    def update_item(
+        self, collection_id: str, item_id: str, body: dict, **kwargs
+    ) -> Response:
+        """Replace an item."""
+        self._collection(collection_id)
+        if not self.store.remove(collection_id, item_id):
+            raise HttpError(404, f"Item {item_id} not found")
+        body = dict(body, id=item_id, collection=collection_id)
+        self.store.add(body)
+        return 200, body
+
+    def delete_item(self, collection_id: str, item_id: str, **kwargs) -> Response:
+        """Delete an item."""
+        if not self.store.remove(collection_id, item_id):
+            raise HttpError(404, f"Item {item_id} not found")
+        return 204, b""
+
+    def get_items(
+        self, collection_id: str, query: dict, base_url: str, **kwargs
+    ) -> Response:
+        """Return a page of the items of a collection."""
+        self._collection(collection_id)
+        search: Dict = {"collections": [collection_id]}
+        if "bbox" in query:
+            search["bbox"] = [float(x) for x in query["bbox"].split(",")]
+        path = f"{base_url}/collections/{collection_id}/items"
+        return self._page(search, query, path, query)
+
+    def get_search(self, query: dict, base_url: str, **kwargs) -> Response:
+        """Search items with query parameters."""
+        search: Dict = {}
+        if "collections" in query:
+            search["collections"] = query["collections"].split(",")
+        if "bbox" in query:
+            search["bbox"] = [float(x) for x in query["bbox"].split(",")]
+        if "intersects" in query:
+            search["bbox"] = geometry_bbox(json.loads(query["intersects"]))
+        if "ids" in query:
+            search["ids"] = query["ids"].split(",")
+        search["datetime"] = parse_interval(query.get("datetime"))
+        return self._page(search, query, f"{base_url}/search", query)
+
+    def post_search(self, body: dict, base_url: str, **kwargs) -> Response:
+        """Search items with a JSON body."""
+        search = {
+            "collections": body.get("collections"),
+            "bbox": body.get("bbox"),
+            "ids": body.get("ids"),
+            "datetime": parse_interval(body.get("datetime")),
+        }
+        if body.get("intersects"):
+            search["bbox"] = geometry_bbox(body["intersects"])
+        return self._page(search, body, f"{base_url}/search", None)
+
+    def _page(
+        self, search: dict, params: dict, url: str, query: Optional[dict]
+    ) -> Response:
+        """
+        Return a page of search results, with a `next` link if more items match.
+
+        Args:
+            search (dict): The `ItemStore.search` arguments.
+            params (dict): The query parameters or body, holding `limit` and `token`.
+            url (str): The URL of the `next` link, without query parameters.
+            query (dict, optional): The query parameters of GET requests, None for POST.
+
+        Returns:
+            tuple: The status code and the encoded ItemCollection.
+        """
+        limit = min(int(params.get("limit") or DEFAULT_LIMIT), MAX_LIMIT)
+        offset = int(params.get("token") or 0)
+        keys = list(islice(self.store.search(**search), offset, offset + limit + 1))
+        features = [self.store.encoded(*key) for key in keys[:limit]]
+        links: List[dict] = []
+        if len(keys) > limit:
+            token = offset + limit
+            if query is not None:
+                links.append(
+                    {
+                        "rel": "next",
+                        "href": f"{url}?{urlencode(dict(query, token=token))}",
+                        "method": "GET",
+                    }
+                )
+            else:
+                links.append(
+                    {
+                        "rel": "next",
+                        "href": url,
+                        "method": "POST",
+                        "body": {"token": token},
+                        "merge": True,
+                    }
+                )
+        # Splice the encoded items into the ItemCollection instead of re-encoding them
+        rest = json.dumps(
+            {"links": links, "context": {"returned": len(features), "limit": limit}}
+        ).encode()
+        return 200, (
+            b'{"type": "FeatureCollection", "features": ['
+            + b", ".join(features)
+            + b"], "
+            + rest[1:]
+        )
+
+
+def build_store(
+    n_items: Optional[int] = None,
+    n_collections: int = 1,
+    seed: int = 0,
+    items_file: Optional[str] = None,
+) -> ItemStore:
+    """
+    Build a store holding the same data as an ingest with the same settings.
+
+    Args:
+        n_items (int, optional): The number of synthetic items, the sample items if None.
+        n_collections (int): The number of collections synthetic items are spread across.
+        seed (int): The seed of the synthetic corpus.
+        items_file (str, optional): An item file whose items are stored instead, each
+            in its own collection.
+
+    Returns:
+        ItemStore: The populated store.
+    """
+    collection = load_data("collection.json")
+    if items_file is not None:
+        store = ItemStore()
+        for item in read_items(items_file):
+            collection_id = item["collection"] = (
+                item.get("collection") or DEFAULT_COLLECTION_ID
+            )
+            if collection_id not in store.collections:
+                store.collections[collection_id] = dict(collection, id=collection_id)
+            store.add(item)
+        return store
+
+    features = load_sample_items()
+    if n_items is None:
+        store = ItemStore()
+        ids = collection_ids(1)
+    else:
+        store = ItemStore(
+            ItemGenerator(features, n_collections=n_collections, seed=seed)
+        )
+        ids = collection_ids(n_collections)
+    for collection_id in ids:
+        store.collections[collection_id] = dict(collection, id=collection_id)
+    if n_items is None:
+        for feature in features:
+            store.add(dict(feature, collection=ids[0]))
+    else:
+        store.add_generated(n_items)
+    return store
+
+
+def serve(
+    host: str,
+    port: int,
+    store: ItemStore,
+    latency: float = 0.0,
+    latency_jitter: float = 0.0,
+    error_rate: float = 0.0,
+    processes: int = 1,
+):
+    """
+    Serve the stub API until interrupted, on a gevent WSGI server.
+
+    Injected latency is a cooperative sleep, so it does not block other requests. With
+    several processes, the listening socket is shared by forked copies of the server,
+    each with its own copy of the store (items posted to one are not seen by the others).
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        store (ItemStore): The served items.
+        latency (float): The mean injected latency, in milliseconds.
+        latency_jitter (float): The maximum deviation from the mean latency, in milliseconds.
+        error_rate (float): The fraction of requests failing with a 500.
+        processes (int): The number of server processes.
+    """
+    # Imported here so only the stub server pays for gevent
+    import gevent
+    from gevent.pywsgi import WSGIServer
+
+    app = StubStacApi(store, latency, latency_jitter, error_rate, sleep=gevent.sleep)
+    click.secho(
+        f"Serving {len(store)} items in {len(store.collections)} collections on http://{host}:{port}",
+        fg="green",
+    )
+    server = WSGIServer((host, port), app, log=None)
+    server.init_socket()
+    for _ in range(processes - 1):
+        if os.fork() == 0:
+            gevent.reinit()
+            break
+    server.serve_forever()
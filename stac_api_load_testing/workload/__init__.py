@@ -0,0 +1 @@
+"""workload."""
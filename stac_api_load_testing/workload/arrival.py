@@ -0,0 +1,234 @@
+"""Open-model (arrival-rate) load generation."""
+import math
+import os
+import random
+import time
+from functools import lru_cache
+from typing import NamedTuple, Optional, Type
+
+import gevent
+from gevent.local import local
+from gevent.pool import Pool
+from locust import LoadTestShape
+
+
+class ArrivalProfile(NamedTuple):
+    """
+    Target request rate over time.
+
+    Attributes:
+        rate (float): The target requests per second, 0 disables the open model.
+        profile (str): `constant`, `step` (`steps` equal steps every `period` seconds),
+            `ramp` (linear over `period` seconds) or `spike` (`spike_factor` times the
+            rate for `spike_duration` seconds, starting after `period` seconds).
+        period (float): The step interval, ramp duration or spike start, in seconds.
+        steps (int): The number of steps of the step profile.
+        spike_factor (float): The rate multiplier during the spike.
+        spike_duration (float): The duration of the spike, in seconds.
+        users (int): The number of dispatcher users sharing the rate.
+    """
+
+    rate: float = 0.0
+    profile: str = "constant"
+    period: float = 60.0
+    steps: int = 5
+    spike_factor: float = 5.0
+    spike_duration: float = 30.0
+    users: int = 10
+
+    @classmethod
+    def from_env(cls) -> "ArrivalProfile":
+        """
+        Read the profile from the `STAC_ARRIVAL_*`, `STAC_LOAD_PROFILE`, `STAC_PROFILE_*` and `STAC_SPIKE_*` environment variables.
+
+        They are set by the CLI from `--arrival-rate`, `--load-profile`, `--profile-period`,
+        `--profile-steps`, `--spike-factor`, `--spike-duration` and `--users`.
+        """
+        return cls(
+            rate=float(os.getenv("STAC_ARRIVAL_RATE", "0")),
+            profile=os.getenv("STAC_LOAD_PROFILE", "constant"),
+            period=float(os.getenv("STAC_PROFILE_PERIOD", "60")),
+            steps=int(os.getenv("STAC_PROFILE_STEPS", "5")),
+            spike_factor=float(os.getenv("STAC_SPIKE_FACTOR", "5")),
+            spike_duration=float(os.getenv("STAC_SPIKE_DURATION", "30")),
+            users=int(os.getenv("STAC_ARRIVAL_USERS", "10")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if requests are issued on an arrival schedule."""
+        return self.rate > 0
+
+    def rate_at(self, elapsed: float) -> float:
+        """
+        Return the total target requests per second at a point of the run.
+
+        Args:
+            elapsed (float): The seconds since the start of the run.
+
+        Returns:
+            float: The target rate.
+        """
+        if self.profile == "ramp":
+            return (
+                self.rate * min(elapsed / self.period, 1.0)
+                if self.period
+                else self.rate
+            )
+        if self.profile == "step":
+            step = (
+                min(math.floor(elapsed / self.period) + 1, self.steps)
+                if self.period
+                else self.steps
+            )
+            return self.rate * step / self.steps
+        if self.profile == "spike":
+            if self.period <= elapsed < self.period + self.spike_duration:
+                return self.rate * self.spike_factor
+        return self.rate
+
+
+class ScheduledClient:
+    """
+    Proxy of the Locust client that reports latency from a request's intended start.
+
+    The first request of each arrival is reported with the time elapsed since the
+    arrival was scheduled, so queueing in the load generator and server slowdowns are
+    both counted (no coordinated omission). Follow-up requests of the same task are
+    measured as usual.
+    """
+
+    def __init__(self, client):
+        """Wrap a Locust HttpSession."""
+        self._client = client
+        self._local = local()
+
+    def schedule(self, intended_start: float):
+        """Set the intended start (`time.perf_counter`) of the current greenlet's next request."""
+        self._local.intended_start = intended_start
+
+    def request(self, method: str, url: str, **kwargs):
+        """Send a request, correcting its reported latency if it starts an arrival."""
+        intended_start = getattr(self._local, "intended_start", None)
+        if intended_start is None or kwargs.get("catch_response"):
+            return self._client.request(method, url, **kwargs)
+        self._local.intended_start = None
+        with self._client.request(
+            method, url, catch_response=True, **kwargs
+        ) as response:
+            response.request_meta["response_time"] = (
+                time.perf_counter() - intended_start
+            ) * 1000
+        return response
+
+    def get(self, url: str, **kwargs):
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        """Send a PUT request."""
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        """Send a DELETE request."""
+        return self.request("DELETE", url, **kwargs)
+
+    def __getattr__(self, name):
+        """Delegate everything else to the Locust client."""
+        return getattr(self._client, name)
+
+
+@lru_cache(maxsize=None)
+def schedule_started_at() -> float:
+    """Return when the first dispatcher of this process started, the origin of the profile."""
+    return time.perf_counter()
+
+
+class OpenLoopMixin:
+    """
+    Turn a Locust user into a dispatcher issuing its tasks on a fixed arrival schedule.
+
+    Instead of running one task after the other, the user starts a task every
+    `1 / (rate / users)` seconds in its own greenlet, whether or not previous ones
+    completed. Tasks are picked with their usual weights, after tag filtering.
+
+    Attributes:
+        arrival_profile (ArrivalProfile): The target rate over time.
+        max_in_flight (int): The maximum concurrent tasks per dispatcher. When reached,
+            arrivals wait for a slot and the wait is counted in their latency.
+    """
+
+    arrival_profile = ArrivalProfile()
+    max_in_flight = 1000
+
+    def on_start(self):
+        """Swap the task list for the dispatch loop and wrap the client."""
+        super().on_start()  # type: ignore
+        self.arrival_tasks = list(self.tasks)  # type: ignore
+        self.tasks = [type(self).dispatch]
+        self.client = ScheduledClient(self.client)  # type: ignore
+        self._pool = Pool(self.max_in_flight)
+
+    def on_stop(self):
+        """Stop the tasks still in flight."""
+        self._pool.kill(block=False)
+        super().on_stop()  # type: ignore
+
+    def dispatch(self):
+        """Start tasks on the arrival schedule until the user is stopped."""
+        started_at = schedule_started_at()
+        next_start = time.perf_counter()
+        while True:
+            rate = self.arrival_profile.rate_at(next_start - started_at)
+            rate /= max(self.arrival_profile.users, 1)
+            if rate <= 0:
+                gevent.sleep(1)
+                next_start = time.perf_counter()
+                continue
+            next_start += 1 / rate
+            delay = next_start - time.perf_counter()
+            if delay > 0:
+                gevent.sleep(delay)
+            self._pool.spawn(
+                self._run_arrival, random.choice(self.arrival_tasks), next_start
+            )
+
+    def _run_arrival(self, task, intended_start: float):
+        """Run a task with its first request measured from `intended_start`."""
+        self.client.schedule(intended_start)
+        try:
+            task(self)
+        except Exception as e:
+            self.environment.events.user_error.fire(  # type: ignore
+                user_instance=self, exception=e, tb=e.__traceback__
+            )
+
+
+class ArrivalRateShape(LoadTestShape):
+    """
+    Keep `ArrivalProfile.users` dispatcher users running until `--run-time` is over.
+
+    The load itself is set by the arrival profile, not by the number of users.
+
+    Attributes:
+        user_class (type): The dispatcher user class to spawn.
+        arrival_profile (ArrivalProfile): The target rate over time.
+    """
+
+    abstract = True
+    use_common_options = True
+    user_class: Optional[Type] = None
+    arrival_profile = ArrivalProfile()
+
+    def tick(self):
+        """Return the dispatcher user count, spawned all at once, or None once the run time is over."""
+        options = self.runner.environment.parsed_options
+        run_time = getattr(options, "run_time", None) if options else None
+        if run_time and self.get_run_time() > run_time:
+            return None
+        users = max(self.arrival_profile.users, 1)
+        return users, users, [self.user_class]
@@ -0,0 +1,430 @@
+"""Benchmark suite: fixed scenarios, a local results database and statistical regression checks."""
+import json
+import math
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import click
+
+DEFAULT_RESULTS_DB = "benchmarks.db"
+DEFAULT_SIGNIFICANCE = 0.01
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    version TEXT NOT NULL,
+    git_sha TEXT NOT NULL,
+    settings TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (scenario, backend, version, git_sha);
+CREATE TABLE IF NOT EXISTS endpoints (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    method TEXT NOT NULL,
+    name TEXT NOT NULL,
+    results TEXT NOT NULL,
+    histogram TEXT,
+    PRIMARY KEY (run_id, method, name)
+);
+"""
+
+
+class BenchmarkScenario(NamedTuple):
+    """
+    A named scenario of the benchmark suite.
+
+    Attributes:
+        name (str): The scenario name, e.g. `spatial-search`.
+        tags (list): The Locust task tags run by the scenario.
+        description (str): What the scenario measures.
+    """
+
+    name: str
+    tags: List[str]
+    description: str
+
+
+SUITE = [
+    BenchmarkScenario(
+        "item-lookup",
+        ["get_item", "get_collection"],
+        "Item and collection fetches by id",
+    ),
+    BenchmarkScenario(
+        "browse",
+        ["root_catalog", "all_collections", "item_collection", "basic_nonspatial"],
+        "Landing page, collection listing and unfiltered item pages",
+    ),
+    BenchmarkScenario(
+        "spatial-search",
+        ["post_bbox", "point_intersects", "intersects_sortby", "user_bbox"],
+        "Sorted bbox and intersects searches",
+    ),
+    BenchmarkScenario(
+        "filter-search",
+        ["filter_search"],
+        "Datetime, CQL2, Query and Fields extension searches",
+    ),
+    BenchmarkScenario(
+        "deep-paging",
+        ["deep_paging"],
+        "Sorted searches and item pages followed deep through next links",
+    ),
+]
+
+
+def select_scenarios(names: Optional[str] = None) -> List[BenchmarkScenario]:
+    """
+    Return the scenarios of the suite to run.
+
+    Args:
+        names (str, optional): Comma-separated scenario names, the whole suite if None.
+
+    Returns:
+        list: The scenarios, in suite order.
+
+    Raises:
+        ValueError: If a name is not a scenario of the suite.
+    """
+    if not names:
+        return list(SUITE)
+    selected = {name.strip() for name in names.split(",") if name.strip()}
+    unknown = selected - {scenario.name for scenario in SUITE}
+    if unknown:
+        raise ValueError(
+            f"Unknown scenario(s) {', '.join(sorted(unknown))}, expected "
+            + ", ".join(scenario.name for scenario in SUITE)
+        )
+    return [scenario for scenario in SUITE if scenario.name in selected]
+
+
+def current_git_sha() -> str:
+    """Return the commit checked out in the working directory, `unknown` outside of git."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return output.strip() or "unknown"
+
+
+class StoredRun(NamedTuple):
+    """
+    A benchmark run read back from the results database.
+
+    Attributes:
+        id (int): The run id.
+        started (str): The UTC start time, ISO 8601.
+        version (str): The backend version.
+        git_sha (str): The git commit of the run.
+    """
+
+    id: int
+    started: str
+    version: str
+    git_sha: str
+
+
+class ResultsDatabase:
+    """
+    SQLite store of benchmark runs, keyed by scenario, backend, version and git sha.
+
+    Each run keeps the results row of every endpoint, as written by the headless runs,
+    and its encoded HdrHistogram, which holds the latency samples the statistical
+    comparison needs at a fixed size whatever the number of requests.
+
+    Attributes:
+        path (str): The database file.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_DB):
+        """Open the database, creating its tables on first use."""
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def add_run(
+        self,
+        scenario: str,
+        backend: str,
+        version: str,
+        git_sha: str,
+        settings: Dict,
+        rows: List[Dict],
+        histograms: Dict[Tuple[str, str], str],
+    ) -> int:
+        """
+        Store a run.
+
+        Args:
+            scenario (str): The scenario name.
+            backend (str): The backend name.
+            version (str): The backend version.
+            git_sha (str): The git commit the run measures.
+            settings (dict): The load settings, only runs with equal settings are compared.
+            rows (list): The per-endpoint results rows.
+            histograms (dict): The encoded histograms keyed by (method, name).
+
+        Returns:
+            int: The id of the run.
+        """
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started, scenario, backend, version, git_sha, settings) "
+                + "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    scenario,
+                    backend,
+                    version,
+                    git_sha,
+                    json.dumps(settings, sort_keys=True),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO endpoints (run_id, method, name, results, histogram) "
+                + "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        row["method"],
+                        row["name"],
+                        json.dumps(row),
+                        histograms.get((row["method"], row["name"])),
+                    )
+                    for row in rows
+                ],
+            )
+        return run_id
+
+    def find_baseline(
+        self,
+        run_id: int,
+        scenario: str,
+        backend: str,
+        settings: Dict,
+        ref: Optional[str] = None,
+    ) -> Optional[StoredRun]:
+        """
+        Return the run a new run is compared to.
+
+        Args:
+            run_id (int): The new run, never its own baseline.
+            scenario (str): The scenario name.
+            backend (str): The backend name.
+            settings (dict): The load settings of the new run.
+            ref (str, optional): A backend version, or a git sha or a prefix of one.
+
+        Returns:
+            StoredRun: The latest earlier run with the same scenario, backend and settings,
+                matching `ref` if set. None if there is none.
+        """
+        query = (
+            "SELECT id, started, version, git_sha FROM runs WHERE id < ? "
+            + "AND scenario = ? AND backend = ? AND settings = ?"
+        )
+        params: list = [run_id, scenario, backend, json.dumps(settings, sort_keys=True)]
+        if ref:
+            query += " AND (version = ? OR git_sha LIKE ?)"
+            params += [ref, f"{ref}%"]
+        row = self._connection.execute(
+            query + " ORDER BY id DESC LIMIT 1", params
+        ).fetchone()
+        return StoredRun(*row) if row else None
+
+    def endpoints(self, run_id: int) -> Dict[Tuple[str, str], Tuple[Dict, str]]:
+        """Return the results row and encoded histogram of every endpoint of a run."""
+        return {
+            (method, name): (json.loads(results), histogram)
+            for method, name, results, histogram in self._connection.execute(
+                "SELECT method, name, results, histogram FROM endpoints WHERE run_id = ?",
+                (run_id,),
+            )
+        }
+
+
+def load_histograms(path: str) -> Dict[Tuple[str, str], str]:
+    """Return the encoded histograms of a `{prefix}_histograms.json` file by (method, name)."""
+    with open(path) as file:
+        return {
+            (endpoint["method"], endpoint["name"]): endpoint["histogram"]
+            for endpoint in json.load(file)["endpoints"]
+        }
+
+
+def histogram_counts(encoded: str) -> Dict[int, int]:
+    """Return the recorded latencies of an encoded HdrHistogram, in microseconds, with their counts."""
+    from hdrh.histogram import HdrHistogram
+
+    histogram = HdrHistogram.decode(encoded)
+    return {
+        item.value_iterated_to: item.count_added_in_this_iter_step
+        for item in histogram.get_recorded_iterator()
+    }
+
+
+def median(counts: Dict[int, int]) -> float:
+    """Return the median of counted values."""
+    total = sum(counts.values())
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen * 2 >= total:
+            return value
+    return 0.0
+
+
+class MannWhitney(NamedTuple):
+    """
+    One-sided Mann-Whitney U test of latencies.
+
+    Attributes:
+        u (float): The U statistic of the current run's latencies.
+        p_value (float): The probability of a shift at least this large towards slower
+            latencies if both runs had the same distribution.
+        effect (float): The probability that a current latency exceeds a baseline one,
+            ties counting half. 0.5 means no shift.
+    """
+
+    u: float
+    p_value: float
+    effect: float
+
+
+def mann_whitney(current: Dict[int, int], baseline: Dict[int, int]) -> MannWhitney:
+    """
+    Test whether current latencies are stochastically greater than baseline ones.
+
+    Both samples are histograms of latencies, so ranks are computed per distinct value,
+    with average ranks for ties, in O(distinct values) instead of O(requests). The
+    p-value uses the normal approximation with tie correction, accurate for the
+    thousands of requests of a benchmark run.
+
+    Args:
+        current (dict): The counts of the current latencies.
+        baseline (dict): The counts of the baseline latencies.
+
+    Returns:
+        MannWhitney: The test result, p-value 1 if a sample is empty.
+    """
+    n1, n2 = sum(current.values()), sum(baseline.values())
+    if not n1 or not n2:
+        return MannWhitney(0.0, 1.0, 0.5)
+    n = n1 + n2
+    rank_sum = 0.0
+    ties = 0.0
+    below = 0
+    for value in sorted(set(current) | set(baseline)):
+        tied = current.get(value, 0) + baseline.get(value, 0)
+        rank_sum += current.get(value, 0) * (below + (tied + 1) / 2)
+        ties += tied**3 - tied
+        below += tied
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return MannWhitney(u, 1.0, u / (n1 * n2))
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return MannWhitney(u, 0.5 * math.erfc(z / math.sqrt(2)), u / (n1 * n2))
+
+
+class EndpointComparison(NamedTuple):
+    """
+    The comparison of an endpoint's latencies with the baseline.
+
+    Attributes:
+        method (str): The request method, empty for the aggregate.
+        name (str): The endpoint name.
+        requests (int): The number of requests of the current run.
+        baseline_p50 (float): The median latency of the baseline, in milliseconds.
+        p50 (float): The median latency of the current run, in milliseconds.
+        test (MannWhitney): The statistical test.
+        regressed (bool): Whether the endpoint is significantly and materially slower.
+    """
+
+    method: str
+    name: str
+    requests: int
+    baseline_p50: float
+    p50: float
+    test: MannWhitney
+    regressed: bool
+
+
+def compare_runs(
+    current: Dict[Tuple[str, str], Tuple[Dict, str]],
+    baseline: Dict[Tuple[str, str], Tuple[Dict, str]],
+    significance: float = DEFAULT_SIGNIFICANCE,
+    tolerance: float = 0.1,
+) -> List[EndpointComparison]:
+    """
+    Compare the latencies of every endpoint of a run with its baseline.
+
+    An endpoint regresses when its latencies are significantly greater (one-sided
+    Mann-Whitney p-value below `significance`) and its median grew by more than
+    `tolerance`, so that tiny but significant shifts of long runs do not fail the gate.
+    Endpoints missing from either run, or without a histogram, are not compared.
+
+    Args:
+        current (dict): The endpoints of the current run, see `ResultsDatabase.endpoints`.
+        baseline (dict): The endpoints of the baseline run.
+        significance (float): The p-value threshold.
+        tolerance (float): The accepted relative growth of the median, e.g. 0.1 for 10%.
+
+    Returns:
+        list: A comparison per endpoint, the aggregate last.
+    """
+    comparisons = []
+    keys = sorted(current, key=lambda key: (key[1] == "Aggregated", key[1], key[0]))
+    for key in keys:
+        row, histogram = current[key]
+        if key not in baseline or not histogram or not baseline[key][1]:
+            continue
+        counts = histogram_counts(histogram)
+        baseline_counts = histogram_counts(baseline[key][1])
+        test = mann_whitney(counts, baseline_counts)
+        p50 = median(counts) / 1000
+        baseline_p50 = median(baseline_counts) / 1000
+        comparisons.append(
+            EndpointComparison(
+                method=key[0],
+                name=key[1],
+                requests=row.get("num_requests", 0),
+                baseline_p50=baseline_p50,
+                p50=p50,
+                test=test,
+                regressed=test.p_value < significance
+                and p50 > baseline_p50 * (1 + tolerance),
+            )
+        )
+    return comparisons
+
+
+def echo_comparisons(comparisons: Iterable[EndpointComparison]):
+    """Print the comparisons of a run, one line per endpoint."""
+    comparisons = list(comparisons)
+    width = max(
+        [len(f"{c.method} {c.name}".strip()) for c in comparisons] + [len("Endpoint")]
+    )
+    click.secho(
+        f"{'Endpoint':<{width}} {'requests':>9} {'base p50':>9} {'p50':>9} "
+        + f"{'change':>8} {'p-value':>9} {'P(slower)':>10}",
+        bold=True,
+    )
+    for c in comparisons:
+        change = (c.p50 / c.baseline_p50 - 1) * 100 if c.baseline_p50 else 0.0
+        click.secho(
+            f"{(c.method + ' ' + c.name).strip():<{width}} {c.requests:>9} "
+            + f"{c.baseline_p50:>9.1f} {c.p50:>9.1f} {change:>+7.1f}% "
+            + f"{c.test.p_value:>9.2g} {c.test.effect:>10.2f}",
+            fg="red" if c.regressed else None,
+        )
@@ -0,0 +1,180 @@
+"""Per-worker cache of the collections served by the STAC API."""
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from ..data_loader.generator import DATETIME_END, DATETIME_START
+from .seed_index import get_seed_index
+
+WORLD_BBOX = [-180.0, -90.0, 180.0, 90.0]
+# The datetimes of the generated items, for collections without a temporal extent
+DEFAULT_INTERVAL = (DATETIME_START.timestamp(), DATETIME_END.timestamp())
+
+
+def parse_interval(collection: dict) -> Tuple[float, float]:
+    """
+    Return the overall temporal extent of a collection, as epoch timestamps.
+
+    An open start falls back to the start of the generated items, an open end to now.
+    """
+    try:
+        start, end = collection["extent"]["temporal"]["interval"][0]
+    except (KeyError, IndexError, TypeError, ValueError):
+        return DEFAULT_INTERVAL
+    try:
+        return (
+            datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp()
+            if start
+            else DEFAULT_INTERVAL[0],
+            datetime.fromisoformat(end.replace("Z", "+00:00")).timestamp()
+            if end
+            else time.time(),
+        )
+    except (AttributeError, ValueError):
+        return DEFAULT_INTERVAL
+
+
+class CollectionCatalog:
+    """
+    Collection ids, bboxes, temporal extents and summaries fetched from `GET /collections`, shared by every user of a worker.
+
+    The catalog is fetched once and refreshed when older than `ttl` seconds. With
+    `exclude_from_stats`, the fetch goes through a plain session instead of the Locust
+    client, so it does not show up in the reported stats.
+
+    Attributes:
+        ttl (float): The number of seconds before the catalog is refreshed.
+        exclude_from_stats (bool): Whether catalog requests are hidden from the stats.
+        bboxes (dict): The bbox of each collection, keyed by collection id.
+        intervals (dict): The temporal extent of each collection, as epoch timestamps.
+        summaries (dict): The `summaries` of each collection.
+        collection_ids (list): The ids of all collections.
+    """
+
+    def __init__(self, ttl: float = 300, exclude_from_stats: bool = False):
+        """Initialize an empty catalog."""
+        self.ttl = ttl
+        self.exclude_from_stats = exclude_from_stats
+        self.bboxes: Dict[str, List[float]] = {}
+        self.intervals: Dict[str, Tuple[float, float]] = {}
+        self.summaries: Dict[str, dict] = {}
+        self.collection_ids: List[str] = []
+        self.fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+
+    def is_stale(self) -> bool:
+        """Return True if the catalog was never fetched or has expired."""
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > self.ttl
+
+    def ensure(self, user):
+        """
+        Refresh the catalog if it is stale.
+
+        Only one user fetches at a time, the others wait and reuse its result.
+
+        Args:
+            user (HttpUser): The Locust user whose client or host is used to fetch.
+        """
+        if not self.is_stale():
+            return
+        with self._lock:
+            if self.is_stale():
+                self.refresh(user)
+
+    def refresh(self, user):
+        """
+        Fetch every collection, following `next` links.
+
+        If the fetch fails, the previous catalog is kept. If nothing was ever fetched,
+        the collections of the seed index are used with a world bbox.
+
+        Args:
+            user (HttpUser): The Locust user whose client or host is used to fetch.
+        """
+        bboxes: Dict[str, List[float]] = {}
+        intervals: Dict[str, Tuple[float, float]] = {}
+        summaries: Dict[str, dict] = {}
+        url: Optional[str] = f"{user.host}/collections"
+        try:
+            while url:
+                body = self._get(user, url)
+                for collection in body.get("collections", []):
+                    try:
+                        bbox = collection["extent"]["spatial"]["bbox"][0]
+                    except (KeyError, IndexError):
+                        bbox = WORLD_BBOX
+                    bboxes[collection["id"]] = bbox
+                    intervals[collection["id"]] = parse_interval(collection)
+                    summaries[collection["id"]] = collection.get("summaries") or {}
+                url = next(
+                    (
+                        urljoin(url, link["href"])
+                        for link in body.get("links", [])
+                        if link.get("rel") == "next"
+                    ),
+                    None,
+                )
+        except Exception as e:
+            # FastHttpUser raises geventhttpclient and OS errors (e.g. a refused
+            # connection) instead of requests exceptions, both engines fall back alike
+            print(f"Failed to fetch collections: {e!r}")
+
+        if bboxes:
+            self.bboxes = bboxes
+            self.intervals = intervals
+            self.summaries = summaries
+        elif not self.bboxes:
+            self.bboxes = {
+                collection_id: WORLD_BBOX
+                for collection_id in get_seed_index().collection_ids
+            }
+        self.collection_ids = list(self.bboxes)
+        self.fetched_at = time.monotonic()
+
+    def _get(self, user, url: str) -> dict:
+        """GET a page of collections, through the Locust client unless excluded from stats."""
+        if self.exclude_from_stats:
+            if self._session is None:
+                self._session = requests.Session()
+            resp = self._session.get(url)
+        else:
+            resp = user.client.get(url, name="get-collections")
+        resp.raise_for_status()
+        return resp.json()
+
+    def bbox(self, collection_id: str) -> List[float]:
+        """Return the bbox of a collection."""
+        return self.bboxes.get(collection_id, WORLD_BBOX)
+
+    def interval(self, collection_id: str) -> Tuple[float, float]:
+        """Return the temporal extent of a collection, as epoch timestamps."""
+        return self.intervals.get(collection_id, DEFAULT_INTERVAL)
+
+    def summary(self, collection_id: str) -> dict:
+        """Return the summaries of a collection, empty if unknown."""
+        return self.summaries.get(collection_id, {})
+
+
+@lru_cache(maxsize=None)
+def get_collection_catalog() -> CollectionCatalog:
+    """
+    Return the worker-wide collection catalog.
+
+    The refresh interval and stats exclusion are read from the `STAC_CATALOG_TTL` and
+    `STAC_EXCLUDE_SETUP_STATS` environment variables, set by the CLI from `--catalog-ttl`
+    and `--exclude-setup-stats`.
+
+    Returns:
+        CollectionCatalog: The shared catalog.
+    """
+    return CollectionCatalog(
+        ttl=float(os.getenv("STAC_CATALOG_TTL", "300")),
+        exclude_from_stats=os.getenv("STAC_EXCLUDE_SETUP_STATS", "") == "1",
+    )
@@ -0,0 +1,45 @@
+"""JSON codec of the load test requests and responses, orjson when installed."""
+import json
+from typing import Any, Dict, Union
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a JSON document."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_body(value: Any) -> Dict[str, Any]:
+    """
+    Return the request arguments sending a JSON body, encoded by the codec.
+
+    Both Locust clients encode `json=` bodies with the standard library, so bodies are
+    passed pre-encoded instead, e.g. `client.post(url, **json_body(body), name=...)`.
+
+    Args:
+        value: The JSON document.
+
+    Returns:
+        dict: The `data` and `headers` arguments of the request.
+    """
+    return {"data": dumps(value), "headers": JSON_HEADERS}
+
+
+def response_json(response) -> Any:
+    """Decode the JSON body of a Locust client response."""
+    return loads(response.content)
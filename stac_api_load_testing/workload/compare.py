@@ -0,0 +1,167 @@
+"""Side-by-side comparison of load test results across STAC API backends."""
+import csv
+import json
+from typing import Dict, List, Tuple
+
+import click
+
+COMPARED_METRICS = ["rps", "p50", "p95", "p99", "failure_rate"]
+# Metrics where a higher value is better, the others regress when they grow
+HIGHER_IS_BETTER = {"rps"}
+# Absolute changes below these are noise, whatever the relative change
+NOISE_FLOORS = {"rps": 1.0, "p50": 5.0, "p95": 5.0, "p99": 5.0, "failure_rate": 0.001}
+COLUMN_WIDTH = 13
+
+
+def parse_endpoint(text: str) -> Tuple[str, str]:
+    """
+    Parse a named endpoint.
+
+    Args:
+        text (str): The endpoint in NAME=URL notation, e.g. `pgstac=http://localhost:8083`.
+
+    Returns:
+        tuple: The name and the URL.
+
+    Raises:
+        ValueError: If the endpoint is malformed.
+    """
+    name, separator, url = text.partition("=")
+    if not separator or not name.strip() or not url.strip():
+        raise ValueError(f"Invalid endpoint '{text}', expected NAME=URL")
+    return name.strip(), url.strip()
+
+
+def load_results(path: str) -> List[Dict]:
+    """Return the per-endpoint rows of a results file written by a headless run."""
+    with open(path) as file:
+        return json.load(file)["endpoints"]
+
+
+def compare_results(results: Dict[str, List[Dict]]) -> List[Dict]:
+    """
+    Line up the results of several backends by endpoint name.
+
+    Args:
+        results (dict): The per-endpoint rows of each backend, keyed by backend name.
+
+    Returns:
+        list: A row per endpoint name, with a `{backend}_{metric}` column per backend
+            and compared metric. Endpoints missing from a backend have empty columns.
+    """
+    names: List[Tuple[str, str]] = []
+    indexed: Dict[str, Dict[Tuple[str, str], Dict]] = {}
+    for backend, rows in results.items():
+        indexed[backend] = {(row["method"], row["name"]): row for row in rows}
+        for row in rows:
+            if (row["method"], row["name"]) not in names:
+                names.append((row["method"], row["name"]))
+    # Keep the aggregate last, as in the results files
+    names.sort(key=lambda key: (key[1] == "Aggregated", key[1], key[0]))
+
+    table = []
+    for method, name in names:
+        line: Dict = {"method": method, "name": name}
+        for backend in results:
+            row = indexed[backend].get((method, name), {})
+            for metric in COMPARED_METRICS:
+                line[f"{backend}_{metric}"] = row.get(metric)
+        table.append(line)
+    return table
+
+
+def write_comparison(results: Dict[str, List[Dict]], table: List[Dict], prefix: str):
+    """
+    Write a comparison to `{prefix}.json`, reusable as a baseline, and `{prefix}.csv`.
+
+    Args:
+        results (dict): The per-endpoint rows of each backend.
+        table (list): The side-by-side rows of `compare_results`.
+        prefix (str): The path prefix of the output files.
+    """
+    with open(f"{prefix}.json", "w") as file:
+        json.dump({"backends": results}, file, indent=2)
+    with open(f"{prefix}.csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(table[0]))
+        writer.writeheader()
+        writer.writerows(table)
+
+
+def load_baseline(path: str) -> Dict[str, List[Dict]]:
+    """Return the per-backend results of a comparison saved by `write_comparison`."""
+    with open(path) as file:
+        return json.load(file)["backends"]
+
+
+def find_regressions(
+    results: Dict[str, List[Dict]],
+    baseline: Dict[str, List[Dict]],
+    tolerance: float = 0.1,
+) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    A metric regresses when it is worse than the baseline by more than `tolerance`
+    (relative) and by more than its noise floor (absolute). Backends and endpoints
+    missing from the baseline are not checked.
+
+    Args:
+        results (dict): The per-endpoint rows of each backend.
+        baseline (dict): The per-endpoint rows of each backend in the baseline.
+        tolerance (float): The accepted relative degradation, e.g. 0.1 for 10%.
+
+    Returns:
+        list: A message per regressed metric.
+    """
+    regressions = []
+    for backend, rows in results.items():
+        baseline_rows = {
+            (row["method"], row["name"]): row for row in baseline.get(backend, [])
+        }
+        for row in rows:
+            previous = baseline_rows.get((row["method"], row["name"]))
+            if previous is None:
+                continue
+            for metric in COMPARED_METRICS:
+                current, reference = row.get(metric), previous.get(metric)
+                if current is None or reference is None:
+                    continue
+                change = (
+                    reference - current
+                    if metric in HIGHER_IS_BETTER
+                    else current - reference
+                )
+                if (
+                    change > NOISE_FLOORS[metric]
+                    and change > abs(reference) * tolerance
+                ):
+                    regressions.append(
+                        f"{backend} {row['method']} {row['name']}: {metric} "
+                        + f"{reference:g} -> {current:g}"
+                    )
+    return regressions
+
+
+def echo_comparison(table: List[Dict], backends: List[str]):
+    """Print a side-by-side table, one block of columns per backend."""
+    width = max([len(f"{row['method']} {row['name']}") for row in table] + [8])
+    header = f"{'Endpoint':<{width}}"
+    for backend in backends:
+        header += " | " + f"{backend:^{COLUMN_WIDTH * len(COMPARED_METRICS)}}"
+    click.secho(header, bold=True)
+    subheader = " " * width
+    for _ in backends:
+        subheader += " | " + "".join(
+            f"{metric:>{COLUMN_WIDTH}}" for metric in COMPARED_METRICS
+        )
+    click.echo(subheader)
+    for row in table:
+        line = f"{(row['method'] + ' ' + row['name']).strip():<{width}}"
+        for backend in backends:
+            line += " | "
+            for metric in COMPARED_METRICS:
+                value = row[f"{backend}_{metric}"]
+                line += (
+                    f"{'-' if value is None else format(value, 'g'):>{COLUMN_WIDTH}}"
+                )
+        click.echo(line)
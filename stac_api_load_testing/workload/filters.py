@@ -0,0 +1,171 @@
+"""Search parameters of the datetime, CQL2 filter, fields and query workloads."""
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+from .query_corpus import format_datetime
+
+DAY = 24 * 60 * 60
+# Intervals cover at most this fraction of a collection's temporal extent
+MAX_INTERVAL_FRACTION = 0.25
+OPEN_INTERVAL_PROBABILITY = 0.2
+# Numeric properties compared when the collection summaries do not give their range
+DEFAULT_RANGES = {"eo:cloud_cover": (0.0, 100.0)}
+# Array-valued item properties, which equality comparisons do not apply to
+ARRAY_PROPERTIES = {"instruments"}
+MAX_PREDICATES = 2
+QUERY_OPERATORS = {"=": "eq", "<=": "lte", ">=": "gte"}
+FIELDS = [
+    "id",
+    "collection",
+    "geometry",
+    "bbox",
+    "properties.datetime",
+    "properties.eo:cloud_cover",
+    "properties.platform",
+    "assets",
+    "links",
+]
+
+
+class Predicate(NamedTuple):
+    """A comparison of an item property to a value, e.g. `eo:cloud_cover <= 20`."""
+
+    property: str
+    op: str
+    value: object
+
+
+def queryables(summary: dict) -> Tuple[Dict[str, list], Dict[str, Tuple[float, float]]]:
+    """
+    Split collection summaries into enumerated and numeric range properties.
+
+    Args:
+        summary (dict): The `summaries` of a collection.
+
+    Returns:
+        tuple: The values of each enumerated property and the (minimum, maximum) of
+            each range property, defaulting to `DEFAULT_RANGES`.
+    """
+    enums: Dict[str, list] = {}
+    ranges = dict(DEFAULT_RANGES)
+    for name, values in summary.items():
+        if name in ARRAY_PROPERTIES:
+            continue
+        if isinstance(values, dict) and "minimum" in values and "maximum" in values:
+            ranges[name] = (float(values["minimum"]), float(values["maximum"]))
+        elif isinstance(values, list) and values:
+            scalars = [
+                value for value in values if isinstance(value, (str, int, float))
+            ]
+            if scalars:
+                enums[name] = scalars
+    return enums, ranges
+
+
+def datetime_interval(interval: Tuple[float, float]) -> str:
+    """
+    Return a random RFC 3339 interval within a collection's temporal extent.
+
+    Intervals last from a day to a quarter of the extent, some are open-ended.
+
+    Args:
+        interval (tuple): The temporal extent, as epoch timestamps.
+
+    Returns:
+        str: The `datetime` search parameter.
+    """
+    start, end = interval
+    extent = max(end - start, 0.0)
+    min_span = min(DAY, extent)
+    span = random.uniform(min_span, max(extent * MAX_INTERVAL_FRACTION, min_span))
+    interval_start = random.uniform(start, end - span)
+    interval_end = interval_start + span
+    draw = random.random()
+    if draw < OPEN_INTERVAL_PROBABILITY / 2:
+        return f"../{format_datetime(interval_end)}"
+    if draw < OPEN_INTERVAL_PROBABILITY:
+        return f"{format_datetime(interval_start)}/.."
+    return f"{format_datetime(interval_start)}/{format_datetime(interval_end)}"
+
+
+def random_predicates(summary: dict) -> List[Predicate]:
+    """
+    Draw one or two comparisons on the properties summarized by a collection.
+
+    Enumerated properties (e.g. `platform`) are compared for equality to one of their
+    values, range properties (e.g. `eo:cloud_cover`) to a bound inside their range.
+
+    Args:
+        summary (dict): The `summaries` of a collection.
+
+    Returns:
+        list: The predicates, on distinct properties.
+    """
+    enums, ranges = queryables(summary)
+    names = random.sample(
+        list(enums) + list(ranges),
+        random.randint(1, min(MAX_PREDICATES, len(enums) + len(ranges))),
+    )
+    predicates = []
+    for name in names:
+        if name in enums:
+            predicates.append(Predicate(name, "=", random.choice(enums[name])))
+        else:
+            low, high = ranges[name]
+            predicates.append(
+                Predicate(
+                    name,
+                    random.choice(["<=", ">="]),
+                    round(random.uniform(low, high), 2),
+                )
+            )
+    return predicates
+
+
+def cql2_json(predicates: List[Predicate]) -> dict:
+    """Return predicates as a CQL2-JSON filter, combined with `and`."""
+    comparisons = [
+        {
+            "op": predicate.op,
+            "args": [{"property": predicate.property}, predicate.value],
+        }
+        for predicate in predicates
+    ]
+    if len(comparisons) == 1:
+        return comparisons[0]
+    return {"op": "and", "args": comparisons}
+
+
+def cql2_literal(value: object) -> str:
+    """Return a value as a CQL2-text literal."""
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def cql2_text(predicates: List[Predicate]) -> str:
+    """Return predicates as a CQL2-text filter, combined with `AND`."""
+    return " AND ".join(
+        f"{predicate.property} {predicate.op} {cql2_literal(predicate.value)}"
+        for predicate in predicates
+    )
+
+
+def query_extension(predicates: List[Predicate]) -> dict:
+    """Return predicates as a Query extension `query` object."""
+    return {
+        predicate.property: {QUERY_OPERATORS[predicate.op]: predicate.value}
+        for predicate in predicates
+    }
+
+
+def random_fields() -> Dict[str, List[str]]:
+    """Return a random Fields extension `fields` object, including and excluding fields."""
+    selected = random.sample(FIELDS, random.randint(1, 5))
+    split = random.randint(0, len(selected))
+    return {"include": selected[:split], "exclude": selected[split:]}
+
+
+def fields_parameter(fields: Dict[str, List[str]]) -> str:
+    """Return a `fields` object as a GET `fields` parameter, e.g. `id,-assets`."""
+    return ",".join(fields["include"] + [f"-{field}" for field in fields["exclude"]])
@@ -0,0 +1,155 @@
+"""Full-resolution per-endpoint latency histograms."""
+import json
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from hdrh.histogram import HdrHistogram
+
+LOWEST_TRACKABLE_US = 1
+HIGHEST_TRACKABLE_US = 60 * 60 * 1000 * 1000
+SIGNIFICANT_FIGURES = 3
+HDR_PERCENTILES = [50, 90, 99, 99.9, 99.99]
+AGGREGATED = ("", "Aggregated")
+
+
+def new_histogram() -> HdrHistogram:
+    """Return an empty histogram of latencies in microseconds, from 1us to 1h at 3 significant figures."""
+    return HdrHistogram(LOWEST_TRACKABLE_US, HIGHEST_TRACKABLE_US, SIGNIFICANT_FIGURES)
+
+
+def hdr_key(percentile: float) -> str:
+    """Return the result key of a histogram percentile, e.g. `hdr_p99.99`."""
+    return f"hdr_p{percentile:g}"
+
+
+class HistogramRecorder:
+    """
+    Record every request latency into an HdrHistogram per endpoint.
+
+    Histograms have a fixed memory footprint whatever the number of requests, and
+    add up bucket by bucket, so workers ship encoded snapshots to the master, which
+    merges them.
+
+    Attributes:
+        histograms (dict): The histograms keyed by (method, name), including the aggregate.
+    """
+
+    def __init__(self):
+        """Initialize an empty recorder."""
+        self.histograms: Dict[Tuple[str, str], HdrHistogram] = {}
+
+    def _histogram(self, key: Tuple[str, str]) -> HdrHistogram:
+        """Return the histogram of an endpoint, creating it on first use."""
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = new_histogram()
+        return histogram
+
+    def record(self, method: str, name: str, response_time: float):
+        """
+        Record a request latency.
+
+        Args:
+            method (str): The request method.
+            name (str): The endpoint name.
+            response_time (float): The latency in milliseconds.
+        """
+        value = min(
+            max(int(response_time * 1000), LOWEST_TRACKABLE_US), HIGHEST_TRACKABLE_US
+        )
+        self._histogram((method, name)).record_value(value)
+        self._histogram(AGGREGATED).record_value(value)
+
+    def encode(self) -> Dict[str, str]:
+        """Return the compressed, base64-encoded histograms keyed by `METHOD name`."""
+        return {
+            f"{method} {name}": histogram.encode().decode("ascii")
+            for (method, name), histogram in self.histograms.items()
+            if histogram.get_total_count()
+        }
+
+    def merge(self, encoded: Dict[str, str]):
+        """Add histograms produced by `encode`, e.g. from a worker report."""
+        for key, payload in encoded.items():
+            method, name = key.split(" ", 1)
+            self._histogram((method, name)).decode_and_add(payload)
+
+    def reset(self):
+        """Drop all recorded latencies."""
+        self.histograms = {}
+
+    def percentiles(self, method: str, name: str) -> Dict[str, float]:
+        """
+        Return the histogram percentiles of an endpoint, in milliseconds.
+
+        Args:
+            method (str): The request method, empty for the aggregate.
+            name (str): The endpoint name, `Aggregated` for the aggregate.
+
+        Returns:
+            dict: The latencies keyed by `hdr_p50` ... `hdr_p99.99`, empty if nothing was recorded.
+        """
+        histogram = self.histograms.get((method, name))
+        if histogram is None or not histogram.get_total_count():
+            return {}
+        return {
+            hdr_key(percentile): histogram.get_value_at_percentile(percentile) / 1000
+            for percentile in HDR_PERCENTILES
+        }
+
+    def export(self, path: str):
+        """
+        Write every histogram to a JSON file that can be reloaded and diffed between runs.
+
+        Args:
+            path (str): The output file.
+        """
+        endpoints: List[Dict] = []
+        for (method, name), histogram in sorted(self.histograms.items()):
+            endpoints.append(
+                {
+                    "method": method,
+                    "name": name,
+                    "count": histogram.get_total_count(),
+                    "percentiles": self.percentiles(method, name),
+                    "histogram": histogram.encode().decode("ascii"),
+                }
+            )
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "unit": "us",
+                    "significant_figures": SIGNIFICANT_FIGURES,
+                    "endpoints": endpoints,
+                },
+                file,
+                indent=2,
+            )
+
+
+def load_histograms(path: str) -> HistogramRecorder:
+    """
+    Load histograms written by `HistogramRecorder.export`.
+
+    Args:
+        path (str): The histogram file.
+
+    Returns:
+        HistogramRecorder: A recorder holding the loaded histograms.
+    """
+    with open(path) as file:
+        exported = json.load(file)
+    recorder = HistogramRecorder()
+    recorder.merge(
+        {
+            f"{endpoint['method']} {endpoint['name']}": endpoint["histogram"]
+            for endpoint in exported["endpoints"]
+        }
+    )
+    return recorder
+
+
+@lru_cache(maxsize=None)
+def get_histogram_recorder() -> HistogramRecorder:
+    """Return the process-wide histogram recorder."""
+    return HistogramRecorder()
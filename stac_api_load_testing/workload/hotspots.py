@@ -0,0 +1,462 @@
+"""Clustered spatial and temporal distributions of the generated search queries."""
+import itertools
+import json
+import math
+import os
+import random
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .query_corpus import SORT_FIELDS, Query, format_datetime
+from .seed_index import SeedIndex, get_seed_index
+
+DISTRIBUTIONS = ["uniform", "zipf", "gaussian", "footprint"]
+TEMPORAL_DISTRIBUTIONS = ["none", "uniform", "recent"]
+DAY = 24 * 60 * 60
+MIN_DATETIME_SPAN = DAY
+MAX_DATETIME_SPAN = 30 * DAY
+# Seed items drawn per hotspot when picking the hotspots, so most land on distinct tiles
+CANDIDATES_PER_HOTSPOT = 20
+# Tiles listed by share of the queries in the exported stats
+TOP_TILES = 20
+# The hotspot rank, collection id and point of a query, None for uniform points
+PointDraw = Tuple[Optional[int], Optional[str], float, float]
+
+
+class SpatialSettings(NamedTuple):
+    """
+    Distributions of the points and bboxes searched by the generated queries.
+
+    Attributes:
+        distribution (str): `uniform` inside the collection bbox, `zipf` over hotspot tiles,
+            `gaussian` around hotspot points or `footprint`, following the seed items.
+        hotspots (int): The number of hotspot tiles or points.
+        zipf_exponent (float): The exponent of the Zipf law over the hotspot tiles.
+        sigma (float): The standard deviation around gaussian hotspots, in degrees.
+        tile_size (float): The edge of the hotspot and stats tiles, and the largest edge
+            of the searched bboxes, in degrees.
+        temporal (str): `none` (no datetime), `uniform` over the collection's temporal
+            extent or `recent`, decaying exponentially from its end.
+        half_life (float): The half-life of `recent` datetimes, in days.
+        seed (int): The seed of the hotspots and of the queries.
+        batch_size (int): The number of queries sampled at once.
+    """
+
+    distribution: str = "uniform"
+    hotspots: int = 100
+    zipf_exponent: float = 1.1
+    sigma: float = 0.5
+    tile_size: float = 1.0
+    temporal: str = "none"
+    half_life: float = 90.0
+    seed: int = 0
+    batch_size: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "SpatialSettings":
+        """
+        Read the settings from the `STAC_SPATIAL_*` and `STAC_TEMPORAL_*` environment variables.
+
+        They are set by the CLI from `--spatial-distribution`, `--hotspots`,
+        `--zipf-exponent`, `--hotspot-sigma`, `--hotspot-tile-size`,
+        `--temporal-distribution`, `--recent-half-life` and `--query-seed`.
+        """
+        return cls(
+            distribution=os.getenv("STAC_SPATIAL_DISTRIBUTION", "uniform"),
+            hotspots=int(os.getenv("STAC_SPATIAL_HOTSPOTS", "100")),
+            zipf_exponent=float(os.getenv("STAC_SPATIAL_ZIPF_EXPONENT", "1.1")),
+            sigma=float(os.getenv("STAC_SPATIAL_SIGMA", "0.5")),
+            tile_size=float(os.getenv("STAC_SPATIAL_TILE_SIZE", "1")),
+            temporal=os.getenv("STAC_TEMPORAL_DISTRIBUTION", "none"),
+            half_life=float(os.getenv("STAC_TEMPORAL_HALF_LIFE", "90")),
+            seed=int(os.getenv("STAC_QUERY_SEED", "0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether queries follow other distributions than the default uniform ones."""
+        return self.distribution != "uniform" or self.temporal != "none"
+
+
+class Hotspot(NamedTuple):
+    """A hotspot tile or point, in the collection of the seed item it was picked from."""
+
+    collection_id: str
+    bbox: List[float]
+
+
+def item_center(bbox: List[float]) -> Tuple[float, float]:
+    """Return the center of a bbox."""
+    return (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+
+
+def tile_key(x: float, y: float, tile_size: float) -> Tuple[int, int]:
+    """Return the column and row of the tile holding a point."""
+    return math.floor(x / tile_size), math.floor(y / tile_size)
+
+
+def pick_hotspots(
+    seed_index: SeedIndex, settings: SpatialSettings, rng: random.Random
+) -> List[Hotspot]:
+    """
+    Pick the hotspots among the seed items, so they fall where there is data.
+
+    Zipf hotspots are the distinct tiles holding the centers of random seed items,
+    ranked in the order they were drawn; gaussian hotspots are the centers themselves.
+
+    Args:
+        seed_index (SeedIndex): The ingested items.
+        settings (SpatialSettings): The distribution settings.
+        rng (Random): The seeded random generator.
+
+    Returns:
+        list: The hotspots, most popular first.
+    """
+    hotspots: List[Hotspot] = []
+    tiles = set()
+    for _ in range(settings.hotspots * CANDIDATES_PER_HOTSPOT):
+        if len(hotspots) >= settings.hotspots or not len(seed_index):
+            break
+        index = rng.randrange(len(seed_index))
+        collection_id, _ = seed_index.item(index)
+        x, y = item_center(seed_index.bbox(index))
+        if settings.distribution == "gaussian":
+            hotspots.append(Hotspot(collection_id, [x, y, x, y]))
+            continue
+        column, row = tile_key(x, y, settings.tile_size)
+        if (collection_id, column, row) in tiles:
+            continue
+        tiles.add((collection_id, column, row))
+        hotspots.append(
+            Hotspot(
+                collection_id,
+                [
+                    column * settings.tile_size,
+                    row * settings.tile_size,
+                    (column + 1) * settings.tile_size,
+                    (row + 1) * settings.tile_size,
+                ],
+            )
+        )
+    return hotspots
+
+
+def clamp_point(x: float, y: float) -> Tuple[float, float]:
+    """Clamp a point to the WGS84 bounds."""
+    return min(max(x, -180.0), 180.0), min(max(y, -90.0), 90.0)
+
+
+class SpatialStats:
+    """
+    Counts of the generated queries per tile, hotspot and month.
+
+    Counts add up, so workers ship them to the master, which merges them, like the
+    latency histograms.
+
+    Attributes:
+        tiles (Counter): The queries per `column,row` tile of the stats grid.
+        hotspots (Counter): The queries per hotspot rank.
+        months (Counter): The queries per `YYYY-MM` of the end of their datetime.
+    """
+
+    def __init__(self):
+        """Initialize empty counts."""
+        self.tiles: Counter = Counter()
+        self.hotspots: Counter = Counter()
+        self.months: Counter = Counter()
+
+    def encode(self) -> Dict[str, Dict]:
+        """Return the counts as a JSON-serializable dict."""
+        return {
+            "tiles": dict(self.tiles),
+            "hotspots": {str(rank): count for rank, count in self.hotspots.items()},
+            "months": dict(self.months),
+        }
+
+    def merge(self, encoded: Dict[str, Dict]):
+        """Add counts encoded by `encode`, e.g. those shipped by a worker."""
+        self.tiles.update(encoded.get("tiles", {}))
+        self.hotspots.update(
+            {int(rank): count for rank, count in encoded.get("hotspots", {}).items()}
+        )
+        self.months.update(encoded.get("months", {}))
+
+    def reset(self):
+        """Drop the counts."""
+        self.tiles.clear()
+        self.hotspots.clear()
+        self.months.clear()
+
+    def summary(self, settings: SpatialSettings) -> Dict:
+        """
+        Summarize the counts: concentration on the busiest tiles and hotspots.
+
+        Args:
+            settings (SpatialSettings): The distribution settings of the run.
+
+        Returns:
+            dict: The settings, query count, distinct tiles, busiest tiles and counts.
+        """
+        total = sum(self.tiles.values())
+        top = self.tiles.most_common()
+        summary: Dict = {
+            "settings": settings._asdict(),
+            "queries": total,
+            "distinct_tiles": len(top),
+            "top_tiles": [
+                {"tile": tile, "queries": count, "share": round(count / total, 5)}
+                for tile, count in top[:TOP_TILES]
+            ],
+        }
+        for fraction in (0.01, 0.1):
+            busiest = top[: max(1, math.ceil(len(top) * fraction))]
+            summary[f"share_busiest_{fraction * 100:g}pct_tiles"] = (
+                round(sum(count for _, count in busiest) / total, 5) if total else 0
+            )
+        summary["hotspot_queries"] = {
+            str(rank): count for rank, count in sorted(self.hotspots.items())
+        }
+        summary["month_queries"] = dict(sorted(self.months.items()))
+        return summary
+
+    def export(self, path: str, settings: SpatialSettings):
+        """Write the summary of the counts to a JSON file."""
+        with open(path, "w") as file:
+            json.dump(self.summary(settings), file, indent=2)
+
+
+@lru_cache(maxsize=None)
+def get_spatial_stats() -> SpatialStats:
+    """Return the process-wide query distribution counts."""
+    return SpatialStats()
+
+
+class QuerySampler:
+    """
+    Draws search queries from the configured spatial and temporal distributions.
+
+    Hotspots are picked once per process from the seed items. Points, hotspot ranks,
+    datetimes and sort orders are then drawn in batches of `batch_size` (a single
+    `random.choices` call over the cumulative Zipf weights per batch), and each query
+    only pops its draw from the batch. Uniform points are drawn in the unit square and
+    scaled to the collection bbox when used, so they follow catalog refreshes.
+
+    Attributes:
+        settings (SpatialSettings): The distributions.
+        hotspots (list): The hotspots, most popular first.
+        stats (SpatialStats): The counts the queries are recorded into.
+    """
+
+    def __init__(
+        self,
+        settings: SpatialSettings,
+        seed_index: SeedIndex,
+        seed: int = 0,
+        stats: Optional[SpatialStats] = None,
+    ):
+        """Pick the hotspots, with the settings' seed so every worker shares them."""
+        self.settings = settings
+        self.seed_index = seed_index
+        self.stats = stats if stats is not None else SpatialStats()
+        self.hotspots: List[Hotspot] = []
+        if settings.distribution in ("zipf", "gaussian"):
+            self.hotspots = pick_hotspots(
+                seed_index, settings, random.Random(settings.seed)
+            )
+            if not self.hotspots:
+                raise ValueError("No seed items to pick hotspots from")
+        weights = [
+            1 / (rank + 1) ** settings.zipf_exponent
+            for rank in range(len(self.hotspots))
+        ]
+        self._cum_weights = list(itertools.accumulate(weights))
+        self._rng = random.Random(seed)
+        self._batch: List[tuple] = []
+
+    def _draw_points(self, n: int) -> List[PointDraw]:
+        """Draw the hotspot rank, collection and point of `n` queries."""
+        rng, settings = self._rng, self.settings
+        if settings.distribution == "zipf":
+            ranks = rng.choices(
+                range(len(self.hotspots)), cum_weights=self._cum_weights, k=n
+            )
+            return [
+                (
+                    rank,
+                    self.hotspots[rank].collection_id,
+                    rng.uniform(
+                        self.hotspots[rank].bbox[0], self.hotspots[rank].bbox[2]
+                    ),
+                    rng.uniform(
+                        self.hotspots[rank].bbox[1], self.hotspots[rank].bbox[3]
+                    ),
+                )
+                for rank in ranks
+            ]
+        if settings.distribution == "gaussian":
+            ranks = [rng.randrange(len(self.hotspots)) for _ in range(n)]
+            return [
+                (
+                    rank,
+                    self.hotspots[rank].collection_id,
+                    *clamp_point(
+                        rng.gauss(self.hotspots[rank].bbox[0], settings.sigma),
+                        rng.gauss(self.hotspots[rank].bbox[1], settings.sigma),
+                    ),
+                )
+                for rank in ranks
+            ]
+        if settings.distribution == "footprint":
+            points: List[PointDraw] = []
+            for index in (rng.randrange(len(self.seed_index)) for _ in range(n)):
+                collection_id, _ = self.seed_index.item(index)
+                minx, miny, maxx, maxy = self.seed_index.bbox(index)
+                points.append(
+                    (
+                        None,
+                        collection_id,
+                        rng.uniform(minx, maxx),
+                        rng.uniform(miny, maxy),
+                    )
+                )
+            return points
+        return [(None, None, rng.random(), rng.random()) for _ in range(n)]
+
+    def _refill(self):
+        """Draw the next batch of queries, in reverse order as they are popped."""
+        n, rng = self.settings.batch_size, self._rng
+        points = self._draw_points(n)
+        if self.settings.temporal == "recent":
+            decay = math.log(2) / (self.settings.half_life * DAY)
+            draws = [rng.expovariate(decay) for _ in range(n)]
+        else:
+            draws = [rng.random() for _ in range(n)]
+        spans = [rng.uniform(MIN_DATETIME_SPAN, MAX_DATETIME_SPAN) for _ in range(n)]
+        # Bbox edges as fractions of the tile size, and the methods and sort directions
+        shapes = [(rng.random(), rng.random(), rng.getrandbits(8)) for _ in range(n)]
+        self._batch = list(zip(points, draws, spans, shapes))
+        self._batch.reverse()
+
+    def query_datetime(
+        self, collection_interval: Tuple[float, float], draw: float, span: float
+    ) -> Optional[str]:
+        """
+        Return the datetime interval of a query within a collection's temporal extent.
+
+        Args:
+            collection_interval (tuple): The temporal extent, as epoch timestamps.
+            draw (float): The drawn age of the interval end, in seconds, for `recent`
+                datetimes, its position in the extent, from 0 to 1, for `uniform` ones.
+            span (float): The drawn duration of the interval, in seconds.
+
+        Returns:
+            str: The `datetime` search parameter, None without temporal distribution.
+        """
+        if self.settings.temporal == "none":
+            return None
+        start, end = collection_interval
+        if self.settings.temporal == "recent":
+            interval_end = max(end - draw, start)
+        else:
+            interval_end = start + draw * (end - start)
+        interval_start = max(interval_end - span, start)
+        self.stats.months[format_datetime(interval_end)[:7]] += 1
+        return f"{format_datetime(interval_start)}/{format_datetime(interval_end)}"
+
+    def next_query(self, kind: str, catalog) -> Query:
+        """
+        Return the next query of a kind.
+
+        Args:
+            kind (str): `intersects` or `bbox`.
+            catalog (CollectionCatalog): The collections, for the bboxes of uniform
+                queries and the temporal extents.
+
+        Returns:
+            Query: The search query.
+        """
+        if not self._batch:
+            self._refill()
+        (rank, collection_id, x, y), draw, span, shape = self._batch.pop()
+        width, height, bits = shape
+        if collection_id is None:
+            # Uniform inside the bbox of a random collection
+            collection_id = self._rng.choice(catalog.collection_ids)
+            bbox = catalog.bbox(collection_id)
+            x = bbox[0] + x * (bbox[2] - bbox[0])
+            y = bbox[1] + y * (bbox[3] - bbox[1])
+
+        if kind == "intersects":
+            search_bbox = [x, y, x, y]
+        else:
+            half_width = width * self.settings.tile_size / 2
+            half_height = height * self.settings.tile_size / 2
+            search_bbox = [
+                *clamp_point(x - half_width, y - half_height),
+                *clamp_point(x + half_width, y + half_height),
+            ]
+
+        self.stats.tiles["{},{}".format(*tile_key(x, y, self.settings.tile_size))] += 1
+        if rank is not None:
+            self.stats.hotspots[rank] += 1
+        return Query(
+            method="POST" if kind == "intersects" or bits & 1 else "GET",
+            collection_id=collection_id,
+            bbox=search_bbox,
+            datetime=self.query_datetime(catalog.interval(collection_id), draw, span),
+            sortby=[
+                (field, bool(bits >> (position + 1) & 1))
+                for position, field in enumerate(SORT_FIELDS)
+            ],
+            limit=None,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_query_sampler(worker_index: int = 0) -> Optional[QuerySampler]:
+    """
+    Return the process-wide query sampler, or None when queries are drawn uniformly.
+
+    Every worker picks the same hotspots but draws its own sequence of queries.
+
+    Args:
+        worker_index (int): The index of this worker, added to the seed of its queries.
+
+    Returns:
+        QuerySampler: The shared sampler.
+    """
+    settings = SpatialSettings.from_env()
+    if not settings.enabled:
+        return None
+    return QuerySampler(
+        settings,
+        get_seed_index(),
+        seed=settings.seed + worker_index,
+        stats=get_spatial_stats(),
+    )
+
+
+def export_stats(environment):
+    """
+    Write the query distribution counts next to the results when Locust quits.
+
+    Runs on the master (or the single local runner) only, the output prefix is read
+    from the `STAC_RESULTS_PREFIX` environment variable.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    # Imported here so the CLI can read the settings without importing (and monkey patching) locust
+    from locust.runners import WorkerRunner
+
+    settings = SpatialSettings.from_env()
+    prefix = os.getenv("STAC_RESULTS_PREFIX")
+    if (
+        not settings.enabled
+        or not prefix
+        or isinstance(environment.runner, WorkerRunner)
+    ):
+        return
+    get_spatial_stats().export(f"{prefix}_spatial.json", settings)
+    print(f"Query distribution written to {prefix}_spatial.json")
@@ -0,0 +1,99 @@
+"""Deep pagination through STAC API `next` links."""
+import os
+from typing import NamedTuple, Optional
+
+from .codec import json_body, response_json
+
+
+class PagingSettings(NamedTuple):
+    """
+    Limits of a paginated search.
+
+    Attributes:
+        limit (int): The page size requested with `limit`.
+        max_pages (int): The deepest page to request.
+        max_items (int): Stop once this many items were returned.
+    """
+
+    limit: int
+    max_pages: int
+    max_items: int
+
+    @classmethod
+    def from_env(cls) -> "PagingSettings":
+        """
+        Read the settings from the environment.
+
+        `STAC_PAGE_LIMIT`, `STAC_MAX_PAGES` and `STAC_MAX_PAGED_ITEMS` are set by the CLI
+        from `--page-limit`, `--max-pages` and `--max-paged-items`.
+        """
+        return cls(
+            limit=int(os.getenv("STAC_PAGE_LIMIT", "100")),
+            max_pages=int(os.getenv("STAC_MAX_PAGES", "10")),
+            max_items=int(os.getenv("STAC_MAX_PAGED_ITEMS", "1000")),
+        )
+
+
+def page_name(name: str, depth: int) -> str:
+    """Return the stats name of a page, e.g. `post-search-paged-page-3`."""
+    return f"{name}-page-{depth}"
+
+
+def next_link(page: dict) -> Optional[dict]:
+    """Return the `next` link of a page of results, if any."""
+    for link in page.get("links", []):
+        if link.get("rel") == "next":
+            return link
+    return None
+
+
+def walk_pages(
+    client,
+    method: str,
+    url: str,
+    name: str,
+    settings: PagingSettings,
+    body: Optional[dict] = None,
+) -> int:
+    """
+    Request a search and follow its `next` links, recording each page depth separately.
+
+    GET links are followed through their `href` (token in the query string). POST links
+    send their `body`, merged into the previous body when the link sets `merge`, as
+    described by the STAC API item search specification.
+
+    Args:
+        client (HttpSession): The Locust client.
+        method (str): The method of the first request, `GET` or `POST`.
+        url (str): The URL of the first request.
+        name (str): The stats name prefix, suffixed with `-page-N`.
+        settings (PagingSettings): The paging limits.
+        body (dict, optional): The body of the first POST request.
+
+    Returns:
+        int: The number of items returned across all pages.
+    """
+    n_items = 0
+    depth = 1
+    while True:
+        if method == "POST":
+            response = client.post(url, **json_body(body), name=page_name(name, depth))
+        else:
+            response = client.get(url, name=page_name(name, depth))
+        if not response.ok:
+            return n_items
+
+        page = response_json(response)
+        n_items += len(page.get("features", []))
+        link = next_link(page)
+        if link is None or depth >= settings.max_pages or n_items >= settings.max_items:
+            return n_items
+
+        method = link.get("method", "GET").upper()
+        url = link["href"]
+        if method == "POST" and "body" in link:
+            if link.get("merge"):
+                body = {**(body or {}), **link["body"]}
+            else:
+                body = link["body"]
+        depth += 1
@@ -0,0 +1,299 @@
+"""Pre-generated, seeded search query corpus."""
+import json
+import math
+import mmap
+import os
+import random
+import struct
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ..data_loader.generator import DATETIME_END, DATETIME_START
+from .seed_index import SeedIndex
+
+MAGIC = b"STACQC1\n"
+HEADER_SIZE = struct.Struct("<I")
+# method, collection index, bbox (a point is stored as a zero-area bbox),
+# datetime start and end (NaN for none), sortby directions bitmask, limit
+RECORD = struct.Struct("<BI4d2dBH")
+# The largest page size of a record, stored as an unsigned short
+MAX_LIMIT = 2**16 - 1
+METHODS = ["GET", "POST"]
+KINDS = ["intersects", "bbox"]
+SORT_FIELDS = ["id", "properties.datetime", "properties.eo:cloud_cover"]
+MAX_BBOX_MARGIN = 1.0
+DATETIME_PROBABILITY = 0.5
+MIN_DATETIME_SPAN = 24 * 60 * 60
+MAX_DATETIME_SPAN = 365 * 24 * 60 * 60
+
+
+class Query(NamedTuple):
+    """
+    A search request of the corpus.
+
+    Attributes:
+        method (str): `GET` or `POST`.
+        collection_id (str): The searched collection.
+        bbox (list): The search bbox, or the `[x, y, x, y]` point of intersects queries.
+        datetime (str, optional): The RFC 3339 datetime interval, if any.
+        sortby (list): `(field, ascending)` pairs.
+        limit (int, optional): The page size, the API default if None.
+    """
+
+    method: str
+    collection_id: str
+    bbox: List[float]
+    datetime: Optional[str]
+    sortby: List[Tuple[str, bool]]
+    limit: Optional[int]
+
+    def search_url(self) -> str:
+        """Return the `GET /search` URL of a bbox query."""
+        sortby = ",".join(
+            f"{'+' if ascending else '-'}{field}" for field, ascending in self.sortby
+        )
+        url = (
+            f"/search?collections={self.collection_id}"
+            + f"&bbox={','.join(str(x) for x in self.bbox)}&sortby={sortby}"
+        )
+        if self.datetime:
+            url += f"&datetime={self.datetime}"
+        if self.limit:
+            url += f"&limit={self.limit}"
+        return url
+
+    def search_body(self, kind: str) -> dict:
+        """Return the `POST /search` body of an `intersects` or `bbox` query."""
+        body: dict = {"collections": [self.collection_id]}
+        if kind == "intersects":
+            body["intersects"] = {"type": "Point", "coordinates": self.bbox[:2]}
+        else:
+            body["bbox"] = self.bbox
+        body["sortby"] = [
+            {"field": field, "direction": "asc" if ascending else "desc"}
+            for field, ascending in self.sortby
+        ]
+        if self.datetime:
+            body["datetime"] = self.datetime
+        if self.limit:
+            body["limit"] = self.limit
+        return body
+
+
+def format_datetime(timestamp: float) -> str:
+    """Return an epoch timestamp in RFC 3339 notation."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+
+
+def random_record(
+    kind: str,
+    rng: random.Random,
+    seed_index: SeedIndex,
+    limit: int,
+    collection_indexes: Dict[str, int],
+) -> tuple:
+    """
+    Draw the fields of one query record, anchored on a random item so queries match data.
+
+    Intersects queries target a point inside the item's bbox, bbox queries a random
+    bbox around it. Half of the queries also filter on a datetime interval.
+
+    Args:
+        kind (str): `intersects` or `bbox`.
+        rng (Random): The corpus random generator.
+        seed_index (SeedIndex): The ingested items.
+        limit (int): The page size.
+        collection_indexes (dict): The position of each collection id in the header.
+
+    Returns:
+        tuple: The record fields, in `RECORD` order.
+    """
+    index = rng.randrange(len(seed_index))
+    collection_id, _ = seed_index.item(index)
+    minx, miny, maxx, maxy = seed_index.bbox(index)
+    if kind == "intersects":
+        method = 1  # Only POST possible for "intersects"
+        x, y = rng.uniform(minx, maxx), rng.uniform(miny, maxy)
+        bbox = (x, y, x, y)
+    else:
+        method = rng.randrange(len(METHODS))
+        margins = [rng.uniform(0, MAX_BBOX_MARGIN) for _ in range(4)]
+        bbox = (
+            max(minx - margins[0], -180.0),
+            max(miny - margins[1], -90.0),
+            min(maxx + margins[2], 180.0),
+            min(maxy + margins[3], 90.0),
+        )
+
+    start = end = math.nan
+    if rng.random() < DATETIME_PROBABILITY:
+        span = rng.uniform(MIN_DATETIME_SPAN, MAX_DATETIME_SPAN)
+        start = rng.uniform(DATETIME_START.timestamp(), DATETIME_END.timestamp() - span)
+        end = start + span
+
+    sortby = rng.getrandbits(len(SORT_FIELDS))
+    return (
+        method,
+        collection_indexes[collection_id],
+        *bbox,
+        start,
+        end,
+        sortby,
+        limit,
+    )
+
+
+def build_corpus(
+    path: str,
+    seed_index: SeedIndex,
+    n_queries: int = 100_000,
+    seed: int = 0,
+    limit: int = 10,
+) -> Dict:
+    """
+    Write a seeded query corpus to a compact binary file.
+
+    The file holds a JSON header (collection ids and the offset and count of each kind
+    of query) followed by fixed-size records, so a query is read by index without
+    parsing the rest of the file. The same seed and seed index always produce the same
+    file.
+
+    Args:
+        path (str): The output file.
+        seed_index (SeedIndex): The ingested items queries are anchored on.
+        n_queries (int): The number of queries of each kind.
+        seed (int): The seed of the corpus.
+        limit (int): The page size of every query.
+
+    Returns:
+        dict: The header of the written corpus.
+    """
+    rng = random.Random(seed)
+    header: Dict = {
+        "seed": seed,
+        "collections": list(seed_index.collection_ids),
+        "tables": {},
+    }
+    for position, kind in enumerate(KINDS):
+        header["tables"][kind] = [
+            position * n_queries * RECORD.size,
+            n_queries,
+        ]
+    collection_indexes = {
+        collection_id: position
+        for position, collection_id in enumerate(header["collections"])
+    }
+    encoded_header = json.dumps(header).encode()
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(HEADER_SIZE.pack(len(encoded_header)))
+        file.write(encoded_header)
+        for kind in KINDS:
+            for _ in range(n_queries):
+                file.write(
+                    RECORD.pack(
+                        *random_record(kind, rng, seed_index, limit, collection_indexes)
+                    )
+                )
+    return header
+
+
+class QueryCorpus:
+    """
+    Read-only, memory-mapped view of a query corpus.
+
+    The file is mapped once per process and shared by every user, pages are loaded on
+    demand by the OS. Each kind of query is consumed through its own cursor starting at
+    `offset` and advancing by `stride`, so workers walk disjoint, reproducible sequences.
+
+    Attributes:
+        path (str): The corpus file.
+        collection_ids (list): The collection ids referenced by the records.
+        offset (int): The index of the first query read by this process.
+        stride (int): The step between two queries read by this process.
+    """
+
+    def __init__(self, path: str, offset: int = 0, stride: int = 1):
+        """Map a corpus file written by `build_corpus`."""
+        self.path = path
+        self.offset = offset
+        self.stride = max(stride, 1)
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a query corpus")
+        (header_size,) = HEADER_SIZE.unpack_from(self._mmap, len(MAGIC))
+        self._data_start = len(MAGIC) + HEADER_SIZE.size + header_size
+        header = json.loads(
+            self._mmap[self._data_start - header_size : self._data_start]
+        )
+        self.collection_ids: List[str] = header["collections"]
+        self._tables: Dict[str, List[int]] = header["tables"]
+        self._cursors = dict.fromkeys(self._tables, 0)
+
+    def __len__(self) -> int:
+        """Return the number of queries, all kinds included."""
+        return sum(count for _, count in self._tables.values())
+
+    def query(self, kind: str, index: int) -> Query:
+        """
+        Decode a query.
+
+        Args:
+            kind (str): `intersects` or `bbox`.
+            index (int): The query index, wrapping around the table.
+
+        Returns:
+            Query: The decoded query.
+        """
+        table_offset, count = self._tables[kind]
+        fields = RECORD.unpack_from(
+            self._mmap,
+            self._data_start + table_offset + (index % count) * RECORD.size,
+        )
+        method, collection, minx, miny, maxx, maxy, start, end, sortby, limit = fields
+        return Query(
+            method=METHODS[method],
+            collection_id=self.collection_ids[collection],
+            bbox=[minx, miny, maxx, maxy],
+            datetime=None
+            if math.isnan(start)
+            else f"{format_datetime(start)}/{format_datetime(end)}",
+            sortby=[
+                (field, not sortby >> position & 1)
+                for position, field in enumerate(SORT_FIELDS)
+            ],
+            limit=limit,
+        )
+
+    def next(self, kind: str) -> Query:
+        """Return the next query of a kind for this process."""
+        position = self._cursors[kind]
+        self._cursors[kind] = position + 1
+        return self.query(kind, self.offset + position * self.stride)
+
+
+@lru_cache(maxsize=None)
+def get_query_corpus(worker_index: int = 0) -> Optional[QueryCorpus]:
+    """
+    Return the process-wide query corpus, or None when tasks draw random queries.
+
+    The corpus file and the number of workers sharing it are read from the
+    `STAC_QUERY_CORPUS` and `STAC_QUERY_SHARDS` environment variables, set by the CLI
+    from `--query-corpus` and the worker count.
+
+    Args:
+        worker_index (int): The index of this worker, its first query.
+
+    Returns:
+        QueryCorpus: The shared corpus.
+    """
+    path = os.getenv("STAC_QUERY_CORPUS")
+    if not path:
+        return None
+    return QueryCorpus(
+        path, offset=worker_index, stride=int(os.getenv("STAC_QUERY_SHARDS", "1"))
+    )
@@ -0,0 +1,274 @@
+"""Cache-aware workload: a controlled share of repeated searches and a warm-up phase."""
+import os
+import random
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+from .query_corpus import Query
+
+# Fresh draws tried before a query colliding with an issued one is sent as a repeat
+MAX_DRAWS = 10
+WARMUP_MESSAGE = "stac_warmup_done"
+
+
+class RepeatSettings(NamedTuple):
+    """
+    Settings of the cache-aware workload.
+
+    Attributes:
+        ratio (float, optional): The fraction of searches repeating a previous query,
+            None to disable repeat tracking.
+        pool_size (int): The number of recent queries of each kind a repeat is drawn from.
+        warmup (float): The seconds of load run before the stats are reset, 0 for none.
+    """
+
+    ratio: Optional[float] = None
+    pool_size: int = 1000
+    warmup: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RepeatSettings":
+        """
+        Read the settings from the environment.
+
+        `STAC_REPEAT_RATIO`, `STAC_REPEAT_POOL` and `STAC_WARMUP` are set by the CLI from
+        `--repeat-ratio`, `--repeat-pool` and `--warm-up`.
+        """
+        ratio = os.getenv("STAC_REPEAT_RATIO")
+        return cls(
+            ratio=float(ratio) if ratio else None,
+            pool_size=int(os.getenv("STAC_REPEAT_POOL", "1000")),
+            warmup=float(os.getenv("STAC_WARMUP", "0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether searches are split into repeated and unique queries."""
+        return self.ratio is not None
+
+
+def query_key(kind: str, query: Query) -> int:
+    """Return the fingerprint of a query, equal for queries sending the same request."""
+    return hash(
+        (
+            kind,
+            query.method,
+            query.collection_id,
+            tuple(query.bbox),
+            query.datetime,
+            tuple(tuple(pair) for pair in query.sortby),
+            query.limit,
+        )
+    )
+
+
+class QueryHistory:
+    """
+    Queries issued by the users of a worker, shared so repeats can hit any user's queries.
+
+    Recent queries of each kind are kept in a ring of `pool_size` queries, repeats are
+    drawn from it uniformly. The fingerprints of every issued query are kept to tell
+    fresh queries apart, about 100 bytes per unique query.
+
+    Attributes:
+        pool_size (int): The number of recent queries kept per kind.
+    """
+
+    def __init__(self, pool_size: int = 1000):
+        """Start an empty history."""
+        self.pool_size = max(pool_size, 1)
+        self._pools: Dict[str, List[Query]] = {}
+        self._positions: Dict[str, int] = {}
+        self._seen: Set[int] = set()
+
+    def seen(self, kind: str, query: Query) -> bool:
+        """Return True if the same query was issued before."""
+        return query_key(kind, query) in self._seen
+
+    def add(self, kind: str, query: Query):
+        """Record an issued query, replacing the oldest one of its kind if the ring is full."""
+        self._seen.add(query_key(kind, query))
+        pool = self._pools.setdefault(kind, [])
+        if len(pool) < self.pool_size:
+            pool.append(query)
+            return
+        position = self._positions.get(kind, 0)
+        pool[position] = query
+        self._positions[kind] = (position + 1) % self.pool_size
+
+    def sample(self, kind: str, rng: random.Random) -> Optional[Query]:
+        """Return a random recent query of a kind, None if none was issued yet."""
+        pool = self._pools.get(kind)
+        return rng.choice(pool) if pool else None
+
+
+class QueryMix:
+    """
+    Split the searches of a user into repeated and guaranteed-unique queries.
+
+    A search repeats a recent query of the worker with probability `ratio`, the other
+    searches draw queries until one was never issued by the worker. Until a kind has
+    been issued once, or if `MAX_DRAWS` draws all collide, the search cannot be forced
+    and it is reported for what it is. `repeated` says which kind the last query was, to
+    report cache-hit and cache-miss candidates under separate names.
+
+    Attributes:
+        history (QueryHistory): The worker's issued queries.
+        ratio (float): The fraction of repeated searches.
+        repeated (bool): Whether the last query repeats an issued one.
+    """
+
+    def __init__(
+        self,
+        history: QueryHistory,
+        ratio: float,
+        rng: Optional[random.Random] = None,
+    ):
+        """Attach a user to the worker's history."""
+        self.history = history
+        self.ratio = ratio
+        self.repeated = False
+        self._rng = rng or random.Random()
+
+    def next(self, kind: str, draw: Callable[[], Query]) -> Query:
+        """
+        Return the next query of a kind, repeated or fresh.
+
+        Args:
+            kind (str): `intersects` or `bbox`.
+            draw (callable): Draws a new query of the kind.
+
+        Returns:
+            Query: The search query.
+        """
+        if self._rng.random() < self.ratio:
+            query = self.history.sample(kind, self._rng)
+            if query is not None:
+                self.repeated = True
+                return query
+        for _ in range(MAX_DRAWS):
+            query = draw()
+            if not self.history.seen(kind, query):
+                break
+        self.repeated = self.history.seen(kind, query)
+        self.history.add(kind, query)
+        return query
+
+    def name(self, name: str) -> str:
+        """Return the stats name of the last query, e.g. `post-multisearch-bbox-repeat`."""
+        return f"{name}-{'repeat' if self.repeated else 'unique'}"
+
+
+@lru_cache(maxsize=None)
+def get_query_history() -> Optional[QueryHistory]:
+    """Return the worker-wide query history, None unless repeats are enabled."""
+    settings = RepeatSettings.from_env()
+    if not settings.enabled:
+        return None
+    return QueryHistory(settings.pool_size)
+
+
+def get_query_mix() -> Optional[QueryMix]:
+    """Return a new per-user query mix, None unless repeats are enabled."""
+    history = get_query_history()
+    if history is None:
+        return None
+    return QueryMix(history, RepeatSettings.from_env().ratio)
+
+
+def reset_stats(environment):
+    """Drop the stats recorded so far, as the web UI's reset button does."""
+    environment.events.reset_stats.fire()
+    environment.runner.stats.reset_all()
+    environment.runner.exceptions = {}
+
+
+class Warmup:
+    """
+    Reset the stats once the warm-up is over, so the results only cover the load after it.
+
+    Histograms and query counts are reset along with the Locust stats. `--run-time`
+    includes the warm-up.
+
+    Attributes:
+        duration (float): The seconds of the warm-up.
+    """
+
+    def __init__(self, duration: float):
+        """Prepare a warm-up of `duration` seconds."""
+        self.duration = duration
+        self._greenlet = None
+
+    def start(self, environment):
+        """Start the warm-up clock in a greenlet."""
+        import gevent
+
+        self.stop()
+        self._greenlet = gevent.spawn(self.run, environment)
+
+    def run(self, environment):
+        """Wait out the warm-up, then reset the stats of the master and the workers."""
+        import gevent
+        from locust.runners import MasterRunner
+
+        gevent.sleep(self.duration)
+        if isinstance(environment.runner, MasterRunner):
+            environment.runner.send_message(WARMUP_MESSAGE)
+        reset_stats(environment)
+        self._greenlet = None
+        print(f"Warm-up of {self.duration:g}s done, stats reset")
+
+    def stop(self):
+        """Cancel the warm-up if it is still running."""
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+
+
+@lru_cache(maxsize=None)
+def get_warmup() -> Optional[Warmup]:
+    """Return the process-wide warm-up, None if disabled."""
+    duration = RepeatSettings.from_env().warmup
+    return Warmup(duration) if duration > 0 else None
+
+
+def register_warmup(environment):
+    """
+    Let workers drop the stats of the warm-up they did not report yet, when it ends.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    from locust.runners import WorkerRunner
+
+    if get_warmup() is not None and isinstance(environment.runner, WorkerRunner):
+        environment.runner.register_message(
+            WARMUP_MESSAGE, lambda environment, msg, **kwargs: reset_stats(environment)
+        )
+
+
+def start_warmup(environment):
+    """
+    Start the warm-up when a run starts, on the master or the single local runner.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    from locust.runners import WorkerRunner
+
+    warmup = get_warmup()
+    if warmup is None or isinstance(environment.runner, WorkerRunner):
+        return
+    warmup.start(environment)
+
+
+def stop_warmup(environment):
+    """
+    Cancel the warm-up if the run stops before it is over.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    warmup = get_warmup()
+    if warmup is not None:
+        warmup.stop()
@@ -0,0 +1,269 @@
+"""Streaming access-log replay."""
+import gzip
+import json
+import os
+import re
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import IO, Iterator, NamedTuple, Optional, Union
+from urllib.parse import urlsplit
+
+REPLAY_METHODS = {"GET", "POST"}
+REPLAY_MODES = ["timed", "max-speed"]
+
+# host ident user [10/Oct/2000:13:55:36 -0700] "GET /search?bbox=... HTTP/1.1" 200 2326 ...
+LOG_LINE_PATTERN = re.compile(
+    r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)[^"]*"'
+)
+LOG_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/collections/[^/]+/items/[^/]+$"), "item"),
+    (re.compile(r"^/collections/[^/]+/items$"), "items"),
+    (re.compile(r"^/collections/[^/]+$"), "collection"),
+    (re.compile(r"^/collections$"), "collections"),
+    (re.compile(r"^/search$"), "search"),
+    (re.compile(r"^/?$"), "landing"),
+]
+
+
+class ReplayRequest(NamedTuple):
+    """
+    A request read from an access log.
+
+    Attributes:
+        method (str): The request method.
+        path (str): The request path, with its query string.
+        body (dict, optional): The JSON body of POST requests, when logged.
+        timestamp (float): When the request was received, in seconds since the epoch.
+    """
+
+    method: str
+    path: str
+    body: Optional[Union[dict, str]]
+    timestamp: float
+
+
+class ReplaySettings(NamedTuple):
+    """
+    Settings of a replay run.
+
+    Attributes:
+        path (str): The access log, optionally gzip-compressed.
+        mode (str): `timed` to keep the logged request timing, `max-speed` to replay as fast as possible.
+        speed (float): The timing acceleration factor in timed mode, e.g. 2 or 10.
+        shards (int): The number of workers the log is split across.
+    """
+
+    path: str = ""
+    mode: str = "timed"
+    speed: float = 1.0
+    shards: int = 1
+
+    @classmethod
+    def from_env(cls) -> "ReplaySettings":
+        """
+        Read the settings from the `STAC_REPLAY_*` environment variables.
+
+        They are set by the CLI from `--replay`, `--replay-mode`, `--replay-speed` and `--replay-shards`.
+        """
+        return cls(
+            path=os.getenv("STAC_REPLAY_LOG", ""),
+            mode=os.getenv("STAC_REPLAY_MODE", "timed"),
+            speed=float(os.getenv("STAC_REPLAY_SPEED", "1")),
+            shards=int(os.getenv("STAC_REPLAY_SHARDS", "1")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if an access log is replayed."""
+        return bool(self.path)
+
+
+def parse_timestamp(value: Union[str, float, int]) -> float:
+    """Return a logged timestamp (epoch seconds, ISO 8601 or common log format) in epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return datetime.strptime(value, LOG_TIME_FORMAT).timestamp()
+
+
+def parse_line(line: str) -> Optional[ReplayRequest]:
+    """
+    Parse an access log line.
+
+    Lines are either JSON objects with `method`, `path` (or `url`), `body` and
+    `timestamp` fields, or common/combined log format lines. Only GET and POST
+    requests are replayed.
+
+    Args:
+        line (str): The log line.
+
+    Returns:
+        ReplayRequest: The request, or None if the line is not a replayable request.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith("{"):
+            record = json.loads(line)
+            request = ReplayRequest(
+                method=record.get("method", "GET").upper(),
+                path=record.get("path") or record["url"],
+                body=record.get("body"),
+                timestamp=parse_timestamp(record.get("timestamp", 0)),
+            )
+        else:
+            match = LOG_LINE_PATTERN.match(line)
+            if match is None:
+                return None
+            request = ReplayRequest(
+                method=match["method"],
+                path=match["path"],
+                body=None,
+                timestamp=parse_timestamp(match["time"]),
+            )
+    except (KeyError, ValueError):
+        return None
+    if "://" in request.path:
+        # Never send replayed requests to the host they were logged on
+        url = urlsplit(request.path)
+        request = request._replace(
+            path=url.path + (f"?{url.query}" if url.query else "")
+        )
+    return request if request.method in REPLAY_METHODS else None
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """
+    Return the stats name of a replayed request, grouping ids, e.g. `replay-get-item`.
+
+    Args:
+        method (str): The request method.
+        path (str): The request path, with its query string.
+
+    Returns:
+        str: The stats name.
+    """
+    route = path.split("?", 1)[0]
+    for pattern, endpoint in ENDPOINT_PATTERNS:
+        if pattern.match(route):
+            return f"replay-{method.lower()}-{endpoint}"
+    return f"replay-{method.lower()}-other"
+
+
+def open_log(path: str) -> IO[str]:
+    """Open an access log for streaming, decompressing `.gz` files on the fly."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path, "r")
+
+
+def read_requests(
+    path: str, shard_index: int = 0, shard_count: int = 1
+) -> Iterator[ReplayRequest]:
+    """
+    Stream the requests of one shard of an access log, one line at a time.
+
+    Line `n` belongs to shard `n % shard_count`, so shards interleave evenly over time.
+
+    Args:
+        path (str): The access log.
+        shard_index (int): The shard to read.
+        shard_count (int): The number of shards.
+
+    Yields:
+        ReplayRequest: The next request of the shard.
+    """
+    shard_count = max(shard_count, 1)
+    with open_log(path) as log:
+        for line_number, line in enumerate(log):
+            if line_number % shard_count != shard_index % shard_count:
+                continue
+            request = parse_line(line)
+            if request is not None:
+                yield request
+
+
+class ReplaySource:
+    """
+    A worker's shard of the log, shared by its users, with the time each request is due.
+
+    In timed mode a request is due `(timestamp - first timestamp) / speed` seconds after
+    the replay started. The log restarts from the top when exhausted.
+
+    Attributes:
+        settings (ReplaySettings): The replay settings.
+        shard_index (int): The shard read by this worker.
+    """
+
+    def __init__(self, settings: ReplaySettings, shard_index: int):
+        """Initialize the source, the log is opened on first use."""
+        self.settings = settings
+        self.shard_index = shard_index
+        self._requests: Optional[Iterator[ReplayRequest]] = None
+        self._log_start = 0.0
+        self._replay_start = 0.0
+
+    def next(self):
+        """
+        Return the next request and when it is due.
+
+        Returns:
+            tuple: The request and its due time (`time.perf_counter`).
+        """
+        request = next(self._requests, None) if self._requests is not None else None
+        if request is None:
+            self._requests = read_requests(
+                self.settings.path, self.shard_index, self.settings.shards
+            )
+            request = next(self._requests, None)
+            if request is None:
+                raise ValueError(f"No replayable requests in {self.settings.path}")
+            self._log_start = request.timestamp
+            self._replay_start = time.perf_counter()
+
+        if self.settings.mode == "max-speed":
+            return request, time.perf_counter()
+        offset = (request.timestamp - self._log_start) / max(self.settings.speed, 1e-9)
+        return request, self._replay_start + offset
+
+    def replay_next(self, client):
+        """
+        Wait until the next request is due and send it.
+
+        Latency is reported from the due time when the client is a `ScheduledClient`,
+        so replaying slower than the log counts against the API.
+
+        Args:
+            client (HttpSession): The Locust client of the replaying user.
+        """
+        import gevent
+
+        request, due = self.next()
+        delay = due - time.perf_counter()
+        if delay > 0:
+            gevent.sleep(delay)
+        if hasattr(client, "schedule"):
+            client.schedule(due)
+        kwargs = {}
+        if isinstance(request.body, dict):
+            kwargs["json"] = request.body
+        elif request.body:
+            kwargs["data"] = request.body
+            kwargs["headers"] = {"Content-Type": "application/json"}
+        client.request(
+            request.method,
+            request.path,
+            name=endpoint_name(request.method, request.path),
+            **kwargs,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_replay_source(shard_index: int) -> ReplaySource:
+    """Return the worker-wide replay source of a shard."""
+    return ReplaySource(ReplaySettings.from_env(), shard_index)
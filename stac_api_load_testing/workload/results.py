@@ -0,0 +1,190 @@
+"""Machine-readable run results and SLO checks."""
+import csv
+import json
+import operator
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from .histograms import (
+    HDR_PERCENTILES,
+    HistogramRecorder,
+    get_histogram_recorder,
+    hdr_key,
+)
+
+PERCENTILES = [0.5, 0.75, 0.9, 0.95, 0.99, 0.999]
+SLO_PATTERN = re.compile(
+    r"^(?P<name>.+):(?P<metric>[\w.]+)\s*(?P<op><|>)\s*(?P<threshold>[\d.]+)$"
+)
+OPERATORS = {"<": operator.lt, ">": operator.gt}
+
+
+class Slo(NamedTuple):
+    """A threshold on one metric of one endpoint, e.g. `post-search-bbox:p95<300`."""
+
+    name: str
+    metric: str
+    op: str
+    threshold: float
+
+    def __str__(self):
+        """Return the SLO in its command line notation."""
+        return f"{self.name}:{self.metric}{self.op}{self.threshold:g}"
+
+
+def percentile_key(percentile: float) -> str:
+    """Return the result key of a percentile, e.g. `p95` or `p99.9`."""
+    return f"p{percentile * 100:g}"
+
+
+def parse_slo(text: str) -> Slo:
+    """
+    Parse an SLO from its command line notation.
+
+    The metric is one of the result keys (`p50` ... `p99.9`, `avg`, `max`, `rps`,
+    `failure_rate`) and the name an endpoint name or `Aggregated`.
+
+    Args:
+        text (str): The SLO, e.g. `post-search-bbox:p95<300`.
+
+    Returns:
+        Slo: The parsed SLO.
+
+    Raises:
+        ValueError: If the SLO is malformed.
+    """
+    match = SLO_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid SLO '{text}', expected NAME:METRIC<THRESHOLD")
+    return Slo(match["name"], match["metric"], match["op"], float(match["threshold"]))
+
+
+def parse_slos(text: str) -> List[Slo]:
+    """Parse a `;`-separated list of SLOs."""
+    return [parse_slo(slo) for slo in text.split(";") if slo.strip()]
+
+
+def entry_results(entry) -> Dict:
+    """
+    Summarize a Locust stats entry.
+
+    Args:
+        entry (StatsEntry): The stats of one endpoint, or the aggregated stats.
+
+    Returns:
+        dict: The request counts, RPS, failure rate and latency percentiles (ms).
+    """
+    results = {
+        "method": entry.method or "",
+        "name": entry.name,
+        "num_requests": entry.num_requests,
+        "num_failures": entry.num_failures,
+        "rps": round(entry.total_rps, 3),
+        "failure_rate": round(entry.fail_ratio, 5),
+        "avg": round(entry.avg_response_time, 3),
+        "min": round(entry.min_response_time or 0, 3),
+        "max": round(entry.max_response_time, 3),
+    }
+    for percentile in PERCENTILES:
+        results[percentile_key(percentile)] = entry.get_response_time_percentile(
+            percentile
+        )
+    return results
+
+
+def collect_results(stats, recorder: Optional[HistogramRecorder] = None) -> List[Dict]:
+    """
+    Summarize every endpoint of a Locust stats object, followed by the aggregate.
+
+    Args:
+        stats (RequestStats): The Locust stats.
+        recorder (HistogramRecorder, optional): Full-resolution histograms adding `hdr_*` percentiles.
+
+    Returns:
+        list: The per-endpoint results.
+    """
+    entries = sorted(stats.entries.values(), key=lambda e: (e.name, e.method))
+    rows = [entry_results(entry) for entry in entries + [stats.total]]
+    if recorder is not None:
+        for row in rows:
+            row.update(dict.fromkeys(map(hdr_key, HDR_PERCENTILES)))
+            row.update(recorder.percentiles(row["method"], row["name"]))
+    return rows
+
+
+def write_results(rows: List[Dict], prefix: str):
+    """
+    Write results to `{prefix}.json` and `{prefix}.csv`.
+
+    Args:
+        rows (list): The per-endpoint results.
+        prefix (str): The path prefix of the output files.
+    """
+    with open(f"{prefix}.json", "w") as file:
+        json.dump({"endpoints": rows}, file, indent=2)
+    with open(f"{prefix}.csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def check_slos(rows: List[Dict], slos: List[Slo]) -> List[str]:
+    """
+    Check results against SLOs.
+
+    Args:
+        rows (list): The per-endpoint results.
+        slos (list): The SLOs to check.
+
+    Returns:
+        list: A message per breached SLO. SLOs on endpoints without requests are breached.
+    """
+    by_name = {row["name"]: row for row in rows}
+    breaches = []
+    for slo in slos:
+        row = by_name.get(slo.name)
+        if row is None or not row["num_requests"]:
+            breaches.append(f"{slo}: no requests recorded for '{slo.name}'")
+        elif slo.metric not in row:
+            breaches.append(f"{slo}: unknown metric '{slo.metric}'")
+        elif not OPERATORS[slo.op](row[slo.metric], slo.threshold):
+            breaches.append(f"{slo}: measured {row[slo.metric]:g}")
+    return breaches
+
+
+def report_results(environment):
+    """
+    Write the run results and enforce SLOs when Locust quits.
+
+    Runs on the master (or the single local runner) only. Results include exact
+    percentiles from the merged HdrHistograms, which are also exported next to the
+    results for diffing between runs. The output prefix and the
+    SLOs are read from the `STAC_RESULTS_PREFIX` and `STAC_SLO` environment variables,
+    set by the CLI from `--results-prefix` and `--slo`. A breached SLO makes Locust exit
+    with code 1.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    # Imported here so the CLI can parse SLOs without importing (and monkey patching) locust
+    from locust.runners import WorkerRunner
+
+    if isinstance(environment.runner, WorkerRunner):
+        return
+
+    recorder = get_histogram_recorder()
+    rows = collect_results(environment.stats, recorder)
+    prefix = os.getenv("STAC_RESULTS_PREFIX")
+    if prefix:
+        write_results(rows, prefix)
+        recorder.export(f"{prefix}_histograms.json")
+        print(
+            f"Results written to {prefix}.json, {prefix}.csv and {prefix}_histograms.json"
+        )
+
+    breaches = check_slos(rows, parse_slos(os.getenv("STAC_SLO", "")))
+    for breach in breaches:
+        print(f"SLO breached: {breach}")
+    if breaches:
+        environment.process_exit_code = 1
@@ -0,0 +1,462 @@
+"""Declarative load test scenarios, compiled into request builders."""
+import json
+import os
+import random
+import re
+import string
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from ..data_loader.generator import DATETIME_END, DATETIME_START
+from .catalog import WORLD_BBOX, CollectionCatalog
+from .codec import json_body
+from .query_corpus import format_datetime
+from .seed_index import get_seed_index
+
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+CQL2_OPERATORS = ["=", "<>", "<", "<=", ">", ">="]
+DAY = 24 * 60 * 60
+# Builds a parameter value from the collection catalog and the values drawn so far
+Generator = Callable[[CollectionCatalog, Dict[str, Any]], Any]
+Builder = Callable[[Dict[str, Any]], Any]
+FORMATTER = string.Formatter()
+
+
+class PathFormatter(string.Formatter):
+    """Format request paths, URL-quoting the substituted values."""
+
+    def format_field(self, value: Any, format_spec: str) -> str:
+        """Return a quoted field."""
+        return quote(format(value, format_spec), safe="")
+
+
+PATH_FORMATTER = PathFormatter()
+
+
+def parse_timestamp(value: Any) -> float:
+    """Return the epoch timestamp of a YAML date, datetime or ISO 8601 string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def extent(catalog: CollectionCatalog, values: Dict[str, Any], spec: dict) -> list:
+    """Return the bbox of the collection named by a parameter's `collection` option."""
+    collection_id = values.get(spec.get("collection", ""))
+    if collection_id is None:
+        return spec.get("within", WORLD_BBOX)
+    return catalog.bbox(collection_id)
+
+
+def collection_parameter(spec: dict) -> Generator:
+    """Draw a collection id from `values`, or from the collections served by the API."""
+    choices = spec.get("values")
+    if choices:
+        return lambda catalog, values: random.choice(choices)
+    return lambda catalog, values: random.choice(catalog.collection_ids)
+
+
+def item_parameter(spec: dict) -> Generator:
+    """Draw an ingested item, as `{"collection": ..., "id": ...}`."""
+
+    def generate(catalog, values):
+        collection_id, item_id = get_seed_index().random_item()
+        return {"collection": collection_id, "id": item_id}
+
+    return generate
+
+
+def bbox_parameter(spec: dict) -> Generator:
+    """
+    Draw a bbox inside a collection's extent.
+
+    Options: `collection` (the parameter holding the collection id, the world or
+    `within` if unset), `max_size` (the largest width and height, in degrees).
+    """
+    max_size = spec.get("max_size")
+
+    def generate(catalog, values):
+        minx, miny, maxx, maxy = extent(catalog, values, spec)
+        bbox = []
+        for low, high in ((minx, maxx), (miny, maxy)):
+            if max_size is None:
+                a, b = sorted(random.uniform(low, high) for _ in range(2))
+            else:
+                size = random.uniform(0, min(max_size, high - low))
+                a = random.uniform(low, high - size)
+                b = a + size
+            bbox.append((a, b))
+        return [bbox[0][0], bbox[1][0], bbox[0][1], bbox[1][1]]
+
+    return generate
+
+
+def point_parameter(spec: dict) -> Generator:
+    """Draw a GeoJSON point inside a collection's extent, with the `bbox` options."""
+
+    def generate(catalog, values):
+        minx, miny, maxx, maxy = extent(catalog, values, spec)
+        return {
+            "type": "Point",
+            "coordinates": [random.uniform(minx, maxx), random.uniform(miny, maxy)],
+        }
+
+    return generate
+
+
+def datetime_parameter(spec: dict) -> Generator:
+    """
+    Draw an RFC 3339 datetime interval.
+
+    Options: `start` and `end` (the bounds of the intervals, the synthetic corpus's by
+    default), `min_days` and `max_days` (the interval length, 1 to 365 days).
+    """
+    start = parse_timestamp(spec.get("start", DATETIME_START))
+    end = parse_timestamp(spec.get("end", DATETIME_END))
+    min_span = spec.get("min_days", 1) * DAY
+    max_span = min(spec.get("max_days", 365) * DAY, end - start)
+    if start >= end or min_span > max_span:
+        raise ValueError(f"Invalid datetime parameter {spec}")
+
+    def generate(catalog, values):
+        span = random.uniform(min_span, max_span)
+        interval_start = random.uniform(start, end - span)
+        return f"{format_datetime(interval_start)}/{format_datetime(interval_start + span)}"
+
+    return generate
+
+
+def int_parameter(spec: dict) -> Generator:
+    """Draw an integer between `min` and `max`, included."""
+    low, high = int(spec["min"]), int(spec["max"])
+    return lambda catalog, values: random.randint(low, high)
+
+
+def float_parameter(spec: dict) -> Generator:
+    """Draw a float between `min` and `max`, rounded to `digits` (3 by default)."""
+    low, high, digits = float(spec["min"]), float(spec["max"]), spec.get("digits", 3)
+    return lambda catalog, values: round(random.uniform(low, high), digits)
+
+
+def choice_parameter(spec: dict) -> Generator:
+    """Draw one of `values`, optionally weighted by `weights`."""
+    choices, weights = spec["values"], spec.get("weights")
+    if not choices or (weights is not None and len(weights) != len(choices)):
+        raise ValueError(f"Invalid choice parameter {spec}")
+    return lambda catalog, values: random.choices(choices, weights)[0]
+
+
+def cql2_parameter(spec: dict) -> Generator:
+    """
+    Draw a CQL2 comparison of a numeric property to a random value.
+
+    Options: `property`, `op` (one of `=`, `<>`, `<`, `<=`, `>`, `>=`), `min` and `max`
+    (the value range), `lang` (`cql2-json`, the default, or `cql2-text`).
+    """
+    name, op = spec["property"], spec.get("op", "<=")
+    if op not in CQL2_OPERATORS:
+        raise ValueError(
+            f"Unknown CQL2 operator '{op}', expected one of {CQL2_OPERATORS}"
+        )
+    value = float_parameter(spec)
+    if spec.get("lang", "cql2-json") == "cql2-text":
+        return lambda catalog, values: f"{name} {op} {value(catalog, values)}"
+    return lambda catalog, values: {
+        "op": op,
+        "args": [{"property": name}, value(catalog, values)],
+    }
+
+
+PARAMETER_TYPES: Dict[str, Callable[[dict], Generator]] = {
+    "collection": collection_parameter,
+    "item": item_parameter,
+    "bbox": bbox_parameter,
+    "point": point_parameter,
+    "datetime": datetime_parameter,
+    "int": int_parameter,
+    "float": float_parameter,
+    "choice": choice_parameter,
+    "cql2": cql2_parameter,
+}
+
+
+def compile_parameter(name: str, spec: Any) -> Generator:
+    """
+    Compile a parameter declaration into a generator.
+
+    A declaration is a constant, or a mapping with a `type` from `PARAMETER_TYPES`, its
+    options, and an optional `probability` of being set (None, dropping the fields it
+    fills, otherwise).
+    """
+    if not isinstance(spec, dict):
+        return lambda catalog, values: spec
+    if spec.get("type") not in PARAMETER_TYPES:
+        raise ValueError(
+            f"Parameter '{name}' has an unknown type '{spec.get('type')}', "
+            + f"expected one of {', '.join(PARAMETER_TYPES)}"
+        )
+    try:
+        generate = PARAMETER_TYPES[spec["type"]](spec)
+    except KeyError as e:
+        raise ValueError(f"Parameter '{name}' is missing option {e}")
+    probability = spec.get("probability")
+    if probability is None:
+        return generate
+    return lambda catalog, values: (
+        generate(catalog, values) if random.random() < probability else None
+    )
+
+
+def compile_template(template: Any) -> Builder:
+    """
+    Compile a body or query template into a builder filling it with parameter values.
+
+    A string that is a single `{placeholder}` is replaced by the value itself (a list,
+    a dict, a number), other strings are formatted. Fields set to None are dropped.
+    Constant parts are shared between the built requests, not copied.
+
+    Args:
+        template: The JSON template.
+
+    Returns:
+        callable: Builds the filled template from the parameter values.
+    """
+    if isinstance(template, dict):
+        entries = [(key, compile_template(value)) for key, value in template.items()]
+        if all(getattr(build, "constant", False) for _, build in entries):
+            return constant_builder(template)
+
+        def build_dict(values):
+            built = {}
+            for key, build in entries:
+                value = build(values)
+                if value is not None:
+                    built[key] = value
+            return built
+
+        return build_dict
+    if isinstance(template, list):
+        items = [compile_template(value) for value in template]
+        if all(getattr(build, "constant", False) for build in items):
+            return constant_builder(template)
+        return lambda values: [build(values) for build in items]
+    if isinstance(template, str):
+        fields = [field for _, field, _, _ in FORMATTER.parse(template) if field]
+        if not fields:
+            return constant_builder(template)
+        # The parameters referenced, e.g. `item` for `{item[id]}`
+        roots = {re.split(r"[.\[]", field)[0] for field in fields}
+        if template == f"{{{fields[0]}}}":
+            field = fields[0]
+
+            def build_value(values):
+                if any(values.get(root) is None for root in roots):
+                    return None
+                return FORMATTER.get_field(field, (), values)[0]
+
+            return build_value
+
+        def build_string(values):
+            if any(values.get(root) is None for root in roots):
+                return None
+            return template.format_map(values)
+
+        return build_string
+    return constant_builder(template)
+
+
+def constant_builder(value: Any) -> Builder:
+    """Return a builder always returning a constant value."""
+
+    def build(values):
+        return value
+
+    build.constant = True  # type: ignore
+    return build
+
+
+def query_string_value(value: Any) -> Any:
+    """Return a query string value, lists as comma-separated values."""
+    if isinstance(value, list):
+        return ",".join(str(part) for part in value)
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class RequestTemplate(NamedTuple):
+    """
+    A weighted request of a scenario.
+
+    Attributes:
+        name (str): The stats name of the request.
+        method (str): The HTTP method.
+        weight (int): The relative frequency of the request.
+        tags (list): The Locust tags of the request, for `--tags` and `--exclude-tags`.
+        parameters (list): The `(name, generator)` pairs, drawn in order.
+        path (str): The path template.
+        query (callable, optional): The builder of the query string parameters.
+        body (callable, optional): The builder of the JSON body.
+    """
+
+    name: str
+    method: str
+    weight: int
+    tags: List[str]
+    parameters: List[Tuple[str, Generator]]
+    path: str
+    query: Optional[Builder]
+    body: Optional[Builder]
+
+    def build(self, catalog: CollectionCatalog) -> Tuple[str, Dict[str, Any]]:
+        """
+        Draw the parameters and build a request.
+
+        Args:
+            catalog (CollectionCatalog): The collections served by the API.
+
+        Returns:
+            tuple: The URL path and the keyword arguments of the Locust client request.
+        """
+        values: Dict[str, Any] = {}
+        for name, generate in self.parameters:
+            values[name] = generate(catalog, values)
+        kwargs: Dict[str, Any] = {"name": self.name}
+        if self.query is not None:
+            kwargs["params"] = {
+                key: query_string_value(value)
+                for key, value in self.query(values).items()
+            }
+        if self.body is not None:
+            kwargs.update(json_body(self.body(values)))
+        return PATH_FORMATTER.vformat(self.path, (), values), kwargs
+
+    def send(self, user):
+        """Send the request with a Locust user's client."""
+        user.catalog.ensure(user)
+        path, kwargs = self.build(user.catalog)
+        return user.client.request(self.method, path, **kwargs)
+
+
+class Scenario(NamedTuple):
+    """
+    A compiled scenario.
+
+    Attributes:
+        requests (list): The request templates.
+        think_time (tuple): The minimum and maximum wait between two requests of a user, in seconds.
+    """
+
+    requests: List[RequestTemplate]
+    think_time: Tuple[float, float]
+
+    def tasks(self) -> list:
+        """Return the Locust tasks of the scenario, repeated by weight and tagged."""
+        tasks: list = []
+        for template in self.requests:
+
+            def run(user, template=template):
+                template.send(user)
+
+            run.__name__ = template.name
+            # As set by locust's @tag decorator
+            run.locust_tag_set = set(template.tags)  # type: ignore
+            tasks += [run] * template.weight
+        return tasks
+
+    def wait_time(self) -> Callable:
+        """Return the `wait_time` method of the users running the scenario."""
+        low, high = self.think_time
+
+        def wait_time(user):
+            return random.uniform(low, high)
+
+        return wait_time
+
+
+def compile_request(spec: dict, shared: Dict[str, Any]) -> RequestTemplate:
+    """Compile a request declaration, drawing the `shared` parameters first."""
+    if "name" not in spec or "path" not in spec:
+        raise ValueError(f"Request {spec} needs a name and a path")
+    method = spec.get("method", "GET").upper()
+    if method not in METHODS:
+        raise ValueError(f"Request '{spec['name']}' has an unsupported method {method}")
+    declared = {**shared, **spec.get("params", {})}
+    parameters = [
+        (name, compile_parameter(name, parameter))
+        for name, parameter in declared.items()
+    ]
+    return RequestTemplate(
+        name=spec["name"],
+        method=method,
+        weight=int(spec.get("weight", 1)),
+        tags=list(spec.get("tags", [])),
+        parameters=parameters,
+        path=spec["path"],
+        query=compile_template(spec["query"]) if "query" in spec else None,
+        body=compile_template(spec["body"]) if "body" in spec else None,
+    )
+
+
+def compile_scenario(document: dict) -> Scenario:
+    """
+    Compile a scenario document.
+
+    A scenario has a list of `requests`, each with a `name`, a `path`, and optionally
+    a `method`, a `weight`, `tags`, `params`, a `query` and a JSON `body`. Parameters
+    declared at the top level (`params`) are drawn for every request. `think_time`
+    is a number of seconds, or a `{min, max}` range.
+
+    Args:
+        document (dict): The parsed scenario file.
+
+    Returns:
+        Scenario: The compiled scenario.
+
+    Raises:
+        ValueError: If the scenario is malformed.
+    """
+    if not isinstance(document, dict) or not document.get("requests"):
+        raise ValueError("A scenario needs a list of requests")
+    think_time = document.get("think_time", 0)
+    if isinstance(think_time, dict):
+        think_time = (float(think_time["min"]), float(think_time["max"]))
+    else:
+        think_time = (float(think_time), float(think_time))
+    shared = document.get("params", {})
+    return Scenario(
+        requests=[compile_request(spec, shared) for spec in document["requests"]],
+        think_time=think_time,
+    )
+
+
+def load_scenario(path: str) -> Scenario:
+    """Load and compile a YAML or JSON scenario file."""
+    with open(path) as file:
+        if path.endswith(".json"):
+            document = json.load(file)
+        else:
+            import yaml  # type: ignore
+
+            document = yaml.safe_load(file)
+    return compile_scenario(document)
+
+
+@lru_cache(maxsize=None)
+def get_scenario() -> Optional[Scenario]:
+    """
+    Return the process-wide scenario, or None when the built-in tasks run.
+
+    The scenario file is read from the `STAC_SCENARIO` environment variable, set by the
+    CLI from `--scenario`.
+    """
+    path = os.getenv("STAC_SCENARIO")
+    if not path:
+        return None
+    return load_scenario(path)
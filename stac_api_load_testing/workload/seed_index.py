@@ -0,0 +1,149 @@
+"""Process-wide index of the items loaded into the STAC API."""
+import os
+import random
+import sys
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from ..data_loader.data_loader import load_sample_items
+from ..data_loader.generator import (
+    DEFAULT_COLLECTION_ID,
+    ItemGenerator,
+    collection_ids,
+    item_id_for,
+)
+from ..data_loader.item_files import read_items
+
+
+class SeedIndex:
+    """
+    Ids and bboxes of the sample items, or of a generated corpus.
+
+    Sample items are indexed in flat lists. Generated items are never materialized:
+    their ids, collections and bboxes are rebuilt from their index by the generator,
+    so sampling stays O(1) whatever the corpus size. A generated corpus replaces the
+    sample items, which are only its templates, as it does in the loaded API.
+
+    Items read from an item file are indexed like sample items, but keep their own
+    collection, interned so that items share the string of their collection id.
+
+    Attributes:
+        item_ids (list): The ids of the sample items, empty for a generated corpus.
+        bboxes (list): The bboxes of the sample items, empty for a generated corpus.
+        item_collections (list, optional): The collection ids of the sample items, None
+            if they all are in `test-collection`.
+        collection_ids (list): The ids of every collection holding indexed items.
+        generator (ItemGenerator, optional): The generator of the synthetic corpus.
+        n_generated (int): The number of generated items.
+    """
+
+    def __init__(
+        self,
+        features: Iterable[dict],
+        n_generated: int = 0,
+        n_collections: int = 1,
+        seed: int = 0,
+        keep_collections: bool = False,
+    ):
+        """
+        Build the index from the sample features and the generated corpus settings.
+
+        Args:
+            features (Iterable[dict]): The sample items, or the templates of the generated
+                items if `n_generated` is set.
+            n_generated (int): The number of generated items.
+            n_collections (int): The number of collections generated items are spread across.
+            seed (int): The seed of the generated corpus.
+            keep_collections (bool): Index the collection of each sample item, instead of
+                assuming `test-collection`.
+        """
+        self.item_ids: List[str] = []
+        self.bboxes: List[List[float]] = []
+        self.item_collections: Optional[List[str]] = [] if keep_collections else None
+        templates = list(features) if n_generated else []
+        for feature in [] if n_generated else features:
+            self.item_ids.append(feature["id"])
+            self.bboxes.append(feature["bbox"])
+            if self.item_collections is not None:
+                self.item_collections.append(
+                    sys.intern(feature.get("collection") or DEFAULT_COLLECTION_ID)
+                )
+        self.n_generated = n_generated
+        self.generator: Optional[ItemGenerator] = None
+        self.collection_ids = [DEFAULT_COLLECTION_ID]
+        if self.item_collections:
+            self.collection_ids = sorted(set(self.item_collections))
+        if n_generated:
+            self.generator = ItemGenerator(
+                templates, n_collections=n_collections, seed=seed
+            )
+            self.collection_ids = collection_ids(n_collections)
+
+    def __len__(self) -> int:
+        """Return the number of indexed items."""
+        return len(self.item_ids) + self.n_generated
+
+    def random_index(self) -> int:
+        """Return a random item index."""
+        return random.randrange(len(self))
+
+    def item(self, index: int) -> Tuple[str, str]:
+        """
+        Return the collection id and item id of the item at `index`.
+
+        Args:
+            index (int): The item index.
+
+        Returns:
+            tuple: The collection id and the item id.
+        """
+        n_seed = len(self.item_ids)
+        if index < n_seed:
+            if self.item_collections is not None:
+                return self.item_collections[index], self.item_ids[index]
+            return DEFAULT_COLLECTION_ID, self.item_ids[index]
+        index -= n_seed
+        return self.generator.collection_id(index), item_id_for(index)
+
+    def bbox(self, index: int) -> List[float]:
+        """Return the bbox of the item at `index`."""
+        n_seed = len(self.item_ids)
+        if index < n_seed:
+            return self.bboxes[index]
+        return self.generator.bbox(index - n_seed)
+
+    def random_item(self) -> Tuple[str, str]:
+        """Return the collection id and item id of a random item."""
+        return self.item(self.random_index())
+
+    def random_collection_id(self) -> str:
+        """Return a random collection id."""
+        return random.choice(self.collection_ids)
+
+    def random_bbox(self) -> List[float]:
+        """Return the bbox of a random item."""
+        return self.bbox(self.random_index())
+
+
+@lru_cache(maxsize=None)
+def get_seed_index() -> SeedIndex:
+    """
+    Return the process-wide seed index, building it on first use.
+
+    The generated corpus is described by the `STAC_LOAD_ITEMS`, `STAC_LOAD_COLLECTIONS`
+    and `STAC_LOAD_SEED` environment variables, set by the CLI from `--items`,
+    `--collections` and `--seed`. When `STAC_ITEMS_FILE` is set, from `--items-file`,
+    the items of that file are indexed instead of the sample items.
+
+    Returns:
+        SeedIndex: The shared index.
+    """
+    items_file = os.getenv("STAC_ITEMS_FILE")
+    if items_file:
+        return SeedIndex(read_items(items_file), keep_collections=True)
+    return SeedIndex(
+        load_sample_items(),
+        n_generated=int(os.getenv("STAC_LOAD_ITEMS", "0")),
+        n_collections=int(os.getenv("STAC_LOAD_COLLECTIONS", "1")),
+        seed=int(os.getenv("STAC_LOAD_SEED", "0")),
+    )
@@ -0,0 +1,484 @@
+"""Sampled correctness checks of the API responses, run in a separate process."""
+import os
+import random
+import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .codec import dumps, loads
+
+# Messages reported per invalid response, the first ones are enough to diagnose it
+MAX_ERRORS = 3
+# Geometries are compared through their bbox, with this tolerance in degrees
+BBOX_TOLERANCE = 1e-6
+DRAIN_TIMEOUT = 10
+ITEM_FIELDS = [
+    "type",
+    "stac_version",
+    "id",
+    "geometry",
+    "properties",
+    "links",
+    "assets",
+]
+# RFC 3339 date-time, whose fraction and `Z` suffix `fromisoformat` rejects before 3.11
+RFC3339_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})[Tt ](\d{2}:\d{2}:\d{2})(?:\.(\d+))?([Zz]|[+-]\d{2}:\d{2})?$"
+)
+
+
+class ValidationError(Exception):
+    """A response that does not match its request, counted as a failure of its endpoint."""
+
+
+class ValidationSettings(NamedTuple):
+    """
+    Settings of the response validation.
+
+    Attributes:
+        sample_rate (float): The fraction of successful responses validated, 0 disables it.
+        max_pending (int): Sampled responses queued for the validator before new samples are dropped.
+    """
+
+    sample_rate: float = 0.0
+    max_pending: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "ValidationSettings":
+        """
+        Read the settings from the environment.
+
+        `STAC_VALIDATE_SAMPLE_RATE` and `STAC_VALIDATE_MAX_PENDING` are set by the CLI
+        from `--validate-sample-rate` and `--validate-max-pending`.
+        """
+        return cls(
+            sample_rate=float(os.getenv("STAC_VALIDATE_SAMPLE_RATE", "0")),
+            max_pending=int(os.getenv("STAC_VALIDATE_MAX_PENDING", "1000")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether responses are validated."""
+        return self.sample_rate > 0
+
+
+def property_value(feature: dict, field: str):
+    """Return the value of a sort field of a feature, e.g. `properties.datetime`."""
+    value = feature
+    for key in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def parse_datetime(text: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an RFC 3339 datetime, None for open interval ends (`..` or empty).
+
+    The fraction of a second is padded or truncated to microseconds and `Z` is read as
+    UTC, so that any RFC 3339 datetime parses on every supported Python version.
+
+    Raises:
+        ValueError: If the text is not a datetime.
+    """
+    if not text or text == "..":
+        return None
+    match = RFC3339_PATTERN.match(text)
+    if match is None:
+        return datetime.fromisoformat(text)
+    date, time, fraction, offset = match.groups()
+    fraction = (fraction or "")[:6].ljust(6, "0")
+    offset = "+00:00" if offset in ("Z", "z") else offset or ""
+    return datetime.fromisoformat(f"{date}T{time}.{fraction}{offset}")
+
+
+def geometry_bbox(geometry: dict) -> Optional[List[float]]:
+    """Return the 2D bbox of a GeoJSON geometry, None if it has no coordinates."""
+    xs: List[float] = []
+    ys: List[float] = []
+
+    def visit(coordinates):
+        if coordinates and isinstance(coordinates[0], (int, float)):
+            xs.append(coordinates[0])
+            ys.append(coordinates[1])
+        else:
+            for child in coordinates:
+                visit(child)
+
+    if geometry.get("type") == "GeometryCollection":
+        for child in geometry.get("geometries", []):
+            bbox = geometry_bbox(child)
+            if bbox:
+                visit([bbox[:2], bbox[2:]])
+    else:
+        visit(geometry.get("coordinates") or [])
+    if not xs:
+        return None
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def feature_bbox(feature: dict) -> Optional[List[float]]:
+    """Return the 2D bbox of an item, from its `bbox` or else its geometry."""
+    bbox = feature.get("bbox")
+    if bbox and len(bbox) in (4, 6):
+        half = len(bbox) // 2
+        return [bbox[0], bbox[1], bbox[half], bbox[half + 1]]
+    if feature.get("geometry"):
+        return geometry_bbox(feature["geometry"])
+    return None
+
+
+def bboxes_intersect(a: Sequence[float], b: Sequence[float]) -> bool:
+    """Return whether two 2D bboxes intersect, bboxes crossing the antimeridian always do."""
+    if a[0] > a[2] or b[0] > b[2]:
+        return True
+    return (
+        a[0] <= b[2] + BBOX_TOLERANCE
+        and b[0] <= a[2] + BBOX_TOLERANCE
+        and a[1] <= b[3] + BBOX_TOLERANCE
+        and b[1] <= a[3] + BBOX_TOLERANCE
+    )
+
+
+def item_errors(item: dict) -> List[str]:
+    """
+    Check that a document is a STAC item.
+
+    This checks the fields the STAC item specification requires and their types, not
+    the complete JSON schemas, which would have to be fetched for every extension.
+
+    Args:
+        item (dict): The item.
+
+    Returns:
+        list: The problems found, empty for a valid item.
+    """
+    if not isinstance(item, dict):
+        return ["item is not an object"]
+    missing = [field for field in ITEM_FIELDS if field not in item]
+    if missing:
+        return [f"item {item.get('id')} misses {', '.join(missing)}"]
+    errors = []
+    if item["type"] != "Feature":
+        errors.append(f"item {item['id']} has type {item['type']}, expected Feature")
+    if not isinstance(item["properties"], dict):
+        errors.append(f"item {item['id']} properties are not an object")
+    elif "datetime" not in item["properties"]:
+        errors.append(f"item {item['id']} has no datetime property")
+    if item["geometry"] is not None and feature_bbox(item) is None:
+        errors.append(f"item {item['id']} has a geometry without coordinates")
+    if not isinstance(item["links"], list) or not isinstance(item["assets"], dict):
+        errors.append(f"item {item['id']} links or assets have the wrong type")
+    return errors
+
+
+def item_interval(item: dict) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return the datetime, or start and end datetimes, of an item."""
+    properties = item.get("properties") or {}
+    if properties.get("datetime"):
+        instant = parse_datetime(properties["datetime"])
+        return instant, instant
+    return (
+        parse_datetime(properties.get("start_datetime")),
+        parse_datetime(properties.get("end_datetime")),
+    )
+
+
+def sort_errors(features: List[dict], sortby: Iterable[Sequence]) -> List[str]:
+    """
+    Check that features are in the order of a sortby.
+
+    Consecutive features are compared on the first sort field where they differ,
+    skipping fields missing from either feature.
+
+    Args:
+        features (list): The returned features, in order.
+        sortby (list): `(field, ascending)` pairs.
+
+    Returns:
+        list: The out of order features found.
+    """
+    sortby = list(sortby)
+    errors = []
+    for previous, feature in zip(features, features[1:]):
+        for field, ascending in sortby:
+            a, b = property_value(previous, field), property_value(feature, field)
+            if a is None or b is None or a == b or type(a) is not type(b):
+                continue
+            if (a > b) == bool(ascending):
+                errors.append(
+                    f"{feature.get('id')} is out of {'ascending' if ascending else 'descending'} "
+                    + f"{field} order after {previous.get('id')}"
+                )
+            break
+    return errors
+
+
+def validate(document, expectation: Dict) -> List[str]:
+    """
+    Check a response against what its request asked for.
+
+    Item responses are checked as a collection of one item. The expectation keys, all
+    optional, are:
+
+    - `collections`, `ids`: the collections and ids of the returned items
+    - `bbox`, `point` (`[x, y]`): the items intersect the bbox or point
+    - `datetime`: the RFC 3339 interval the items fall in
+    - `sortby`: the `(field, ascending)` order of the items
+    - `limit`, `min_count`: the bounds of the number of items returned
+
+    Args:
+        document: The decoded response body.
+        expectation (dict): The checks of the request.
+
+    Returns:
+        list: The problems found, empty for a valid response.
+    """
+    if not isinstance(document, dict):
+        return ["response is not a JSON object"]
+    if document.get("type") == "Feature":
+        features = [document]
+    elif document.get("type") == "FeatureCollection" and isinstance(
+        document.get("features"), list
+    ):
+        features = document["features"]
+    else:
+        return [f"response is a {document.get('type')}, expected an item or items"]
+
+    errors = []
+    count = len(features)
+    if count < expectation.get("min_count", 0):
+        errors.append(
+            f"{count} items returned, expected at least {expectation['min_count']}"
+        )
+    if expectation.get("limit") and count > expectation["limit"]:
+        errors.append(
+            f"{count} items returned over the limit of {expectation['limit']}"
+        )
+    if "numberReturned" in document and document["numberReturned"] != count:
+        errors.append(
+            f"numberReturned is {document['numberReturned']} but {count} items were returned"
+        )
+
+    collections = set(expectation.get("collections") or [])
+    ids = set(expectation.get("ids") or [])
+    bbox = expectation.get("bbox")
+    if expectation.get("point"):
+        bbox = list(expectation["point"]) * 2
+    start = end = None
+    if expectation.get("datetime"):
+        start_text, _, end_text = expectation["datetime"].partition("/")
+        start, end = parse_datetime(start_text), parse_datetime(end_text or start_text)
+    for feature in features:
+        errors += item_errors(feature)
+        if not isinstance(feature, dict):
+            continue
+        if collections and feature.get("collection") not in collections:
+            errors.append(
+                f"item {feature.get('id')} is in collection {feature.get('collection')}"
+            )
+        if ids and feature.get("id") not in ids:
+            errors.append(f"item {feature.get('id')} was not requested")
+        if bbox:
+            extent = feature_bbox(feature)
+            if extent and not bboxes_intersect(extent, bbox):
+                errors.append(f"item {feature.get('id')} {extent} is outside of {bbox}")
+        if start or end:
+            item_start, item_end = item_interval(feature)
+            if (start and item_end and item_end < start) or (
+                end and item_start and item_start > end
+            ):
+                errors.append(
+                    f"item {feature.get('id')} is outside of {expectation['datetime']}"
+                )
+    if expectation.get("sortby"):
+        errors += sort_errors(features, expectation["sortby"])
+    return errors[:MAX_ERRORS]
+
+
+class ResponseValidator:
+    """
+    Validates a sample of the responses of a Locust process in a separate process.
+
+    Sampled response bodies are queued, without being decoded, and streamed to a
+    validator process, so the checks do not take CPU time from the load generator.
+    Invalid responses are logged as failures of their endpoint once checked; responses
+    sampled while the queue is full are dropped rather than slowing requests down.
+
+    Attributes:
+        settings (ValidationSettings): The sample rate and queue size.
+        validated (int): The number of responses checked.
+        invalid (int): The number of invalid responses.
+        dropped (int): The number of sampled responses dropped on a full queue.
+    """
+
+    def __init__(self, settings: ValidationSettings):
+        """Initialize the validator, the validator process starts with the run."""
+        self.settings = settings
+        self.validated = 0
+        self.invalid = 0
+        self.dropped = 0
+        self._environment = None
+        self._process = None
+        self._queue = None
+        self._greenlets: list = []
+
+    def start(self, environment):
+        """Start the validator process and the greenlets streaming responses to it."""
+        import gevent
+        from gevent import subprocess
+        from gevent.queue import Queue
+
+        self.stop()
+        self.validated = self.invalid = self.dropped = 0
+        self._environment = environment
+        self._queue = Queue(maxsize=self.settings.max_pending)
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", __name__],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._greenlets = [
+            gevent.spawn(self._send, self._process, self._queue),
+            gevent.spawn(self._receive, self._process),
+        ]
+
+    def submit(self, response, method: str, name: str, expectation: Dict):
+        """
+        Queue a successful response for validation, if sampled.
+
+        Args:
+            response: The Locust client response.
+            method (str): The request method.
+            name (str): The stats name of the request.
+            expectation (dict): The checks of the request, see `validate`.
+        """
+        if self._queue is None or random.random() >= self.settings.sample_rate:
+            return
+        if response.status_code != 200:
+            return
+        if self._queue.full():
+            self.dropped += 1
+            return
+        self._queue.put_nowait((method, name, expectation, response.content))
+
+    def _send(self, process, queue):
+        """Stream the queued responses to the validator process."""
+        for method, name, expectation, content in queue:
+            header = {"method": method, "name": name, "expect": expectation}
+            header["size"] = len(content)
+            process.stdin.write(dumps(header) + b"\n" + content)
+            process.stdin.flush()
+
+    def _receive(self, process):
+        """Log the invalid responses reported by the validator process as failures."""
+        for line in process.stdout:
+            verdict = loads(line)
+            self.validated += 1
+            if verdict["errors"]:
+                self.invalid += 1
+                self._environment.stats.log_error(
+                    verdict["method"],
+                    verdict["name"],
+                    ValidationError("; ".join(verdict["errors"])),
+                )
+
+    def stop(self):
+        """Validate the queued responses and stop the validator process."""
+        import gevent
+        from gevent.queue import Full
+
+        if self._process is None:
+            return
+        sender, receiver = self._greenlets
+        # Stop sending once the queue is drained, then wait for the last verdicts
+        try:
+            self._queue.put(StopIteration, timeout=DRAIN_TIMEOUT)
+        except Full:
+            pass
+        sender.join(timeout=DRAIN_TIMEOUT)
+        sender.kill()
+        self._process.stdin.close()
+        receiver.join(timeout=DRAIN_TIMEOUT)
+        gevent.killall(self._greenlets)
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process = None
+        self._queue = None
+        print(
+            f"Validated {self.validated} sampled responses: {self.invalid} invalid, "
+            + f"{self.dropped} dropped on a full validation queue"
+        )
+
+
+@lru_cache(maxsize=None)
+def get_response_validator() -> Optional[ResponseValidator]:
+    """Return the process-wide response validator, or None when responses are not validated."""
+    settings = ValidationSettings.from_env()
+    if not settings.enabled:
+        return None
+    return ResponseValidator(settings)
+
+
+def start_validation(environment):
+    """
+    Start the validator process when a run starts, on the workers or the single local runner.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    # Imported here so the CLI can validate settings without importing (and monkey patching) locust
+    from locust.runners import MasterRunner
+
+    validator = get_response_validator()
+    if validator is None or isinstance(environment.runner, MasterRunner):
+        return
+    validator.start(environment)
+
+
+def stop_validation(environment):
+    """
+    Finish validating the sampled responses when a run stops.
+
+    Args:
+        environment (Environment): The Locust environment.
+    """
+    validator = get_response_validator()
+    if validator is not None:
+        validator.stop()
+
+
+def main():
+    """
+    Validate the responses streamed on stdin, writing one verdict line per response.
+
+    Each response is a JSON header line (method, name, expectation and body size)
+    followed by the raw body.
+    """
+    # Leave the CPU to the load generator when both compete for it
+    os.nice(10)
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    for line in stdin:
+        header = loads(line)
+        content = stdin.read(header["size"])
+        try:
+            document = loads(content)
+        except ValueError as e:
+            errors = [f"invalid JSON response: {e}"]
+        else:
+            try:
+                errors = validate(document, header["expect"])
+            except (ValueError, TypeError) as e:
+                errors = [f"unexpected value in response: {e}"]
+        verdict = {"method": header["method"], "name": header["name"]}
+        verdict["errors"] = errors
+        stdout.write(dumps(verdict) + b"\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Write workload: item creation, update, deletion and bulk insertion."""
+import itertools
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from ..data_loader.data_loader import load_sample_items
+from ..data_loader.generator import DEFAULT_COLLECTION_ID, ItemGenerator
+from .codec import json_body
+
+WRITE_OPERATIONS = ["create", "update", "delete", "bulk"]
+DEFAULT_WRITE_MIX = "create=4,update=2,delete=1,bulk=1"
+# Read tasks are repeated this many times when mixing in writes, for finer ratios
+READ_TASK_SCALE = 20
+# Created items kept per user as update and delete targets
+MAX_OWNED_ITEMS = 1000
+
+
+def parse_write_mix(text: str) -> Dict[str, int]:
+    """
+    Parse the relative weights of the write operations.
+
+    Args:
+        text (str): Comma-separated `operation=weight` pairs, e.g. `create=4,update=2,delete=1,bulk=1`.
+
+    Returns:
+        dict: The weight of each write operation, 0 for the missing ones.
+
+    Raises:
+        ValueError: If an operation is unknown or a weight is not an integer.
+    """
+    weights = dict.fromkeys(WRITE_OPERATIONS, 0)
+    for pair in text.split(","):
+        if not pair.strip():
+            continue
+        operation, _, weight = pair.partition("=")
+        if operation.strip() not in weights:
+            raise ValueError(
+                f"Unknown write operation '{operation.strip()}', expected one of {', '.join(WRITE_OPERATIONS)}"
+            )
+        weights[operation.strip()] = int(weight)
+    if not any(weights.values()):
+        raise ValueError(f"Invalid write mix '{text}', no operation has a weight")
+    return weights
+
+
+class WriteSettings(NamedTuple):
+    """
+    Settings of the write workload.
+
+    Attributes:
+        ratio (float): The fraction of task runs that are writes, 0 for reads only.
+        mix (str): The relative weights of the write operations.
+        batch_size (int): The number of items per bulk insertion.
+        collection_id (str): The collection written to.
+        run_id (str): A token shared by every worker of a run, making item ids unique across runs.
+    """
+
+    ratio: float = 0.0
+    mix: str = DEFAULT_WRITE_MIX
+    batch_size: int = 10
+    collection_id: str = DEFAULT_COLLECTION_ID
+    run_id: str = ""
+
+    @classmethod
+    def from_env(cls) -> "WriteSettings":
+        """
+        Read the settings from the `STAC_WRITE_*` and `STAC_RUN_ID` environment variables.
+
+        They are set by the CLI from `--write-ratio`, `--write-mix`, `--write-batch-size`
+        and `--write-collection`. Without `STAC_RUN_ID`, each process uses its own.
+        """
+        return cls(
+            ratio=float(os.getenv("STAC_WRITE_RATIO", "0")),
+            mix=os.getenv("STAC_WRITE_MIX", DEFAULT_WRITE_MIX),
+            batch_size=int(os.getenv("STAC_WRITE_BATCH_SIZE", "10")),
+            collection_id=os.getenv("STAC_WRITE_COLLECTION", DEFAULT_COLLECTION_ID),
+            run_id=os.getenv("STAC_RUN_ID") or f"{time.time_ns():x}",
+        )
+
+    def mix_tasks(self, tasks: List[Callable], write_task: Callable) -> List[Callable]:
+        """
+        Weight a user's task list so that `ratio` of the task runs are writes.
+
+        Args:
+            tasks (list): The tasks after tag filtering, repeated by weight.
+            write_task (callable): The task running a write operation.
+
+        Returns:
+            list: The reweighted tasks. Writes are dropped when the ratio is 0, unless
+                they are the only tasks left (e.g. `--tags writes`).
+        """
+        reads = [task for task in tasks if task is not write_task]
+        if write_task not in tasks:
+            return tasks
+        if not reads or self.ratio >= 1:
+            return [write_task]
+        if self.ratio <= 0:
+            return reads
+        reads *= READ_TASK_SCALE
+        n_writes = max(round(len(reads) * self.ratio / (1 - self.ratio)), 1)
+        return reads + [write_task] * n_writes
+
+
+class ItemIdAllocator:
+    """
+    Allocate item ids unique across users, workers and runs: `write-{run}-{worker}-{n}`.
+
+    Users of a worker share the allocator. The counter is only advanced between
+    gevent context switches, so no lock is needed.
+    """
+
+    def __init__(self, run_id: str, worker_index: int):
+        """Initialize the allocator of a worker."""
+        self.prefix = f"write-{run_id}-{worker_index}"
+        self._counter = itertools.count()
+
+    def next_index(self) -> int:
+        """Return the next item number of this worker."""
+        return next(self._counter)
+
+    def item_id(self, index: int) -> str:
+        """Return the id of an item number."""
+        return f"{self.prefix}-{index}"
+
+
+@lru_cache(maxsize=None)
+def get_id_allocator(worker_index: int = 0) -> ItemIdAllocator:
+    """Return the worker-wide item id allocator."""
+    return ItemIdAllocator(WriteSettings.from_env().run_id, worker_index)
+
+
+@lru_cache(maxsize=None)
+def get_write_generator() -> ItemGenerator:
+    """Return the worker-wide generator of the written items, built from the sample items."""
+    return ItemGenerator(
+        load_sample_items(), seed=int(os.getenv("STAC_LOAD_SEED", "0")) + 1
+    )
+
+
+class ItemWriter:
+    """
+    Issue the write operations of one user.
+
+    Items are built by the generator as fresh top-level dicts sharing their assets with
+    the templates, so nothing shared is mutated and no deep copy is needed. Each user
+    only updates and deletes items it created itself, so users never race on an item.
+
+    Attributes:
+        user (HttpUser): The Locust user, whose client sends the requests.
+        settings (WriteSettings): The write workload settings.
+        allocator (ItemIdAllocator): The worker-wide id allocator.
+        owned (deque): The numbers of the live items created by this user, oldest first.
+    """
+
+    def __init__(
+        self,
+        user,
+        settings: WriteSettings,
+        allocator: ItemIdAllocator,
+        generator: Optional[ItemGenerator] = None,
+    ):
+        """Initialize the writer of a user."""
+        self.user = user
+        self.settings = settings
+        self.allocator = allocator
+        self.generator = generator or get_write_generator()
+        self.owned: Deque[int] = deque(maxlen=MAX_OWNED_ITEMS)
+        weights = parse_write_mix(settings.mix)
+        self._operations = [op for op in WRITE_OPERATIONS if weights[op]]
+        self._weights = [weights[op] for op in self._operations]
+
+    @property
+    def client(self):
+        """Return the user's current client, which may be wrapped after the writer is created."""
+        return self.user.client
+
+    @property
+    def items_url(self) -> str:
+        """Return the items endpoint of the written collection."""
+        return f"/collections/{self.settings.collection_id}/items"
+
+    def build_item(self, index: int) -> dict:
+        """Return the item of an allocated number, in the written collection."""
+        item = self.generator.item(index)
+        item["id"] = self.allocator.item_id(index)
+        item["collection"] = self.settings.collection_id
+        return item
+
+    def new_item(self) -> Tuple[int, dict]:
+        """Return the number and item of a newly allocated id."""
+        index = self.allocator.next_index()
+        return index, self.build_item(index)
+
+    def run(self):
+        """Run a write operation picked from the write mix."""
+        operation = random.choices(self._operations, self._weights)[0]
+        getattr(self, operation)()
+
+    def create(self):
+        """Create an item."""
+        index, item = self.new_item()
+        response = self.client.post(
+            self.items_url, **json_body(item), name="post-create-item"
+        )
+        if response.ok:
+            self.owned.append(index)
+
+    def update(self):
+        """Replace one of this user's items with updated properties, creating one if none is left."""
+        if not self.owned:
+            return self.create()
+        item = self.build_item(random.choice(self.owned))
+        item["properties"]["updated"] = datetime.now(timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        item["properties"]["eo:cloud_cover"] = round(random.uniform(0, 100), 2)
+        self.client.put(
+            f"{self.items_url}/{item['id']}", **json_body(item), name="put-update-item"
+        )
+
+    def delete(self):
+        """Delete this user's oldest item, creating one if none is left."""
+        if not self.owned:
+            return self.create()
+        item_id = self.allocator.item_id(self.owned.popleft())
+        self.client.delete(f"{self.items_url}/{item_id}", name="delete-item")
+
+    def bulk(self):
+        """Insert a batch of items through the Transaction extension's bulk items endpoint."""
+        batch = [self.new_item() for _ in range(self.settings.batch_size)]
+        response = self.client.post(
+            f"/collections/{self.settings.collection_id}/bulk_items",
+            **json_body(
+                {"items": {item["id"]: item for _, item in batch}, "method": "insert"}
+            ),
+            name="post-bulk-items",
+        )
+        if response.ok:
+            self.owned.extend(index for index, _ in batch)
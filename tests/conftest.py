@@ -0,0 +1,4 @@
+"""Shared test setup."""
+# Locust monkey patches the standard library with gevent on import, which must happen
+# before ssl is imported by requests
+import locust  # noqa: F401
@@ -0,0 +1,122 @@
+"""Tests of the open-model arrival schedule."""
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from stac_api_load_testing.workload.arrival import (
+    ArrivalProfile,
+    ArrivalRateShape,
+    ScheduledClient,
+)
+
+
+@pytest.mark.parametrize(
+    "profile, rates",
+    [
+        ("constant", [100, 100, 100, 100]),
+        ("ramp", [0, 25, 100, 100]),
+        ("step", [20, 20, 40, 100]),
+        ("spike", [100, 100, 500, 100]),
+    ],
+)
+def test_rate_at(profile, rates):
+    """Each profile gives the target rate over time."""
+    arrival = ArrivalProfile(
+        rate=100, profile=profile, period=40, steps=5, spike_duration=20
+    )
+
+    assert [arrival.rate_at(elapsed) for elapsed in [0, 10, 50, 300]] == rates
+
+
+def test_zero_period_profiles_start_at_the_full_rate():
+    """Ramps and steps without a period do not divide by zero."""
+    for profile in ["ramp", "step"]:
+        assert ArrivalProfile(rate=10, profile=profile, period=0).rate_at(0) == 10
+
+
+def test_from_env(monkeypatch):
+    """The profile is read from the variables set by the CLI."""
+    monkeypatch.setenv("STAC_ARRIVAL_RATE", "250")
+    monkeypatch.setenv("STAC_LOAD_PROFILE", "spike")
+    monkeypatch.setenv("STAC_ARRIVAL_USERS", "4")
+    monkeypatch.delenv("STAC_PROFILE_PERIOD", raising=False)
+
+    arrival = ArrivalProfile.from_env()
+
+    assert (arrival.rate, arrival.profile, arrival.users) == (250, "spike", 4)
+    assert arrival.period == 60
+    assert arrival.enabled
+    assert not ArrivalProfile().enabled
+
+
+class FakeClient:
+    """A Locust client recording requests and the latency they report."""
+
+    def __init__(self):
+        """Start without requests."""
+        self.requests = []
+        self.base_url = "http://api"
+
+    @contextmanager
+    def _catch(self, method, url, kwargs):
+        """Record the latency the response reports once it is handled."""
+        response = SimpleNamespace(request_meta={"response_time": 1.0})
+        yield response
+        self.requests.append(
+            (method, url, kwargs, response.request_meta["response_time"])
+        )
+
+    def request(self, method, url, **kwargs):
+        """Send a request, as a context manager when `catch_response` is set."""
+        if kwargs.get("catch_response"):
+            return self._catch(method, url, kwargs)
+        self.requests.append((method, url, kwargs, 1.0))
+        return SimpleNamespace()
+
+
+def test_first_request_of_an_arrival_is_measured_from_its_intended_start():
+    """Time spent waiting behind the schedule counts in the first request only."""
+    client = ScheduledClient(FakeClient())
+
+    client.schedule(time.perf_counter() - 0.5)
+    client.post("/search", name="search")
+    client.get("/collections", name="collections")
+
+    first, second = client._client.requests
+    assert first[:2] == ("POST", "/search")
+    assert first[2] == {"name": "search", "catch_response": True}
+    assert first[3] >= 500
+    assert second == ("GET", "/collections", {"name": "collections"}, 1.0)
+    assert client.base_url == "http://api"
+
+
+def test_requests_catching_their_response_are_not_corrected():
+    """Requests validating their own response keep Locust's measurement."""
+    client = ScheduledClient(FakeClient())
+
+    client.schedule(time.perf_counter() - 0.5)
+    with client.get("/search", catch_response=True):
+        pass
+
+    assert client._client.requests[0][3] == 1.0
+
+
+def make_shape(run_time, elapsed, users=3):
+    """Return an arrival shape `elapsed` seconds into a run of `run_time` seconds."""
+    shape = ArrivalRateShape()
+    shape.arrival_profile = ArrivalProfile(rate=10, users=users)
+    shape.user_class = object
+    shape.runner = SimpleNamespace(
+        environment=SimpleNamespace(parsed_options=SimpleNamespace(run_time=run_time))
+    )
+    shape.get_run_time = lambda: elapsed
+    return shape
+
+
+def test_shape_keeps_the_dispatchers_until_the_run_time_is_over():
+    """The dispatchers are spawned at once and stopped after the run time."""
+    assert make_shape(60, 10).tick() == (3, 3, [object])
+    assert make_shape(None, 10_000, users=0).tick() == (1, 1, [object])
+    assert make_shape(60, 61).tick() is None
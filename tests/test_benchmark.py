@@ -0,0 +1,181 @@
+"""Tests of the benchmark suite statistics and results database."""
+import random
+from collections import Counter
+
+import pytest
+
+from stac_api_load_testing.workload.benchmark import (
+    ResultsDatabase,
+    compare_runs,
+    mann_whitney,
+    median,
+)
+from stac_api_load_testing.workload.histograms import new_histogram
+
+SETTINGS = {"users": 10, "run_time": "1m"}
+
+
+def brute_force_u(current, baseline):
+    """Return U from every pair of samples, ties counting half."""
+    xs = [value for value, count in current.items() for _ in range(count)]
+    ys = [value for value, count in baseline.items() for _ in range(count)]
+    return sum((x > y) + 0.5 * (x == y) for x in xs for y in ys)
+
+
+def sample(mean, n_samples, seed):
+    """Return the counts of rounded normal latencies, with many ties."""
+    rng = random.Random(seed)
+    return Counter(round(rng.gauss(mean, 10)) for _ in range(n_samples))
+
+
+def test_u_matches_brute_force_with_ties():
+    """Ranks computed per distinct value give the pairwise U statistic."""
+    current = {10: 3, 12: 2, 15: 1, 20: 4}
+    baseline = {9: 1, 10: 2, 12: 5, 20: 1, 30: 2}
+
+    test = mann_whitney(current, baseline)
+
+    assert test.u == brute_force_u(current, baseline)
+    assert test.effect == pytest.approx(test.u / (10 * 11))
+
+
+def test_u_matches_brute_force_on_random_samples():
+    """U matches the pairwise count on larger tied samples."""
+    current, baseline = sample(100, 300, seed=1), sample(102, 200, seed=2)
+
+    assert mann_whitney(current, baseline).u == brute_force_u(current, baseline)
+
+
+@pytest.mark.parametrize("current, baseline", [({}, {}), ({10: 5}, {}), ({}, {10: 5})])
+def test_empty_samples_are_never_significant(current, baseline):
+    """An empty sample gives no evidence of a shift."""
+    test = mann_whitney(current, baseline)
+
+    assert test.p_value == 1.0
+    assert test.effect == 0.5
+
+
+def test_all_tied_samples_are_not_significant():
+    """Samples of a single common value have no variance to test."""
+    assert mann_whitney({10: 50}, {10: 80}).p_value == 1.0
+
+
+def test_identical_distributions():
+    """The same latencies give no shift and a p-value of about 0.5."""
+    counts = sample(100, 2000, seed=3)
+
+    test = mann_whitney(counts, counts)
+
+    assert test.effect == pytest.approx(0.5)
+    assert test.p_value == pytest.approx(0.5, abs=0.01)
+
+
+def test_same_distribution_is_not_significant():
+    """Two samples of the same distribution do not pass for a regression."""
+    test = mann_whitney(sample(100, 2000, seed=4), sample(100, 2000, seed=5))
+
+    assert test.p_value > 0.01
+
+
+def test_clear_shift():
+    """Slower latencies are significant, faster ones are not."""
+    slower, baseline = sample(110, 2000, seed=6), sample(100, 2000, seed=7)
+
+    regression = mann_whitney(slower, baseline)
+    improvement = mann_whitney(baseline, slower)
+
+    assert regression.p_value < 1e-12
+    assert regression.effect > 0.7
+    assert improvement.p_value > 1 - 1e-12
+    assert improvement.effect == pytest.approx(1 - regression.effect)
+
+
+def test_median():
+    """The median of counted values is the lower middle value."""
+    assert median({1: 1, 2: 1, 3: 1}) == 2
+    assert median({1: 2, 5: 2}) == 1
+    assert median({}) == 0.0
+
+
+def encoded_histogram(counts):
+    """Return the encoded HdrHistogram of latencies in microseconds."""
+    histogram = new_histogram()
+    for value, count in counts.items():
+        histogram.record_value(value, count)
+    return histogram.encode().decode("ascii")
+
+
+def test_compare_runs_flags_significant_and_material_regressions():
+    """Only endpoints slower beyond the tolerance regress."""
+    baseline_counts = sample(10_000, 2000, seed=8)
+    key = ("GET", "get-item")
+    same = ("GET", "get-collection")
+    row = {"num_requests": 2000}
+    current = {
+        key: (row, encoded_histogram(sample(12_000, 2000, seed=9))),
+        same: (row, encoded_histogram(sample(10_000, 2000, seed=10))),
+        ("GET", "new-endpoint"): (row, encoded_histogram(baseline_counts)),
+    }
+    baseline = {
+        key: (row, encoded_histogram(baseline_counts)),
+        same: (row, encoded_histogram(baseline_counts)),
+    }
+
+    comparisons = {
+        (c.method, c.name): c for c in compare_runs(current, baseline, tolerance=0.1)
+    }
+
+    assert set(comparisons) == {key, same}
+    assert comparisons[key].regressed
+    assert not comparisons[same].regressed
+
+
+@pytest.fixture
+def database():
+    """Return an in-memory results database."""
+    database = ResultsDatabase(":memory:")
+    yield database
+    database.close()
+
+
+def add_run(
+    database, version, git_sha, scenario="browse", backend="pgstac", **settings
+):
+    """Store a run without endpoints."""
+    return database.add_run(
+        scenario, backend, version, git_sha, dict(SETTINGS, **settings), [], {}
+    )
+
+
+def test_find_baseline_selects_the_latest_matching_run(database):
+    """The baseline is the latest earlier run of the same scenario, backend and settings."""
+    first = add_run(database, "1.0", "aaaa1111")
+    latest = add_run(database, "1.1", "bbbb2222")
+    add_run(database, "1.1", "bbbb2222", scenario="deep-paging")
+    add_run(database, "1.1", "bbbb2222", backend="elasticsearch")
+    add_run(database, "1.1", "bbbb2222", users=50)
+    current = add_run(database, "1.2", "cccc3333")
+    add_run(database, "1.3", "dddd4444")
+
+    baseline = database.find_baseline(current, "browse", "pgstac", SETTINGS)
+
+    assert baseline.id == latest
+    assert (baseline.version, baseline.git_sha) == ("1.1", "bbbb2222")
+    assert database.find_baseline(first, "browse", "pgstac", SETTINGS) is None
+
+
+def test_find_baseline_by_ref(database):
+    """A ref selects the latest earlier run of a version or git sha prefix."""
+    by_version = add_run(database, "1.0", "aaaa1111")
+    add_run(database, "1.1", "bbbb2222")
+    current = add_run(database, "1.2", "cccc3333")
+
+    assert database.find_baseline(current, "browse", "pgstac", SETTINGS, "1.0").id == (
+        by_version
+    )
+    assert (
+        database.find_baseline(current, "browse", "pgstac", SETTINGS, "bbbb").version
+        == "1.1"
+    )
+    assert database.find_baseline(current, "browse", "pgstac", SETTINGS, "9.9") is None
+    assert database.find_baseline(current, "browse", "pgstac", SETTINGS, "cccc") is None
@@ -0,0 +1,213 @@
+"""Tests of resumable ingest checkpoints."""
+import threading
+
+import pytest
+
+from stac_api_load_testing.data_loader.checkpoint import (
+    IngestCheckpoint,
+    from_ranges,
+    to_ranges,
+)
+from stac_api_load_testing.data_loader.ingest import BulkIngester
+
+SOURCE = "generated:items=20,collections=1,seed=0"
+
+
+class Crash(BaseException):
+    """The ingest process dying mid-run."""
+
+
+class Response:
+    """The status and body of a fake response."""
+
+    def __init__(self, status_code: int):
+        """Build a bodyless response."""
+        self.status_code = status_code
+        self.text = ""
+
+
+class FakeSession:
+    """Record the posted item ids, failing or crashing on chosen ones."""
+
+    def __init__(self, fail=(), crash=None):
+        """Fail the items of `fail` with a 500 and crash on the item `crash`."""
+        self.fail = set(fail)
+        self.crash = crash
+        self.posted = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json):
+        """Create an item."""
+        if json["id"] == self.crash:
+            raise Crash()
+        with self._lock:
+            self.posted.append(json["id"])
+        return Response(500 if json["id"] in self.fail else 201)
+
+
+class BulkSession:
+    """
+    An API whose bulk inserts are rejected as a whole if any item exists.
+
+    Inserts of new items of `fail` are rejected with a 500, bulk or not.
+    """
+
+    def __init__(self, stored=(), fail=()):
+        """Hold the items of `stored` already."""
+        self.stored = set(stored)
+        self.fail = set(fail)
+        self.posted = []
+
+    def post(self, url, json):
+        """Create items in bulk or one at a time."""
+        ids = list(json["items"]) if url.endswith("/bulk_items") else [json["id"]]
+        self.posted.append(ids)
+        if self.stored & set(ids):
+            return Response(409)
+        if self.fail & set(ids):
+            return Response(500)
+        self.stored.update(ids)
+        response = Response(200)
+        response.text = f'"Successfully added {len(ids)} Items."'
+        return response
+
+
+def make_items(n_items: int = 20):
+    """Return items whose ids are their offsets."""
+    return [{"id": str(offset), "collection": "c"} for offset in range(n_items)]
+
+
+def ingest(path, session, concurrency=1, use_bulk=False):
+    """Ingest the items in batches of 4, resuming from the checkpoint file if any."""
+    checkpoint = IngestCheckpoint(str(path), SOURCE)
+    checkpoint.load()
+    ingester = BulkIngester(
+        "http://api",
+        session,
+        concurrency=concurrency,
+        batch_size=4,
+        use_bulk=use_bulk,
+        checkpoint=checkpoint,
+    )
+    return ingester.run(make_items())
+
+
+def test_ranges_round_trip():
+    """Offsets are stored as ranges of consecutive offsets."""
+    offsets = {0, 1, 2, 5, 7, 8}
+
+    assert to_ranges(offsets) == [[0, 3], [5, 6], [7, 9]]
+    assert from_ranges(to_ranges(offsets)) == offsets
+
+
+def test_out_of_order_completion(tmp_path):
+    """The watermark only moves past offsets once every offset below is resolved."""
+    checkpoint = IngestCheckpoint(str(tmp_path / "ckpt"), SOURCE)
+
+    checkpoint.resolve([4, 5])
+    checkpoint.resolve([2, 3], failed=True)
+    assert checkpoint.offset == 0
+    assert not checkpoint.committed(4)
+
+    checkpoint.resolve([0, 1])
+    assert checkpoint.offset == 6
+    assert [checkpoint.committed(o) for o in range(7)] == [
+        True,
+        True,
+        False,
+        False,
+        True,
+        True,
+        False,
+    ]
+
+    checkpoint.resolve([3])
+    assert checkpoint.committed(3)
+    assert checkpoint.failed == {2}
+
+
+def test_crash_keeps_the_last_saved_state(tmp_path):
+    """A crash loses nothing but the offsets resolved since the last write."""
+    path = str(tmp_path / "ckpt")
+    checkpoint = IngestCheckpoint(path, SOURCE, interval=0)
+    checkpoint.resolve([0, 1, 2])
+    checkpoint.resolve([5, 6])
+    checkpoint.resolve([3], failed=True)
+    checkpoint.interval = 3600
+    checkpoint.resolve([4])  # Not written before the crash
+
+    resumed = IngestCheckpoint(path, SOURCE)
+    assert resumed.load()
+    assert resumed.offset == 4
+    assert resumed.failed == {3}
+    assert [o for o in range(8) if resumed.committed(o)] == [0, 1, 2]
+
+
+def test_resume_skips_exactly_the_acknowledged_offsets(tmp_path):
+    """A resumed run posts the failed items and the items after the crash only."""
+    path = tmp_path / "ckpt"
+    first = FakeSession(fail={"3"}, crash="8")
+    with pytest.raises(Crash):
+        ingest(path, first)
+    # The item after the crash may be posted before the crash is seen, it sits above
+    # the unresolved offset 8 so it is posted again
+    assert first.posted[:8] == [str(offset) for offset in range(8)]
+
+    second = FakeSession()
+    report = ingest(path, second)
+    assert second.posted == ["3"] + [str(offset) for offset in range(8, 20)]
+    assert report.skipped == 7
+    assert report.created == 13
+
+    third = FakeSession()
+    report = ingest(path, third)
+    assert third.posted == []
+    assert report.skipped == 20
+
+
+def test_bulk_conflict_posts_and_commits_only_confirmed_items(tmp_path):
+    """New items of a bulk insert rejected with a 409 are posted, not assumed to exist."""
+    path = tmp_path / "ckpt"
+    first = BulkSession(fail={"5"})
+    report = ingest(path, first, use_bulk=True)
+    assert report.failed == 4
+    assert first.stored == {str(offset) for offset in range(20)} - {"4", "5", "6", "7"}
+
+    # Item 4 was written in the meantime, the retried batch 4-7 conflicts on it, and
+    # item 6 now fails on its own
+    second = BulkSession(stored=first.stored | {"4"}, fail={"6"})
+    report = ingest(path, second, use_bulk=True)
+    assert second.posted == [["4", "5", "6", "7"], ["4"], ["5"], ["6"], ["7"]]
+    assert {"5", "7"} <= second.stored
+    assert (report.created, report.existing, report.failed) == (2, 1, 1)
+
+    checkpoint = IngestCheckpoint(str(path), SOURCE)
+    checkpoint.load()
+    assert checkpoint.offset == 20
+    assert checkpoint.failed == {6}
+    assert not checkpoint.committed(6)
+    assert all(checkpoint.committed(o) for o in range(20) if o != 6)
+
+
+def test_concurrent_run_resolves_every_offset(tmp_path):
+    """Batches completing out of order still commit the whole stream."""
+    path = tmp_path / "ckpt"
+    ingest(path, FakeSession(fail={"11", "12"}), concurrency=4)
+
+    checkpoint = IngestCheckpoint(str(path), SOURCE)
+    checkpoint.load()
+    assert checkpoint.offset == 20
+    assert checkpoint.failed == {11, 12}
+
+    retry = FakeSession()
+    ingest(path, retry, concurrency=4)
+    assert sorted(retry.posted) == ["11", "12"]
+
+
+def test_rejects_a_checkpoint_of_other_items(tmp_path):
+    """A checkpoint is only resumed on the items it was written for."""
+    path = str(tmp_path / "ckpt")
+    IngestCheckpoint(path, SOURCE).save()
+
+    with pytest.raises(ValueError):
+        IngestCheckpoint(path, "sample").load()
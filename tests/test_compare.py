@@ -0,0 +1,110 @@
+"""Tests of side-by-side backend comparisons."""
+import pytest
+
+from stac_api_load_testing.workload.compare import (
+    compare_results,
+    find_regressions,
+    load_baseline,
+    parse_endpoint,
+    write_comparison,
+)
+
+
+def row(name, method="GET", **metrics):
+    """Return a results row with healthy defaults."""
+    values = {
+        "rps": 100.0,
+        "p50": 50.0,
+        "p95": 100.0,
+        "p99": 200.0,
+        "failure_rate": 0.0,
+    }
+    values.update(metrics)
+    return dict(method=method, name=name, **values)
+
+
+def test_parse_endpoint():
+    """Endpoints are named URLs."""
+    assert parse_endpoint(" pgstac = http://localhost:8083 ") == (
+        "pgstac",
+        "http://localhost:8083",
+    )
+    assert parse_endpoint("es=http://h/?a=b") == ("es", "http://h/?a=b")
+    for text in ["http://localhost:8083", "=http://h", "pgstac="]:
+        with pytest.raises(ValueError):
+            parse_endpoint(text)
+
+
+def test_compare_results_lines_up_endpoints():
+    """Rows are matched by method and name, with the aggregate last."""
+    table = compare_results(
+        {
+            "pgstac": [row("Aggregated", method=""), row("get-item", p95=80.0)],
+            "es": [row("search", method="POST"), row("get-item", p95=90.0)],
+        }
+    )
+
+    assert [(line["method"], line["name"]) for line in table] == [
+        ("GET", "get-item"),
+        ("POST", "search"),
+        ("", "Aggregated"),
+    ]
+    assert (table[0]["pgstac_p95"], table[0]["es_p95"]) == (80.0, 90.0)
+    assert table[1]["pgstac_rps"] is None
+    assert table[2]["es_p50"] is None
+
+
+def test_comparison_round_trips_as_a_baseline(tmp_path):
+    """A saved comparison reloads as the per-backend results."""
+    results = {"pgstac": [row("get-item")], "es": [row("get-item", p95=1.5)]}
+    prefix = str(tmp_path / "comparison")
+
+    write_comparison(results, compare_results(results), prefix)
+
+    assert load_baseline(f"{prefix}.json") == results
+    with open(f"{prefix}.csv") as file:
+        assert file.readline().strip().split(",")[:3] == [
+            "method",
+            "name",
+            "pgstac_rps",
+        ]
+
+
+@pytest.mark.parametrize(
+    "metrics, regressed",
+    [
+        ({"p95": 115.0}, ["p95 100 -> 115"]),
+        ({"p95": 108.0}, []),  # Within the tolerance
+        ({"p50": 58.0}, ["p50 50 -> 58"]),
+        ({"rps": 85.0}, ["rps 100 -> 85"]),
+        ({"rps": 150.0, "p99": 100.0}, []),  # Improvements
+        ({"failure_rate": 0.0005}, []),  # Below the noise floor
+        ({"failure_rate": 0.02}, ["failure_rate 0 -> 0.02"]),
+    ],
+)
+def test_find_regressions(metrics, regressed):
+    """Metrics regress when worse by more than the tolerance and the noise floor."""
+    regressions = find_regressions(
+        {"pgstac": [row("get-item", **metrics)]},
+        {"pgstac": [row("get-item")]},
+        tolerance=0.1,
+    )
+
+    assert regressions == [f"pgstac GET get-item: {r}" for r in regressed]
+
+
+def test_small_absolute_changes_are_noise():
+    """Fast endpoints do not regress on a few milliseconds, whatever the ratio."""
+    assert not find_regressions(
+        {"es": [row("landing", p50=4.0)]}, {"es": [row("landing", p50=1.0)]}
+    )
+
+
+def test_unknown_backends_and_endpoints_are_not_checked():
+    """Only results with a baseline counterpart are compared."""
+    slow = row("get-item", p99=10_000.0)
+
+    assert not find_regressions(
+        {"new-backend": [slow], "pgstac": [slow, row("new-endpoint")]},
+        {"pgstac": [row("get-item", p99=None)]},
+    )
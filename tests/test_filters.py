@@ -0,0 +1,148 @@
+"""Tests of the datetime, CQL2 filter, fields and query parameters."""
+import random
+from datetime import datetime
+
+from stac_api_load_testing.workload.filters import (
+    DAY,
+    FIELDS,
+    Predicate,
+    cql2_json,
+    cql2_literal,
+    cql2_text,
+    datetime_interval,
+    fields_parameter,
+    query_extension,
+    queryables,
+    random_fields,
+    random_predicates,
+)
+
+SUMMARY = {
+    "platform": ["sentinel-2a", "sentinel-2b"],
+    "instruments": ["msi"],
+    "gsd": {"minimum": 10, "maximum": 60},
+    "eo:bands": [{"name": "B01"}],
+    "constellation": [],
+}
+PREDICATES = [
+    Predicate("platform", "=", "sentinel-2a"),
+    Predicate("eo:cloud_cover", "<=", 20.5),
+]
+
+
+def timestamp(value):
+    """Return the epoch timestamp of an RFC 3339 datetime."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def test_queryables():
+    """Scalar enumerations and ranges are queryable, arrays and objects are not."""
+    enums, ranges = queryables(SUMMARY)
+
+    assert enums == {"platform": ["sentinel-2a", "sentinel-2b"]}
+    assert ranges == {"eo:cloud_cover": (0.0, 100.0), "gsd": (10.0, 60.0)}
+
+
+def test_random_predicates_stay_within_the_summaries():
+    """Predicates compare distinct properties to summarized values."""
+    random.seed(0)
+    for _ in range(200):
+        predicates = random_predicates(SUMMARY)
+        assert 1 <= len(predicates) <= 2
+        assert len({p.property for p in predicates}) == len(predicates)
+        for predicate in predicates:
+            if predicate.property == "platform":
+                assert predicate.op == "="
+                assert predicate.value in SUMMARY["platform"]
+            else:
+                low, high = {"gsd": (10, 60), "eo:cloud_cover": (0, 100)}[
+                    predicate.property
+                ]
+                assert predicate.op in {"<=", ">="}
+                assert low <= predicate.value <= high
+
+
+def test_random_predicates_without_summaries():
+    """Collections without summaries are filtered on the cloud cover."""
+    assert random_predicates({})[0].property == "eo:cloud_cover"
+
+
+def test_cql2_json():
+    """A single comparison stands alone, several are combined with `and`."""
+    assert cql2_json(PREDICATES[:1]) == {
+        "op": "=",
+        "args": [{"property": "platform"}, "sentinel-2a"],
+    }
+    assert cql2_json(PREDICATES) == {
+        "op": "and",
+        "args": [
+            {"op": "=", "args": [{"property": "platform"}, "sentinel-2a"]},
+            {"op": "<=", "args": [{"property": "eo:cloud_cover"}, 20.5]},
+        ],
+    }
+
+
+def test_cql2_text():
+    """Strings are quoted, with embedded quotes doubled."""
+    assert (
+        cql2_text(PREDICATES) == "platform = 'sentinel-2a' AND eo:cloud_cover <= 20.5"
+    )
+    assert cql2_literal("o'brien") == "'o''brien'"
+    assert cql2_literal(3) == "3"
+
+
+def test_query_extension():
+    """Predicates map to the Query extension's operator names."""
+    assert query_extension(PREDICATES + [Predicate("gsd", ">=", 10)]) == {
+        "platform": {"eq": "sentinel-2a"},
+        "eo:cloud_cover": {"lte": 20.5},
+        "gsd": {"gte": 10},
+    }
+
+
+def test_datetime_intervals_stay_within_the_extent():
+    """Intervals last a day to a quarter of the extent, and some are open."""
+    random.seed(1)
+    start, end = timestamp("2020-01-01T00:00:00Z"), timestamp("2021-01-01T00:00:00Z")
+    open_ended = 0
+    for _ in range(500):
+        low, high = datetime_interval((start, end)).split("/")
+        if ".." in (low, high):
+            open_ended += 1
+            bound = timestamp(high if low == ".." else low)
+            assert start <= bound <= end
+            continue
+        low, high = timestamp(low), timestamp(high)
+        assert start <= low < high <= end + 1
+        assert DAY - 1 <= high - low <= (end - start) / 4 + 1
+
+    assert 50 < open_ended < 150
+
+
+def test_datetime_interval_of_an_instant():
+    """A collection of a single instant gives intervals of that instant."""
+    instant = timestamp("2020-06-01T00:00:00Z")
+    random.seed(2)
+    interval = datetime_interval((instant, instant))
+
+    assert set(interval.split("/")) <= {"2020-06-01T00:00:00Z", ".."}
+
+
+def test_fields():
+    """Fields objects include and exclude distinct known fields."""
+    random.seed(3)
+    for _ in range(100):
+        fields = random_fields()
+        selected = fields["include"] + fields["exclude"]
+        assert 1 <= len(selected) == len(set(selected)) <= 5
+        assert set(selected) <= set(FIELDS)
+
+    assert (
+        fields_parameter({"include": ["id", "bbox"], "exclude": ["assets"]})
+        == "id,bbox,-assets"
+    )
+
+
+def test_empty_fields_parameter():
+    """An empty fields object gives an empty parameter."""
+    assert fields_parameter({"include": [], "exclude": []}) == ""
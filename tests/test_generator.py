@@ -0,0 +1,59 @@
+"""Tests of the synthetic item generator."""
+import json
+import random
+
+import pytest
+
+from stac_api_load_testing.data_loader.data_loader import load_sample_items
+from stac_api_load_testing.data_loader.generator import ItemGenerator
+from stac_api_load_testing.workload.seed_index import SeedIndex
+
+
+@pytest.fixture(scope="module")
+def templates():
+    """Return the bundled sample items."""
+    return list(load_sample_items())
+
+
+def test_items_are_a_function_of_seed_and_index(templates):
+    """Items are rebuilt identically whatever the instance, call order or global RNG."""
+    forward = ItemGenerator(templates, n_collections=3, seed=7)
+    backward = ItemGenerator(templates, n_collections=3, seed=7)
+    indexes = [0, 1, 2, 99, 100, 12345, 10**9]
+
+    expected = [json.dumps(forward.item(index)) for index in indexes]
+    random.seed(1)
+    backward.item(42)
+    actual = [json.dumps(backward.item(index)) for index in reversed(indexes)]
+
+    assert actual[::-1] == expected
+
+
+def test_items_depend_on_the_seed(templates):
+    """Two seeds generate different corpora with the same ids."""
+    first = ItemGenerator(templates, seed=0).item(5)
+    second = ItemGenerator(templates, seed=1).item(5)
+
+    assert first["id"] == second["id"]
+    assert first["bbox"] != second["bbox"]
+
+
+def test_generate_matches_item(templates):
+    """Streamed items equal the items rebuilt from their index."""
+    generator = ItemGenerator(templates, n_collections=2, seed=3)
+
+    assert list(generator.generate(5, start=10)) == [
+        generator.item(index) for index in range(10, 15)
+    ]
+
+
+def test_seed_index_agrees_with_generated_items(templates):
+    """The seed index rebuilds the ids, collections and bboxes of the ingested items."""
+    generator = ItemGenerator(templates, n_collections=4, seed=9)
+    index = SeedIndex(templates, n_generated=1000, n_collections=4, seed=9)
+
+    assert len(index) == 1000
+    for position in [0, 1, 499, 999]:
+        item = generator.item(position)
+        assert index.item(position) == (item["collection"], item["id"])
+        assert index.bbox(position) == item["bbox"]
@@ -0,0 +1,107 @@
+"""Tests of the per-endpoint latency histograms."""
+import json
+
+import pytest
+
+from stac_api_load_testing.workload.histograms import (
+    AGGREGATED,
+    HIGHEST_TRACKABLE_US,
+    HistogramRecorder,
+    hdr_key,
+    load_histograms,
+)
+
+
+def record(recorder, method, name, latencies_ms):
+    """Record latencies in milliseconds for one endpoint."""
+    for latency in latencies_ms:
+        recorder.record(method, name, latency)
+
+
+def test_hdr_key():
+    """Histogram percentiles have their own result keys."""
+    assert [hdr_key(p) for p in [50, 99.9, 99.99]] == [
+        "hdr_p50",
+        "hdr_p99.9",
+        "hdr_p99.99",
+    ]
+
+
+def test_records_per_endpoint_and_aggregate():
+    """Every latency lands in its endpoint's histogram and the aggregate."""
+    recorder = HistogramRecorder()
+    record(recorder, "GET", "get-item", range(1, 101))
+    record(recorder, "POST", "post-search", [1000] * 100)
+
+    item = recorder.percentiles("GET", "get-item")
+    aggregated = recorder.percentiles(*AGGREGATED)
+
+    assert item["hdr_p50"] == pytest.approx(50, rel=1e-3)
+    assert item["hdr_p99"] == pytest.approx(99, rel=1e-3)
+    assert aggregated["hdr_p50"] == pytest.approx(100, rel=1e-3)
+    assert aggregated["hdr_p90"] == pytest.approx(1000, rel=1e-3)
+    assert recorder.percentiles("GET", "unknown") == {}
+
+
+def test_out_of_range_latencies_are_clamped():
+    """Latencies below 1 us or above an hour are recorded at the bounds."""
+    recorder = HistogramRecorder()
+    record(recorder, "GET", "x", [0, 10**9])
+
+    histogram = recorder.histograms[("GET", "x")]
+    assert histogram.get_total_count() == 2
+    assert histogram.get_min_value() == 1
+    assert histogram.get_max_value() == pytest.approx(HIGHEST_TRACKABLE_US, rel=1e-3)
+
+
+def test_merging_worker_snapshots_equals_recording_in_one_place():
+    """Encoded worker histograms add up to the histograms of all their requests."""
+    single = HistogramRecorder()
+    master = HistogramRecorder()
+    for worker_latencies in [range(1, 500), range(400, 1000, 3)]:
+        worker = HistogramRecorder()
+        record(worker, "GET", "get item", worker_latencies)
+        record(single, "GET", "get item", worker_latencies)
+        master.merge(worker.encode())
+
+    for key in [("GET", "get item"), AGGREGATED]:
+        assert master.histograms[key].get_total_count() == (
+            single.histograms[key].get_total_count()
+        )
+    assert master.percentiles("GET", "get item") == single.percentiles(
+        "GET", "get item"
+    )
+
+
+def test_encode_skips_empty_histograms():
+    """Nothing is shipped for endpoints without latencies since the last reset."""
+    recorder = HistogramRecorder()
+    assert recorder.encode() == {}
+
+    record(recorder, "GET", "x", [5])
+    assert set(recorder.encode()) == {"GET x", " Aggregated"}
+
+    recorder.reset()
+    assert recorder.encode() == {}
+
+
+def test_export_round_trip(tmp_path):
+    """Exported histograms reload with the same counts and percentiles."""
+    path = str(tmp_path / "histograms.json")
+    recorder = HistogramRecorder()
+    record(recorder, "GET", "get-item", range(1, 200))
+    record(recorder, "POST", "post-search", [20, 30])
+
+    recorder.export(path)
+    loaded = load_histograms(path)
+
+    with open(path) as file:
+        exported = json.load(file)
+    assert exported["unit"] == "us"
+    assert [(e["method"], e["name"], e["count"]) for e in exported["endpoints"]] == [
+        ("", "Aggregated", 201),
+        ("GET", "get-item", 199),
+        ("POST", "post-search", 2),
+    ]
+    for key in recorder.histograms:
+        assert loaded.percentiles(*key) == recorder.percentiles(*key)
@@ -0,0 +1,191 @@
+"""Tests of the clustered query distributions."""
+import random
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from stac_api_load_testing.data_loader.data_loader import load_sample_items
+from stac_api_load_testing.workload.catalog import CollectionCatalog
+from stac_api_load_testing.workload.hotspots import (
+    QuerySampler,
+    SpatialSettings,
+    SpatialStats,
+    clamp_point,
+    item_center,
+    pick_hotspots,
+    tile_key,
+)
+from stac_api_load_testing.workload.seed_index import SeedIndex
+
+START = datetime(2020, 1, 1).timestamp()
+END = datetime(2021, 1, 1).timestamp()
+
+
+@pytest.fixture(scope="module")
+def seed_index():
+    """Return the index of 2000 generated items in 2 collections."""
+    return SeedIndex(
+        list(load_sample_items()), n_generated=2000, n_collections=2, seed=0
+    )
+
+
+@pytest.fixture
+def catalog(seed_index):
+    """Return a catalog of the generated collections, without fetching it."""
+    catalog = CollectionCatalog()
+    catalog.collection_ids = sorted(set(seed_index.collection_ids))
+    catalog.bboxes = {c: [10.0, 40.0, 20.0, 50.0] for c in catalog.collection_ids}
+    catalog.intervals = {c: (START, END) for c in catalog.collection_ids}
+    return catalog
+
+
+def sample(seed_index, catalog, n_queries=2000, kind="intersects", seed=0, **settings):
+    """Draw queries from a sampler and return it with the queries."""
+    sampler = QuerySampler(
+        SpatialSettings(batch_size=100, **settings), seed_index, seed=seed
+    )
+    return sampler, [sampler.next_query(kind, catalog) for _ in range(n_queries)]
+
+
+def test_tiles_and_points():
+    """Points map to the tile holding them and are clamped to WGS84."""
+    assert tile_key(-0.5, 1.5, 1.0) == (-1, 1)
+    assert tile_key(10.0, 10.0, 5.0) == (2, 2)
+    assert item_center([0, 0, 2, 4]) == (1, 2)
+    assert clamp_point(-200, 95) == (-180, 90)
+
+
+def test_zipf_hotspots_are_distinct_tiles_of_seed_items(seed_index):
+    """Hotspots are distinct tiles holding a seed item's center, picked reproducibly."""
+    settings = SpatialSettings(distribution="zipf", hotspots=20, tile_size=2.0)
+
+    hotspots = pick_hotspots(seed_index, settings, random.Random(1))
+
+    assert hotspots == pick_hotspots(seed_index, settings, random.Random(1))
+    assert len(hotspots) == len(set(map(repr, hotspots))) == 20
+    centers = [
+        (seed_index.item(i)[0], item_center(seed_index.bbox(i)))
+        for i in range(len(seed_index))
+    ]
+    for hotspot in hotspots:
+        minx, miny, maxx, maxy = hotspot.bbox
+        assert (maxx - minx, maxy - miny) == (2.0, 2.0)
+        assert any(
+            collection_id == hotspot.collection_id
+            and minx <= x < maxx
+            and miny <= y < maxy
+            for collection_id, (x, y) in centers
+        )
+
+
+def test_zipf_queries_follow_the_hotspot_ranks(seed_index, catalog):
+    """Queries fall in the hotspot tiles, the most popular ones most often."""
+    sampler, queries = sample(
+        seed_index, catalog, n_queries=20000, distribution="zipf", hotspots=10
+    )
+
+    for query in queries[:500]:
+        x, y = query.bbox[:2]
+        assert any(
+            h.collection_id == query.collection_id
+            and h.bbox[0] <= x <= h.bbox[2]
+            and h.bbox[1] <= y <= h.bbox[3]
+            for h in sampler.hotspots
+        )
+    counts = sampler.stats.hotspots
+    assert sum(counts.values()) == 20000
+    # Rank r gets 1 / (r + 1)^1.1 of the weight
+    assert counts[0] / counts[1] == pytest.approx(2**1.1, rel=0.15)
+    assert counts[0] > counts[4] > counts[9]
+
+
+def test_gaussian_queries_cluster_around_seed_items(seed_index, catalog):
+    """Gaussian queries fall within a few sigmas of their hotspot."""
+    sampler, queries = sample(
+        seed_index, catalog, distribution="gaussian", hotspots=5, sigma=0.1
+    )
+
+    centers = [h.bbox[:2] for h in sampler.hotspots]
+    for query in queries:
+        x, y = query.bbox[:2]
+        assert min(abs(x - cx) + abs(y - cy) for cx, cy in centers) < 1.0
+
+
+def test_footprint_queries_fall_on_seed_items(seed_index, catalog):
+    """Footprint queries are inside the bbox of a seed item of their collection."""
+    _, queries = sample(seed_index, catalog, n_queries=50, distribution="footprint")
+
+    items = [
+        (seed_index.item(i)[0], seed_index.bbox(i)) for i in range(len(seed_index))
+    ]
+    for query in queries:
+        x, y = query.bbox[:2]
+        assert any(
+            c == query.collection_id and b[0] <= x <= b[2] and b[1] <= y <= b[3]
+            for c, b in items
+        )
+
+
+def test_uniform_bboxes_follow_the_catalog(seed_index, catalog):
+    """Uniform queries are drawn inside the collection bbox, bboxes up to a tile wide."""
+    _, queries = sample(seed_index, catalog, kind="bbox", tile_size=0.5)
+
+    for query in queries:
+        minx, miny, maxx, maxy = query.bbox
+        assert 10 - 0.25 <= minx <= maxx <= 20 + 0.25
+        assert 40 - 0.25 <= miny <= maxy <= 50 + 0.25
+        assert maxx - minx <= 0.5 and maxy - miny <= 0.5
+        assert query.datetime is None
+        assert query.method in {"GET", "POST"}
+    assert {q.method for q in queries} == {"GET", "POST"}
+
+
+def test_recent_datetimes_decay_from_the_end_of_the_extent(seed_index, catalog):
+    """Half of the recent intervals end within a half-life of the extent's end."""
+    sampler, queries = sample(seed_index, catalog, temporal="recent", half_life=30)
+
+    ends = [
+        datetime.fromisoformat(q.datetime.split("/")[1].replace("Z", "+00:00"))
+        for q in queries
+    ]
+    recent = sum(END - end.timestamp() <= 30 * 86400 for end in ends)
+    assert recent / len(ends) == pytest.approx(0.5, abs=0.05)
+    assert sum(sampler.stats.months.values()) == len(queries)
+    assert max(sampler.stats.months) <= "2021-01"
+
+
+def test_queries_are_reproducible(seed_index, catalog):
+    """A seed draws the same queries, another seed other ones."""
+    settings = dict(distribution="zipf", hotspots=10, temporal="uniform")
+
+    first = sample(seed_index, catalog, n_queries=300, **settings)[1]
+    again = sample(seed_index, catalog, n_queries=300, **settings)[1]
+    other = sample(seed_index, catalog, n_queries=300, seed=1, **settings)[1]
+
+    assert first == again
+    assert first != other
+
+
+def test_stats_merge_and_summary():
+    """Worker counts add up and the summary reports the busiest tiles."""
+    worker = SpatialStats()
+    worker.tiles.update({"0,0": 90, "1,0": 5})
+    worker.hotspots[0] += 3
+    worker.months["2020-01"] += 2
+    master = SpatialStats()
+    master.tiles["1,0"] += 5
+    master.merge(worker.encode())
+    master.merge(worker.encode())
+
+    summary = master.summary(SpatialSettings())
+
+    assert master.tiles == Counter({"0,0": 180, "1,0": 15})
+    assert master.hotspots == Counter({0: 6})
+    assert summary["queries"] == 195
+    assert summary["distinct_tiles"] == 2
+    assert summary["top_tiles"][0] == {"tile": "0,0", "queries": 180, "share": 0.92308}
+    assert summary["share_busiest_10pct_tiles"] == 0.92308
+    assert summary["month_queries"] == {"2020-01": 4}
+    master.reset()
+    assert master.summary(SpatialSettings())["share_busiest_1pct_tiles"] == 0
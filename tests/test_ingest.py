@@ -0,0 +1,146 @@
+"""Tests of the concurrent bulk ingest engine."""
+import pytest
+import requests
+
+from stac_api_load_testing.data_loader.ingest import BulkIngester, IngestReport
+
+
+class Response:
+    """The status and body of a fake response."""
+
+    def __init__(self, status_code: int, text: str = ""):
+        """Build a response."""
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSession:
+    """Answer bulk and item POSTs with canned responses, recording the posted ids."""
+
+    def __init__(self, bulk=None, item=None):
+        """Answer bulk POSTs with `bulk(ids)` and item POSTs with `item(id)`."""
+        self.bulk = bulk
+        self.item = item or (lambda item_id: Response(201))
+        self.posted = []
+
+    def post(self, url, json):
+        """Dispatch a POST to the bulk or item handler."""
+        if url.endswith("/bulk_items"):
+            ids = list(json["items"])
+            self.posted.append(("bulk", url, ids))
+            return self.bulk(ids)
+        self.posted.append(("item", url, json["id"]))
+        return self.item(json["id"])
+
+
+def make_items(n_items, collections=("c",)):
+    """Return items spread round-robin over the collections."""
+    return [
+        {"id": str(i), "collection": collections[i % len(collections)]}
+        for i in range(n_items)
+    ]
+
+
+def run(session, items, **kwargs):
+    """Ingest items from a single worker thread in batches of 4."""
+    options = dict(concurrency=1, batch_size=4)
+    options.update(kwargs)
+    return BulkIngester("http://api", session, **options).run(items)
+
+
+def test_bulk_response_counts_created_and_existing_items():
+    """The number of added items in a bulk response tells created from existing."""
+    session = FakeSession(
+        bulk=lambda ids: Response(200, '"Successfully added 3 Items."')
+    )
+
+    report = run(session, make_items(4))
+
+    assert [kind for kind, _, _ in session.posted] == ["bulk"]
+    assert (report.created, report.existing, report.accepted) == (3, 1, 0)
+
+
+def test_bulk_response_without_a_count_is_accepted():
+    """Items of a bulk response that does not say how many were added are accepted."""
+    session = FakeSession(bulk=lambda ids: Response(201, "{}"))
+
+    report = run(session, make_items(6))
+
+    assert (report.created, report.accepted, report.total) == (0, 6, 6)
+
+
+def test_batches_are_grouped_per_collection():
+    """A bulk request only holds items of its collection."""
+    session = FakeSession(bulk=lambda ids: Response(200, ""))
+
+    run(session, make_items(10, collections=("a", "b")))
+
+    posted = {}
+    for _, url, ids in session.posted:
+        assert 0 < len(ids) <= 4
+        for item_id in ids:
+            posted[item_id] = url.split("/")[-2]
+    assert posted == {str(i): "ab"[i % 2] for i in range(10)}
+
+
+@pytest.mark.parametrize("status_code", [404, 405, 501])
+def test_falls_back_to_item_posts_without_bulk_support(status_code):
+    """Without a bulk endpoint, the first batch and all later ones are posted per item."""
+    session = FakeSession(bulk=lambda ids: Response(status_code))
+
+    report = run(session, make_items(9))
+
+    assert [kind for kind, _, _ in session.posted] == ["bulk"] + ["item"] * 9
+    assert report.created == 9
+
+
+def test_bulk_conflict_posts_each_item():
+    """A batch rejected because some item exists is posted again one item at a time."""
+    session = FakeSession(
+        bulk=lambda ids: Response(409),
+        item=lambda item_id: Response(409 if item_id == "1" else 201),
+    )
+
+    report = run(session, make_items(4))
+
+    assert [kind for kind, _, _ in session.posted] == ["bulk"] + ["item"] * 4
+    assert (report.created, report.existing, report.failed) == (3, 1, 0)
+
+
+def test_failed_and_unreachable_batches_are_counted_as_failed():
+    """Error responses and connection errors fail the whole batch."""
+
+    def bulk(ids):
+        if "0" in ids:
+            raise requests.ConnectionError("refused")
+        return Response(500, "boom")
+
+    report = run(FakeSession(bulk=bulk), make_items(8))
+
+    assert (report.created, report.failed, report.total) == (0, 8, 8)
+
+
+def test_unexpected_errors_fail_the_batch_without_stopping_the_run():
+    """A batch raising anything else is counted as failed and the run goes on."""
+
+    def bulk(ids):
+        if "4" in ids:
+            raise RuntimeError("bad item")
+        return Response(200, '"Successfully added 4 Items."')
+
+    report = run(FakeSession(bulk=bulk), make_items(12))
+
+    assert (report.created, report.failed) == (8, 4)
+
+
+def test_report_percentiles():
+    """Latency percentiles come from the histogram, in seconds."""
+    report = IngestReport()
+    assert report.percentile(50) == 0.0
+
+    for ms in range(1, 101):
+        report.record(ms / 1000, created=1)
+
+    assert report.created == report.total == 100
+    assert report.percentile(50) == pytest.approx(0.050, rel=1e-3)
+    assert report.percentile(99) == pytest.approx(0.099, rel=1e-3)
@@ -0,0 +1,107 @@
+"""Tests of the streaming item file readers."""
+import gzip
+import itertools
+import json
+
+import pytest
+
+from stac_api_load_testing.data_loader.item_files import (
+    check_item_file,
+    import_optional,
+    item_reader,
+    read_feature_collection,
+    read_geoparquet,
+    read_items,
+    read_ndjson,
+    split_compression,
+)
+
+ITEMS = [{"id": f"item-{i}", "collection": "c1"} for i in range(5)]
+
+
+def ndjson(items):
+    """Return items as newline-delimited JSON, with a blank line."""
+    return "\n".join(json.dumps(item) for item in items) + "\n\n"
+
+
+@pytest.mark.parametrize(
+    "path, reader",
+    [
+        ("items.ndjson", read_ndjson),
+        ("items.JSONL.gz", read_ndjson),
+        ("items.geojsonl.zst", read_ndjson),
+        ("items.json", read_feature_collection),
+        ("items.geojson.gz", read_feature_collection),
+        ("items.parquet", read_geoparquet),
+        ("items.geoparquet", read_geoparquet),
+    ],
+)
+def test_item_reader(path, reader):
+    """Readers are picked from the extension, under the compression suffix."""
+    assert item_reader(path) is reader
+
+
+@pytest.mark.parametrize("path", ["items.csv", "items.parquet.gz", "items.gz"])
+def test_unsupported_files(path):
+    """Other formats, and compressed parquet files, are rejected."""
+    with pytest.raises(ValueError):
+        item_reader(path)
+
+
+def test_split_compression():
+    """Only known compression suffixes are split off."""
+    assert split_compression("a/items.ndjson.GZ") == ("a/items.ndjson", ".gz")
+    assert split_compression("items.ndjson.bz2") == ("items.ndjson.bz2", "")
+
+
+def test_read_ndjson(tmp_path):
+    """Plain and gzip-compressed NDJSON files give the items in order."""
+    plain = tmp_path / "items.ndjson"
+    plain.write_text(ndjson(ITEMS))
+    compressed = str(tmp_path / "items.jsonl.gz")
+    with gzip.open(compressed, "wt") as file:
+        file.write(ndjson(ITEMS))
+
+    assert list(read_items(str(plain))) == ITEMS
+    assert list(read_items(compressed)) == ITEMS
+
+
+def test_read_ndjson_streams(tmp_path):
+    """Items are parsed one line at a time, so the first ones come before a bad line."""
+    path = tmp_path / "items.ndjson"
+    path.write_text(ndjson(ITEMS[:2]) + "{not json\n")
+
+    assert list(itertools.islice(read_items(str(path)), 2)) == ITEMS[:2]
+    with pytest.raises(ValueError):
+        list(read_items(str(path)))
+
+
+def test_read_zstd(tmp_path):
+    """Zstandard-compressed files are decompressed on the fly."""
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "items.ndjson.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(ndjson(ITEMS).encode()))
+
+    check_item_file(str(path))
+    assert list(read_items(str(path))) == ITEMS
+
+
+def test_read_feature_collection(tmp_path):
+    """The features of a FeatureCollection are the items."""
+    path = tmp_path / "items.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": ITEMS}))
+
+    assert list(read_items(str(path))) == ITEMS
+
+
+def test_missing_optional_dependency_names_the_extra():
+    """A missing optional dependency is reported with the command installing it."""
+    with pytest.raises(ImportError, match=r"pip install stac-api-load-testing\[zstd\]"):
+        import_optional("not_a_module.sub", "zstd", "Reading .zst files")
+
+
+def test_check_item_file(tmp_path):
+    """Files are checked from their name, without being read."""
+    check_item_file(str(tmp_path / "missing.ndjson.gz"))
+    with pytest.raises(ValueError):
+        check_item_file("items.txt")
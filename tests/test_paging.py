@@ -0,0 +1,134 @@
+"""Tests of deep pagination through next links."""
+import json
+
+import pytest
+
+from stac_api_load_testing.workload.paging import (
+    PagingSettings,
+    next_link,
+    page_name,
+    walk_pages,
+)
+
+
+class Response:
+    """A fake Locust response with a JSON body."""
+
+    def __init__(self, page, ok=True):
+        """Encode the page."""
+        self.content = json.dumps(page).encode()
+        self.ok = ok
+
+
+class FakeClient:
+    """Serve pages of 10 items, linking each to the next until `n_pages`."""
+
+    def __init__(self, n_pages, method="GET", merge=False, fail_at=None):
+        """Link pages with links of `method`, failing the page `fail_at`."""
+        self.n_pages = n_pages
+        self.method = method
+        self.merge = merge
+        self.fail_at = fail_at
+        self.requests = []
+
+    def _page(self, method, url, name, data=None):
+        """Record a request and return the page at its depth."""
+        body = json.loads(data) if data is not None else None
+        self.requests.append((method, url, name, body))
+        depth = len(self.requests)
+        page = {"features": [{}] * 10, "links": [{"rel": "self", "href": url}]}
+        if depth < self.n_pages:
+            link = {"rel": "next", "href": f"http://api/search?token={depth}"}
+            if self.method == "POST":
+                link.update(method="POST", body={"token": depth}, merge=self.merge)
+            page["links"].append(link)
+        return Response(page, ok=depth != self.fail_at)
+
+    def get(self, url, name):
+        """GET a page."""
+        return self._page("GET", url, name)
+
+    def post(self, url, data, headers, name):
+        """POST a search."""
+        return self._page("POST", url, name, data)
+
+
+def test_page_name_and_next_link():
+    """Pages are named by depth and only `next` links are followed."""
+    assert page_name("get-search-paged", 3) == "get-search-paged-page-3"
+    assert next_link({"links": [{"rel": "prev", "href": "a"}]}) is None
+    assert next_link({}) is None
+    assert next_link({"links": [{"rel": "next", "href": "b"}]}) == {
+        "rel": "next",
+        "href": "b",
+    }
+
+
+def test_from_env(monkeypatch):
+    """The limits are read from the variables set by the CLI."""
+    monkeypatch.setenv("STAC_PAGE_LIMIT", "50")
+    monkeypatch.setenv("STAC_MAX_PAGES", "3")
+    monkeypatch.delenv("STAC_MAX_PAGED_ITEMS", raising=False)
+
+    assert PagingSettings.from_env() == PagingSettings(50, 3, 1000)
+
+
+def test_follows_get_links_to_the_last_page():
+    """GET searches follow token links until there is no next page."""
+    client = FakeClient(n_pages=4)
+
+    n_items = walk_pages(
+        client, "GET", "http://api/search", "paged", PagingSettings(10, 10, 1000)
+    )
+
+    assert n_items == 40
+    assert [(url, name) for _, url, name, _ in client.requests] == [
+        ("http://api/search", "paged-page-1"),
+        ("http://api/search?token=1", "paged-page-2"),
+        ("http://api/search?token=2", "paged-page-3"),
+        ("http://api/search?token=3", "paged-page-4"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "settings, n_requests",
+    [(PagingSettings(10, 2, 1000), 2), (PagingSettings(10, 10, 25), 3)],
+)
+def test_stops_at_the_page_and_item_limits(settings, n_requests):
+    """Paging stops at the deepest page or once enough items were returned."""
+    client = FakeClient(n_pages=100)
+
+    n_items = walk_pages(client, "GET", "http://api/search", "paged", settings)
+
+    assert len(client.requests) == n_requests
+    assert n_items == 10 * n_requests
+
+
+def test_stops_at_a_failed_page():
+    """A failed page ends the walk with the items returned before it."""
+    client = FakeClient(n_pages=100, fail_at=2)
+
+    n_items = walk_pages(
+        client, "GET", "http://api/search", "paged", PagingSettings(10, 10, 1000)
+    )
+
+    assert (len(client.requests), n_items) == (2, 10)
+
+
+@pytest.mark.parametrize(
+    "merge, second_body",
+    [(True, {"limit": 10, "bbox": [0, 0, 1, 1], "token": 1}), (False, {"token": 1})],
+)
+def test_post_links_send_their_body(merge, second_body):
+    """POST links send their body, merged into the previous one with `merge`."""
+    client = FakeClient(n_pages=2, method="POST", merge=merge)
+    body = {"limit": 10, "bbox": [0, 0, 1, 1]}
+
+    walk_pages(
+        client, "POST", "http://api/search", "paged", PagingSettings(10, 10, 1000), body
+    )
+
+    assert [(method, body) for method, _, _, body in client.requests] == [
+        ("POST", {"limit": 10, "bbox": [0, 0, 1, 1]}),
+        ("POST", second_body),
+    ]
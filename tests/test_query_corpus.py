@@ -0,0 +1,115 @@
+"""Tests of the binary query corpus."""
+import math
+import random
+
+import pytest
+
+from stac_api_load_testing.data_loader.data_loader import load_sample_items
+from stac_api_load_testing.workload.query_corpus import (
+    KINDS,
+    MAX_LIMIT,
+    METHODS,
+    SORT_FIELDS,
+    QueryCorpus,
+    build_corpus,
+    format_datetime,
+    random_record,
+)
+from stac_api_load_testing.workload.seed_index import SeedIndex
+
+N_QUERIES = 50
+
+
+@pytest.fixture(scope="module")
+def seed_index():
+    """Return the index of a generated corpus spread across three collections."""
+    return SeedIndex(load_sample_items(), n_generated=500, n_collections=3, seed=1)
+
+
+@pytest.fixture
+def corpus_path(tmp_path, seed_index):
+    """Write a corpus and return its path."""
+    path = str(tmp_path / "queries.bin")
+    build_corpus(path, seed_index, n_queries=N_QUERIES, seed=4, limit=25)
+    return path
+
+
+def test_records_round_trip(corpus_path, seed_index):
+    """Every query decodes to the fields drawn when the corpus was built."""
+    rng = random.Random(4)
+    collection_indexes = {
+        collection_id: position
+        for position, collection_id in enumerate(seed_index.collection_ids)
+    }
+    corpus = QueryCorpus(corpus_path)
+
+    assert len(corpus) == N_QUERIES * len(KINDS)
+    for kind in KINDS:
+        for index in range(N_QUERIES):
+            fields = random_record(kind, rng, seed_index, 25, collection_indexes)
+            (
+                method,
+                collection,
+                minx,
+                miny,
+                maxx,
+                maxy,
+                start,
+                end,
+                sortby,
+                limit,
+            ) = fields
+            query = corpus.query(kind, index)
+
+            assert query.method == METHODS[method]
+            assert query.collection_id == seed_index.collection_ids[collection]
+            assert query.bbox == [minx, miny, maxx, maxy]
+            if math.isnan(start):
+                assert query.datetime is None
+            else:
+                assert query.datetime == (
+                    f"{format_datetime(start)}/{format_datetime(end)}"
+                )
+            assert query.sortby == [
+                (field, not sortby >> position & 1)
+                for position, field in enumerate(SORT_FIELDS)
+            ]
+            assert query.limit == limit == 25
+
+
+def test_same_seed_writes_the_same_file(tmp_path, corpus_path, seed_index):
+    """A corpus is reproducible from its seed."""
+    other = str(tmp_path / "other.bin")
+    build_corpus(other, seed_index, n_queries=N_QUERIES, seed=4, limit=25)
+
+    with open(corpus_path, "rb") as first, open(other, "rb") as second:
+        assert first.read() == second.read()
+
+
+def test_shards_walk_disjoint_sequences(corpus_path):
+    """Workers read every `stride`-th query from their offset, wrapping around."""
+    full = QueryCorpus(corpus_path)
+    shards = [QueryCorpus(corpus_path, offset=offset, stride=2) for offset in (0, 1)]
+
+    for position in range(N_QUERIES):
+        for offset, shard in enumerate(shards):
+            assert shard.next("bbox") == full.query("bbox", offset + position * 2)
+    assert full.query("intersects", N_QUERIES + 3) == full.query("intersects", 3)
+    assert shards[0].next("intersects") == full.query("intersects", 0)
+
+
+def test_largest_limit_round_trips(tmp_path, seed_index):
+    """The page size field holds limits up to `MAX_LIMIT`."""
+    path = str(tmp_path / "queries.bin")
+    build_corpus(path, seed_index, n_queries=2, limit=MAX_LIMIT)
+
+    assert QueryCorpus(path).query("bbox", 1).limit == MAX_LIMIT
+
+
+def test_rejects_other_files(tmp_path):
+    """Files without the corpus magic are rejected."""
+    path = tmp_path / "not-a-corpus.bin"
+    path.write_bytes(b"{}" * 16)
+
+    with pytest.raises(ValueError):
+        QueryCorpus(str(path))
@@ -0,0 +1,140 @@
+"""Tests of the repeated-query mix and the warm-up."""
+import itertools
+import random
+
+import pytest
+
+from stac_api_load_testing.workload.query_corpus import Query
+from stac_api_load_testing.workload.repeats import (
+    MAX_DRAWS,
+    QueryHistory,
+    QueryMix,
+    RepeatSettings,
+    Warmup,
+    query_key,
+)
+
+
+def make_query(i, limit=None):
+    """Return a distinct query per number."""
+    return Query(
+        "POST",
+        "c1",
+        [i, 0.0, i + 1, 1.0],
+        None,
+        [("properties.datetime", False)],
+        limit,
+    )
+
+
+def fresh_draws():
+    """Return a draw function giving a new query each call."""
+    counter = itertools.count()
+    return lambda: make_query(next(counter))
+
+
+def test_query_key_identifies_the_request():
+    """Queries sending the same request share a fingerprint, per kind."""
+    query = make_query(1)
+    copy = query._replace(
+        bbox=list(query.bbox), sortby=[["properties.datetime", False]]
+    )
+
+    assert query_key("bbox", query) == query_key("bbox", copy)
+    assert query_key("bbox", query) != query_key("intersects", query)
+    assert query_key("bbox", query) != query_key("bbox", make_query(1, limit=10))
+
+
+def test_history_keeps_the_most_recent_queries():
+    """The pool of a kind is a ring of recent queries, fingerprints are all kept."""
+    history = QueryHistory(pool_size=3)
+    rng = random.Random(0)
+    assert history.sample("bbox", rng) is None
+
+    for i in range(5):
+        history.add("bbox", make_query(i))
+
+    assert {history.sample("bbox", rng).bbox[0] for _ in range(100)} == {2, 3, 4}
+    assert history.seen("bbox", make_query(0))
+    assert not history.seen("intersects", make_query(0))
+    assert history.sample("intersects", rng) is None
+
+
+@pytest.mark.parametrize("ratio", [0.0, 0.3, 0.8, 1.0])
+def test_repeat_ratio(ratio):
+    """Searches repeat an issued query at the ratio, the others are never issued before."""
+    history = QueryHistory()
+    mix = QueryMix(history, ratio, random.Random(1))
+    draw = fresh_draws()
+    issued = set()
+    repeats = 0
+
+    for _ in range(5000):
+        query = mix.next("bbox", draw)
+        key = query_key("bbox", query)
+        assert mix.repeated == (key in issued)
+        repeats += mix.repeated
+        issued.add(key)
+
+    assert repeats / 5000 == pytest.approx(ratio, abs=0.02)
+
+
+def test_repeats_wait_for_a_first_query():
+    """A search cannot repeat before any query of its kind was issued."""
+    mix = QueryMix(QueryHistory(), 1.0, random.Random(2))
+
+    mix.next("bbox", fresh_draws())
+    assert not mix.repeated
+    mix.next("bbox", fresh_draws())
+    assert mix.repeated
+    mix.next("intersects", fresh_draws())
+    assert not mix.repeated
+
+
+def test_fresh_searches_redraw_colliding_queries():
+    """Issued queries are drawn again, up to a point, to send a unique one."""
+    history = QueryHistory()
+    mix = QueryMix(history, 0.0, random.Random(3))
+    for i in range(3):
+        history.add("bbox", make_query(i))
+    draws = iter([make_query(0), make_query(1), make_query(7)])
+
+    assert mix.next("bbox", lambda: next(draws)) == make_query(7)
+    assert not mix.repeated
+    assert mix.name("post-search-bbox") == "post-search-bbox-unique"
+
+    calls = []
+    query = mix.next("bbox", lambda: calls.append(1) or make_query(0))
+
+    assert query == make_query(0)
+    assert len(calls) == MAX_DRAWS
+    assert mix.repeated
+    assert mix.name("post-search-bbox") == "post-search-bbox-repeat"
+
+
+def test_from_env(monkeypatch):
+    """Repeats are only tracked when a ratio is set, even 0."""
+    monkeypatch.delenv("STAC_REPEAT_RATIO", raising=False)
+    assert not RepeatSettings.from_env().enabled
+
+    monkeypatch.setenv("STAC_REPEAT_RATIO", "0")
+    monkeypatch.setenv("STAC_WARMUP", "30")
+    settings = RepeatSettings.from_env()
+    assert settings.enabled
+    assert (settings.ratio, settings.pool_size, settings.warmup) == (0, 1000, 30)
+
+
+def test_warmup_resets_the_stats():
+    """The stats of the warm-up are dropped once it is over."""
+    from locust.env import Environment
+
+    environment = Environment()
+    environment.create_local_runner()
+    resets = []
+    environment.events.reset_stats.add_listener(lambda: resets.append(1))
+    environment.stats.log_request("GET", "get-item", 10, 100)
+
+    Warmup(0).run(environment)
+
+    assert environment.stats.total.num_requests == 0
+    assert resets == [1]
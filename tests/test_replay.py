@@ -0,0 +1,156 @@
+"""Tests of access-log replay."""
+import gzip
+import json
+
+import pytest
+
+from stac_api_load_testing.workload.replay import (
+    ReplayRequest,
+    ReplaySettings,
+    ReplaySource,
+    endpoint_name,
+    parse_line,
+    parse_timestamp,
+    read_requests,
+)
+
+CLF_LINE = (
+    '10.0.0.1 - - [10/Oct/2023:13:55:36 +0000] "GET /search?bbox=0,0,1,1 HTTP/1.1"'
+    ' 200 2326 "-" "curl/8.0"'
+)
+
+
+def write_log(path, n_lines, start=1_700_000_000, step=2):
+    """Write a JSON lines log of GET requests `step` seconds apart."""
+    with open(path, "w") as log:
+        for i in range(n_lines):
+            log.write(
+                json.dumps(
+                    {"method": "GET", "path": f"/r/{i}", "timestamp": start + i * step}
+                )
+                + "\n"
+            )
+
+
+def test_parse_timestamp():
+    """Epoch seconds, ISO 8601 and common log format times are understood."""
+    expected = 1696946136.0
+    assert parse_timestamp(expected) == expected
+    assert parse_timestamp("2023-10-10T13:55:36Z") == expected
+    assert parse_timestamp("10/Oct/2023:15:55:36 +0200") == expected
+
+
+def test_parse_common_log_format():
+    """Common and combined log format lines are replayed without a body."""
+    assert parse_line(CLF_LINE) == ReplayRequest(
+        "GET", "/search?bbox=0,0,1,1", None, 1696946136.0
+    )
+
+
+def test_parse_json_lines():
+    """JSON lines carry the POST body and absolute URLs lose their host."""
+    line = json.dumps(
+        {
+            "method": "post",
+            "url": "https://prod.example.com/search?x=1",
+            "body": {"limit": 5},
+            "timestamp": "2023-10-10T13:55:36Z",
+        }
+    )
+
+    assert parse_line(line) == ReplayRequest(
+        "POST", "/search?x=1", {"limit": 5}, 1696946136.0
+    )
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "",
+        "not a log line",
+        '{"method": "GET"}',
+        '{"method": "GET", "path": "/", "timestamp": "yesterday"}',
+        CLF_LINE.replace("GET", "DELETE"),
+    ],
+)
+def test_unreplayable_lines_are_skipped(line):
+    """Blank, malformed and non GET/POST lines are not replayed."""
+    assert parse_line(line) is None
+
+
+@pytest.mark.parametrize(
+    "method, path, name",
+    [
+        ("GET", "/", "replay-get-landing"),
+        ("GET", "/collections", "replay-get-collections"),
+        ("GET", "/collections/c1", "replay-get-collection"),
+        ("GET", "/collections/c1/items?limit=10", "replay-get-items"),
+        ("GET", "/collections/c1/items/i1", "replay-get-item"),
+        ("POST", "/search", "replay-post-search"),
+        ("GET", "/queryables", "replay-get-other"),
+    ],
+)
+def test_endpoint_name_groups_ids(method, path, name):
+    """Requests are named per endpoint, whatever the ids in their path."""
+    assert endpoint_name(method, path) == name
+
+
+def test_shards_split_the_log_evenly(tmp_path):
+    """Every line belongs to exactly one shard, interleaved over time."""
+    path = str(tmp_path / "access.log")
+    write_log(path, 10)
+
+    shards = [
+        [request.path for request in read_requests(path, index, 3)]
+        for index in range(3)
+    ]
+
+    assert shards[1] == ["/r/1", "/r/4", "/r/7"]
+    assert sorted(sum(shards, []), key=lambda p: int(p[3:])) == [
+        f"/r/{i}" for i in range(10)
+    ]
+    assert len(list(read_requests(path, 0, 0))) == 10
+
+
+def test_reads_gzip_logs(tmp_path):
+    """Compressed logs are decompressed while streaming."""
+    path = str(tmp_path / "access.log.gz")
+    with gzip.open(path, "wt") as log:
+        log.write(CLF_LINE + "\n")
+
+    assert [r.path for r in read_requests(path)] == ["/search?bbox=0,0,1,1"]
+
+
+def test_timed_source_keeps_the_logged_pace(tmp_path):
+    """Requests are due at their logged offsets divided by the speed, then the log restarts."""
+    path = str(tmp_path / "access.log")
+    write_log(path, 3, step=2)
+    source = ReplaySource(ReplaySettings(path, "timed", speed=4), 0)
+
+    replayed = [source.next() for _ in range(4)]
+
+    first_due = replayed[0][1]
+    assert [request.path for request, _ in replayed] == ["/r/0", "/r/1", "/r/2", "/r/0"]
+    assert [due - first_due for _, due in replayed[:3]] == pytest.approx([0, 0.5, 1])
+    # The restarted log is due from the restart
+    assert first_due < replayed[3][1] < first_due + 1
+
+
+def test_source_rejects_logs_without_replayable_requests(tmp_path):
+    """An empty shard is an error instead of a busy loop."""
+    path = tmp_path / "access.log"
+    path.write_text("garbage\n")
+
+    with pytest.raises(ValueError):
+        ReplaySource(ReplaySettings(str(path)), 0).next()
+
+
+def test_from_env(monkeypatch):
+    """The settings are read from the variables set by the CLI."""
+    monkeypatch.setenv("STAC_REPLAY_LOG", "access.log")
+    monkeypatch.setenv("STAC_REPLAY_MODE", "max-speed")
+    monkeypatch.setenv("STAC_REPLAY_SHARDS", "4")
+    monkeypatch.delenv("STAC_REPLAY_SPEED", raising=False)
+
+    assert ReplaySettings.from_env() == ReplaySettings("access.log", "max-speed", 1, 4)
+    assert not ReplaySettings().enabled
@@ -0,0 +1,127 @@
+"""Tests of run results and SLO checks."""
+import csv
+import json
+
+import pytest
+
+from stac_api_load_testing.workload.histograms import get_histogram_recorder
+from stac_api_load_testing.workload.results import (
+    Slo,
+    check_slos,
+    parse_slo,
+    parse_slos,
+    report_results,
+    write_results,
+)
+
+ROWS = [
+    {"method": "POST", "name": "post-search-bbox", "num_requests": 10, "p95": 250.0},
+    {"method": "GET", "name": "get-item", "num_requests": 0, "p95": 0.0},
+    {"method": "", "name": "Aggregated", "num_requests": 10, "p95": 250.0},
+]
+
+
+def test_parse_slo():
+    """SLOs name an endpoint, a result key, a comparison and a threshold."""
+    assert parse_slo(" post-search-bbox:p95<300 ") == Slo(
+        "post-search-bbox", "p95", "<", 300.0
+    )
+    assert parse_slo("Aggregated:p99.9 < 1.5") == Slo("Aggregated", "p99.9", "<", 1.5)
+    assert parse_slo("get:item:rps>20") == Slo("get:item", "rps", ">", 20.0)
+    assert str(parse_slo("Aggregated:failure_rate<0.01")) == (
+        "Aggregated:failure_rate<0.01"
+    )
+
+
+@pytest.mark.parametrize(
+    "text", ["p95<300", "search:p95<", "search:p95<=300", "search:p95<-1", ":p95<3"]
+)
+def test_parse_slo_rejects_malformed_slos(text):
+    """SLOs that do not follow NAME:METRIC<THRESHOLD are rejected."""
+    with pytest.raises(ValueError):
+        parse_slo(text)
+
+
+def test_parse_slos_skips_empty_entries():
+    """A `;`-separated list may be empty or end with a separator."""
+    assert parse_slos("") == []
+    assert [slo.name for slo in parse_slos("a:p50<1; b:rps>2;")] == ["a", "b"]
+
+
+def test_check_slos():
+    """Breaches are reported for missed thresholds, idle endpoints and unknown metrics."""
+    breaches = check_slos(
+        ROWS,
+        parse_slos(
+            "post-search-bbox:p95<300;"
+            "Aggregated:p95<200;"
+            "get-item:p95<300;"
+            "missing:p95<300;"
+            "Aggregated:p42<300"
+        ),
+    )
+
+    assert breaches == [
+        "Aggregated:p95<200: measured 250",
+        "get-item:p95<300: no requests recorded for 'get-item'",
+        "missing:p95<300: no requests recorded for 'missing'",
+        "Aggregated:p42<300: unknown metric 'p42'",
+    ]
+
+
+def test_write_results(tmp_path):
+    """Results are written as JSON and CSV with the same rows."""
+    prefix = str(tmp_path / "results")
+
+    write_results(ROWS, prefix)
+
+    with open(f"{prefix}.json") as file:
+        assert json.load(file) == {"endpoints": ROWS}
+    with open(f"{prefix}.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["name"] for row in rows] == [row["name"] for row in ROWS]
+    assert rows[0]["p95"] == "250.0"
+
+
+@pytest.fixture
+def environment(monkeypatch):
+    """Return a local Locust environment with a 250 ms request, writing no files."""
+    from locust.env import Environment
+
+    get_histogram_recorder.cache_clear()
+    monkeypatch.delenv("STAC_RESULTS_PREFIX", raising=False)
+    monkeypatch.delenv("STAC_SLO", raising=False)
+    environment = Environment()
+    environment.stats.log_request("POST", "post-search-bbox", 250, 100)
+    get_histogram_recorder().record("POST", "post-search-bbox", 250)
+    yield environment
+    get_histogram_recorder.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "slo, exit_code",
+    [("", None), ("post-search-bbox:p95<300", None), ("post-search-bbox:p95<200", 1)],
+)
+def test_breached_slos_set_the_exit_code(environment, monkeypatch, slo, exit_code):
+    """Locust exits with code 1 only if an SLO is breached."""
+    monkeypatch.setenv("STAC_SLO", slo)
+
+    report_results(environment)
+
+    assert environment.process_exit_code == exit_code
+
+
+def test_results_and_histograms_are_written_on_quit(environment, monkeypatch, tmp_path):
+    """The results include the histogram percentiles, exported alongside."""
+    prefix = str(tmp_path / "run")
+    monkeypatch.setenv("STAC_RESULTS_PREFIX", prefix)
+
+    report_results(environment)
+
+    with open(f"{prefix}.json") as file:
+        rows = json.load(file)["endpoints"]
+    assert [row["name"] for row in rows] == ["post-search-bbox", "Aggregated"]
+    assert rows[0]["num_requests"] == 1
+    assert rows[0]["hdr_p50"] == pytest.approx(250, rel=1e-3)
+    with open(f"{prefix}_histograms.json") as file:
+        assert len(json.load(file)["endpoints"]) == 2
@@ -0,0 +1,218 @@
+"""Tests of declarative scenario compilation."""
+import json
+import os
+import random
+from urllib.parse import unquote
+
+import pytest
+
+from stac_api_load_testing.workload.catalog import CollectionCatalog
+from stac_api_load_testing.workload.scenario import (
+    compile_parameter,
+    compile_scenario,
+    compile_template,
+    load_scenario,
+    parse_timestamp,
+    query_string_value,
+)
+
+EXAMPLE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "stac_api_load_testing",
+    "config_files",
+    "scenario_example.yml",
+)
+BBOX = [10.0, 40.0, 20.0, 50.0]
+
+
+@pytest.fixture
+def catalog():
+    """Return a catalog of one collection, without fetching it."""
+    catalog = CollectionCatalog()
+    catalog.bboxes = {"c1": BBOX}
+    catalog.collection_ids = ["c1"]
+    return catalog
+
+
+def draw(spec, catalog, values=None, name="p"):
+    """Compile a parameter and draw a value."""
+    return compile_parameter(name, spec)(catalog, values or {})
+
+
+def test_single_placeholders_keep_their_value():
+    """A placeholder alone is replaced by the value, other strings are formatted."""
+    build = compile_template(
+        {
+            "bbox": "{bbox}",
+            "collections": ["{collection}"],
+            "id": "{item[id]}",
+            "label": "limit={limit}",
+        }
+    )
+
+    assert build(
+        {"bbox": [1, 2, 3, 4], "collection": "c1", "item": {"id": "i1"}, "limit": 5}
+    ) == {
+        "bbox": [1, 2, 3, 4],
+        "collections": ["c1"],
+        "id": "i1",
+        "label": "limit=5",
+    }
+
+
+def test_unset_parameters_drop_their_fields():
+    """Fields filled by a parameter that is not set are left out."""
+    build = compile_template({"datetime": "{datetime}", "q": "d={datetime}", "n": 1})
+
+    assert build({"datetime": None}) == {"n": 1}
+
+
+def test_constant_parts_are_shared():
+    """Constant sub-documents are returned as is instead of being copied."""
+    sortby = [{"field": "properties.datetime", "direction": "desc"}]
+    template = {"sortby": sortby, "limit": "{limit}"}
+
+    assert compile_template(template)({"limit": 1})["sortby"] is sortby
+    assert compile_template(sortby)({}) is sortby
+
+
+def test_parameter_types(catalog):
+    """Each parameter type draws values within its options."""
+    random.seed(0)
+    for _ in range(50):
+        minx, miny, maxx, maxy = draw(
+            {"type": "bbox", "collection": "c", "max_size": 2}, catalog, {"c": "c1"}
+        )
+        assert BBOX[0] <= minx <= maxx <= BBOX[2] and maxx - minx <= 2
+        assert BBOX[1] <= miny <= maxy <= BBOX[3] and maxy - miny <= 2
+
+        x, y = draw({"type": "point", "collection": "c"}, catalog, {"c": "c1"})[
+            "coordinates"
+        ]
+        assert BBOX[0] <= x <= BBOX[2] and BBOX[1] <= y <= BBOX[3]
+
+        assert 1 <= draw({"type": "int", "min": 1, "max": 3}, catalog) <= 3
+        assert draw({"type": "choice", "values": ["a"]}, catalog) == "a"
+        assert draw({"type": "collection"}, catalog) == "c1"
+
+    start, end = draw(
+        {
+            "type": "datetime",
+            "start": "2020-01-01",
+            "end": "2020-02-01",
+            "min_days": 2,
+            "max_days": 3,
+        },
+        catalog,
+    ).split("/")
+    span = parse_timestamp(end) - parse_timestamp(start)
+    assert parse_timestamp("2020-01-01") <= parse_timestamp(start)
+    assert 2 * 86400 - 1 <= span <= 3 * 86400 + 1
+
+
+def test_cql2_parameter(catalog):
+    """CQL2 parameters compare a property to a value, as JSON or text."""
+    spec = {"type": "cql2", "property": "eo:cloud_cover", "op": "<", "min": 5, "max": 5}
+
+    assert draw(spec, catalog) == {
+        "op": "<",
+        "args": [{"property": "eo:cloud_cover"}, 5.0],
+    }
+    assert draw(dict(spec, lang="cql2-text"), catalog) == "eo:cloud_cover < 5.0"
+
+
+def test_probability(catalog):
+    """Parameters with a probability are sometimes not set."""
+    random.seed(1)
+    drawn = [
+        draw({"type": "int", "min": 1, "max": 1, "probability": 0.5}, catalog)
+        for _ in range(200)
+    ]
+
+    assert set(drawn) == {1, None}
+    assert 60 < drawn.count(None) < 140
+    assert draw(7, catalog) == 7
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"type": "polygon"},
+        {"type": "int", "min": 1},
+        {"type": "choice", "values": [1, 2], "weights": [1]},
+        {"type": "cql2", "property": "x", "op": "like", "min": 0, "max": 1},
+        {"type": "datetime", "start": "2021-01-01", "end": "2020-01-01"},
+    ],
+)
+def test_invalid_parameters(spec):
+    """Malformed parameters are rejected when the scenario is compiled."""
+    with pytest.raises(ValueError):
+        compile_parameter("p", spec)
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        {},
+        {"requests": []},
+        {"requests": [{"path": "/"}]},
+        {"requests": [{"name": "x", "path": "/", "method": "PATCH"}]},
+    ],
+)
+def test_invalid_scenarios(document):
+    """Scenarios without valid requests are rejected."""
+    with pytest.raises(ValueError):
+        compile_scenario(document)
+
+
+def test_query_string_value():
+    """Lists are comma-separated and dicts JSON-encoded in query strings."""
+    assert query_string_value([1, 2.5]) == "1,2.5"
+    assert query_string_value({"op": "="}) == '{"op":"="}'
+    assert query_string_value(3) == 3
+
+
+def test_build_request(catalog):
+    """Requests quote their path values and encode their query and body."""
+    scenario = compile_scenario(
+        {
+            "think_time": {"min": 1, "max": 2},
+            "params": {"collection": {"type": "collection"}},
+            "requests": [
+                {
+                    "name": "search",
+                    "method": "post",
+                    "path": "/collections/{collection}/{name}",
+                    "params": {"name": "a/b c"},
+                    "query": {"ids": ["{name}", "x"]},
+                    "body": {"collections": ["{collection}"], "limit": 10},
+                    "weight": 3,
+                    "tags": ["filter"],
+                }
+            ],
+        }
+    )
+    template = scenario.requests[0]
+
+    path, kwargs = template.build(catalog)
+
+    assert template.method == "POST"
+    assert path == "/collections/c1/a%2Fb%20c"
+    assert kwargs["name"] == "search"
+    assert kwargs["params"] == {"ids": "a/b c,x"}
+    assert json.loads(kwargs["data"]) == {"collections": ["c1"], "limit": 10}
+    assert scenario.think_time == (1.0, 2.0)
+    tasks = scenario.tasks()
+    assert len(tasks) == 3
+    assert tasks[0].__name__ == "search"
+    assert tasks[0].locust_tag_set == {"filter"}
+
+
+def test_example_scenario_builds_every_request(catalog):
+    """The bundled example compiles and every request builds."""
+    scenario = load_scenario(EXAMPLE)
+
+    for template in scenario.requests:
+        path, kwargs = template.build(catalog)
+        assert unquote(path).startswith("/")
+        assert kwargs["name"] == template.name
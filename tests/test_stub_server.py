@@ -0,0 +1,173 @@
+"""End-to-end tests against the stub STAC API, served on an ephemeral port."""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = [sys.executable, "-c", "from stac_api_load_testing.cli import main; main()"]
+
+
+def free_port() -> int:
+    """Return a port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cli_env() -> dict:
+    """
+    Return the environment of CLI subprocesses.
+
+    The package is importable from the checkout, and the `locust` command the CLI runs is
+    the one installed with this interpreter.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env["PATH"] = os.pathsep.join([os.path.dirname(sys.executable), env["PATH"]])
+    return env
+
+
+def run_cli(*args, **kwargs) -> subprocess.CompletedProcess:
+    """Run the CLI in a subprocess."""
+    return subprocess.run(CLI + list(args), env=cli_env(), **kwargs)
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    """Start the stub server with the sample items and return its URL."""
+    url = f"http://127.0.0.1:{free_port()}"
+    process = subprocess.Popen(
+        CLI + ["--stub-server", "--api-address", url],
+        env=cli_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                requests.get(f"{url}/", timeout=1)
+                break
+            except requests.ConnectionError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    pytest.fail("The stub server did not start")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_landing_page_links_to_the_request_host(stub_url):
+    """The landing page links are built from the request's host."""
+    body = requests.get(f"{stub_url}/").json()
+
+    assert body["type"] == "Catalog"
+    assert {link["href"] for link in body["links"]} >= {
+        f"{stub_url}/",
+        f"{stub_url}/search",
+    }
+
+
+def test_collections(stub_url):
+    """The sample collection is served."""
+    body = requests.get(f"{stub_url}/collections").json()
+
+    assert [c["id"] for c in body["collections"]] == ["test-collection"]
+    assert requests.get(f"{stub_url}/collections/nope").status_code == 404
+
+
+def test_get_search_pages_through_next_links(stub_url):
+    """GET searches page through every sample item with token links."""
+    url = f"{stub_url}/search?collections=test-collection&limit=30"
+    ids = []
+    while url:
+        body = requests.get(url).json()
+        ids += [feature["id"] for feature in body["features"]]
+        url = next(
+            (link["href"] for link in body["links"] if link["rel"] == "next"), None
+        )
+
+    assert len(ids) == len(set(ids)) == 100
+
+
+def test_post_search_by_bbox_and_intersects(stub_url):
+    """POST searches return the items intersecting a bbox or a point."""
+    item = requests.get(f"{stub_url}/search?limit=1").json()["features"][0]
+    minx, miny, maxx, maxy = item["bbox"]
+    point = [(minx + maxx) / 2, (miny + maxy) / 2]
+
+    by_bbox = requests.post(
+        f"{stub_url}/search", json={"bbox": item["bbox"], "limit": 100}
+    ).json()
+    by_point = requests.post(
+        f"{stub_url}/search",
+        json={"intersects": {"type": "Point", "coordinates": point}, "limit": 100},
+    ).json()
+    by_id = requests.post(f"{stub_url}/search", json={"ids": [item["id"]]}).json()
+
+    assert item["id"] in [feature["id"] for feature in by_bbox["features"]]
+    assert item["id"] in [feature["id"] for feature in by_point["features"]]
+    assert [feature["id"] for feature in by_id["features"]] == [item["id"]]
+
+
+def test_item_and_bulk_inserts(stub_url):
+    """Posted items are served, and existing ones are reported."""
+    template = requests.get(f"{stub_url}/search?limit=1").json()["features"][0]
+    items_url = f"{stub_url}/collections/test-collection/items"
+
+    created = requests.post(items_url, json=dict(template, id="e2e-single"))
+    duplicate = requests.post(items_url, json=dict(template, id="e2e-single"))
+    bulk = requests.post(
+        f"{stub_url}/collections/test-collection/bulk_items",
+        json={
+            "items": {
+                item_id: dict(template, id=item_id)
+                for item_id in ["e2e-single", "e2e-bulk-1", "e2e-bulk-2"]
+            },
+            "method": "insert",
+        },
+    )
+
+    assert (created.status_code, duplicate.status_code) == (201, 409)
+    assert bulk.status_code == 200
+    assert bulk.json() == "Successfully added 2 Items."
+    assert requests.get(f"{items_url}/e2e-bulk-2").json()["id"] == "e2e-bulk-2"
+
+
+def test_headless_locust_run(stub_url, tmp_path):
+    """A short headless run of the built-in tasks completes without failures."""
+    prefix = str(tmp_path / "results")
+    process = run_cli(
+        "--locust",
+        "--headless",
+        "--users",
+        "4",
+        "--spawn-rate",
+        "4",
+        "--run-time",
+        "4s",
+        "--workers",
+        "0",
+        "--results-prefix",
+        prefix,
+        "--api-address",
+        stub_url,
+        cwd=str(tmp_path),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=120,
+    )
+
+    assert process.returncode == 0, process.stderr.decode()[-2000:]
+    with open(f"{prefix}.json") as file:
+        aggregated = json.load(file)["endpoints"][-1]
+    assert aggregated["name"] == "Aggregated"
+    assert aggregated["num_requests"] > 0
+    assert aggregated["num_failures"] == 0
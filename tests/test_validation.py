@@ -0,0 +1,217 @@
+"""Tests of the sampled response validation."""
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from stac_api_load_testing.workload.validation import (
+    MAX_ERRORS,
+    bboxes_intersect,
+    geometry_bbox,
+    item_errors,
+    parse_datetime,
+    sort_errors,
+    validate,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_item(item_id, x=0.0, y=0.0, when="2020-06-01T00:00:00Z", **properties):
+    """Return a minimal valid item at a point."""
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": item_id,
+        "collection": "c1",
+        "geometry": {"type": "Point", "coordinates": [x, y]},
+        "bbox": [x, y, x, y],
+        "properties": dict(datetime=when, **properties),
+        "links": [],
+        "assets": {},
+    }
+
+
+def collection(*items):
+    """Return a page of search results."""
+    return {
+        "type": "FeatureCollection",
+        "features": list(items),
+        "numberReturned": len(items),
+    }
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2020-06-01T12:30:00Z", datetime(2020, 6, 1, 12, 30, tzinfo=timezone.utc)),
+        (
+            "2020-06-01t12:30:00.123456789z",
+            datetime(2020, 6, 1, 12, 30, 0, 123456, tzinfo=timezone.utc),
+        ),
+        (
+            "2020-06-01 12:30:00.5+02:00",
+            datetime(2020, 6, 1, 12, 30, 0, 500000, timezone(timedelta(hours=2))),
+        ),
+        ("2020-06-01T12:30:00", datetime(2020, 6, 1, 12, 30)),
+        ("2020-06-01", datetime(2020, 6, 1)),
+        ("..", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_datetime(text, expected):
+    """Any RFC 3339 datetime parses, open ends are None."""
+    assert parse_datetime(text) == expected
+
+
+def test_parse_datetime_rejects_other_text():
+    """Text that is not a datetime is an error."""
+    with pytest.raises(ValueError):
+        parse_datetime("yesterday")
+
+
+def test_geometry_bbox():
+    """The bbox covers every coordinate, including nested geometries."""
+    polygon = {"type": "Polygon", "coordinates": [[[0, 0], [2, 1], [1, 3], [0, 0]]]}
+    assert geometry_bbox(polygon) == [0, 0, 2, 3]
+    assert geometry_bbox(
+        {
+            "type": "GeometryCollection",
+            "geometries": [polygon, {"type": "Point", "coordinates": [-5, 10]}],
+        }
+    ) == [-5, 0, 2, 10]
+    assert geometry_bbox({"type": "Polygon", "coordinates": []}) is None
+
+
+def test_bboxes_intersect():
+    """Touching bboxes intersect and antimeridian-crossing ones are not checked."""
+    assert bboxes_intersect([0, 0, 1, 1], [1, 1, 2, 2])
+    assert not bboxes_intersect([0, 0, 1, 1], [1.1, 0, 2, 1])
+    assert bboxes_intersect([170, 0, -170, 10], [0, 0, 1, 1])
+
+
+def test_item_errors():
+    """Items miss no required field and have the right types."""
+    assert item_errors(make_item("a")) == []
+    assert item_errors([]) == ["item is not an object"]
+    item = make_item("a")
+    del item["links"], item["assets"]
+    assert item_errors(item) == ["item a misses links, assets"]
+    item = dict(make_item("a"), type="Collection", properties={}, links={})
+    assert item_errors(item) == [
+        "item a has type Collection, expected Feature",
+        "item a has no datetime property",
+        "item a links or assets have the wrong type",
+    ]
+
+
+def test_sort_errors():
+    """Features are checked on the first sort field where they differ."""
+    features = [
+        make_item("a", when="2020-01-03T00:00:00Z", rank=1),
+        make_item("b", when="2020-01-03T00:00:00Z", rank=2),
+        make_item("c", when="2020-01-02T00:00:00Z", rank=1),
+        make_item("d", when="2020-01-04T00:00:00Z"),
+    ]
+    sortby = [("properties.datetime", False), ("properties.rank", True)]
+
+    assert sort_errors(features, sortby) == [
+        "d is out of descending properties.datetime order after c"
+    ]
+    assert sort_errors(features[:3], [("properties.rank", False)]) == [
+        "b is out of descending properties.rank order after a"
+    ]
+    assert sort_errors(features, [("properties.missing", True)]) == []
+
+
+def test_validate_a_matching_page():
+    """Items of the requested collections, area and interval, in order, are valid."""
+    page = collection(
+        make_item("a", 1, 1, "2020-06-03T00:00:00Z"),
+        make_item("b", 2, 2, "2020-06-02T00:00:00Z"),
+    )
+
+    assert (
+        validate(
+            page,
+            {
+                "collections": ["c1"],
+                "ids": ["a", "b", "c"],
+                "bbox": [0, 0, 3, 3],
+                "datetime": "2020-06-01T00:00:00Z/..",
+                "sortby": [["properties.datetime", False]],
+                "limit": 2,
+                "min_count": 1,
+            },
+        )
+        == []
+    )
+
+
+def test_validate_reports_mismatches():
+    """Each check reports the items that do not match the request."""
+    page = collection(make_item("a", 10, 10, "2019-01-01T00:00:00Z"))
+    page["numberReturned"] = 5
+
+    assert validate(
+        page, {"point": [0, 0], "datetime": "2020-01-01T00:00:00Z/2020-12-31T00:00:00Z"}
+    ) == [
+        "numberReturned is 5 but 1 items were returned",
+        "item a [10, 10, 10, 10] is outside of [0, 0, 0, 0]",
+        "item a is outside of 2020-01-01T00:00:00Z/2020-12-31T00:00:00Z",
+    ]
+    assert validate(collection(), {"min_count": 1}) == [
+        "0 items returned, expected at least 1"
+    ]
+    assert validate(make_item("a"), {"ids": ["b"], "collections": ["c2"]}) == [
+        "item a is in collection c1",
+        "item a was not requested",
+    ]
+
+
+def test_validate_reports_a_few_errors_per_response():
+    """Only the first errors of a response are kept."""
+    page = collection(*[make_item(str(i)) for i in range(10)])
+
+    assert len(validate(page, {"limit": 5, "ids": ["x"]})) == MAX_ERRORS
+
+
+@pytest.mark.parametrize(
+    "document", [[], {"type": "Collection"}, {"type": "FeatureCollection"}]
+)
+def test_validate_rejects_other_documents(document):
+    """Responses must be an item or a collection of items."""
+    assert len(validate(document, {})) == 1
+
+
+def test_validator_process():
+    """The validator process answers each streamed response with its verdict."""
+    bodies = [
+        (json.dumps(collection(make_item("a"))).encode(), {"ids": ["a"]}),
+        (json.dumps(collection(make_item("a"))).encode(), {"ids": ["b"]}),
+        (b"{not json", {}),
+    ]
+    stream = b""
+    for body, expectation in bodies:
+        header = {"method": "GET", "name": "get-search", "expect": expectation}
+        header["size"] = len(body)
+        stream += json.dumps(header).encode() + b"\n" + body
+
+    process = subprocess.run(
+        [sys.executable, "-m", "stac_api_load_testing.workload.validation"],
+        input=stream,
+        stdout=subprocess.PIPE,
+        cwd=ROOT,
+        check=True,
+        timeout=60,
+    )
+
+    verdicts = [json.loads(line) for line in process.stdout.splitlines()]
+    assert [v["name"] for v in verdicts] == ["get-search"] * 3
+    assert verdicts[0]["errors"] == []
+    assert verdicts[1]["errors"] == ["item a was not requested"]
+    assert verdicts[2]["errors"][0].startswith("invalid JSON response")
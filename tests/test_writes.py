@@ -0,0 +1,174 @@
+"""Tests of the write workload."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from stac_api_load_testing.data_loader.data_loader import load_sample_items
+from stac_api_load_testing.data_loader.generator import ItemGenerator
+from stac_api_load_testing.workload.writes import (
+    READ_TASK_SCALE,
+    ItemIdAllocator,
+    ItemWriter,
+    WriteSettings,
+    parse_write_mix,
+)
+
+
+def read_a():
+    """A read task."""
+
+
+def read_b():
+    """Another read task."""
+
+
+def write():
+    """The write task."""
+
+
+def test_parse_write_mix():
+    """Missing operations get no weight."""
+    assert parse_write_mix("create=3, delete=1,") == {
+        "create": 3,
+        "update": 0,
+        "delete": 1,
+        "bulk": 0,
+    }
+
+
+@pytest.mark.parametrize("text", ["", "create=0", "upsert=1", "create=many"])
+def test_parse_write_mix_rejects_invalid_mixes(text):
+    """Unknown operations, bad weights and empty mixes are rejected."""
+    with pytest.raises(ValueError):
+        parse_write_mix(text)
+
+
+@pytest.mark.parametrize("ratio", [0.1, 0.25, 0.5, 0.9])
+def test_mix_tasks_runs_writes_at_the_ratio(ratio):
+    """The task list is reweighted so that writes make up `ratio` of the runs."""
+    tasks = WriteSettings(ratio=ratio).mix_tasks([read_a, read_b, read_b, write], write)
+
+    assert tasks.count(read_b) == 2 * tasks.count(read_a) == 2 * READ_TASK_SCALE
+    assert tasks.count(write) / len(tasks) == pytest.approx(ratio, abs=0.01)
+
+
+def test_mix_tasks_edge_ratios():
+    """Writes are dropped at 0 unless alone, and are the only tasks at 1."""
+    tasks = [read_a, write]
+
+    assert WriteSettings(ratio=0).mix_tasks(tasks, write) == [read_a]
+    assert WriteSettings(ratio=1).mix_tasks(tasks, write) == [write]
+    assert WriteSettings(ratio=0).mix_tasks([write], write) == [write]
+    assert WriteSettings(ratio=0.5).mix_tasks([read_a], write) == [read_a]
+
+
+def test_item_ids_are_unique_across_workers_and_runs():
+    """Allocators of other workers or runs never hand out the same id."""
+    allocators = [
+        ItemIdAllocator("run1", 0),
+        ItemIdAllocator("run1", 1),
+        ItemIdAllocator("run2", 0),
+    ]
+
+    ids = [
+        allocator.item_id(allocator.next_index())
+        for _ in range(100)
+        for allocator in allocators
+    ]
+
+    assert len(set(ids)) == len(ids)
+    assert ids[:3] == ["write-run1-0-0", "write-run1-1-0", "write-run2-0-0"]
+
+
+def test_run_id_is_shared_through_the_environment(monkeypatch):
+    """Workers of a run share the CLI's run id, processes without one get their own."""
+    monkeypatch.setenv("STAC_RUN_ID", "abc")
+    assert WriteSettings.from_env().run_id == "abc"
+
+    monkeypatch.delenv("STAC_RUN_ID")
+    assert WriteSettings.from_env().run_id
+
+
+class FakeClient:
+    """Record write requests and their JSON bodies, answering with `ok`."""
+
+    def __init__(self):
+        """Start without requests."""
+        self.requests = []
+        self.ok = True
+
+    def _send(self, method, url, name, data=None, headers=None):
+        """Record a request."""
+        self.requests.append((method, url, name, json.loads(data) if data else None))
+        return SimpleNamespace(ok=self.ok)
+
+    def post(self, url, **kwargs):
+        """Send a POST."""
+        return self._send("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        """Send a PUT."""
+        return self._send("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """Send a DELETE."""
+        return self._send("DELETE", url, **kwargs)
+
+
+@pytest.fixture
+def writer():
+    """Return the writer of a user with a recording client."""
+    user = SimpleNamespace(client=FakeClient())
+    return ItemWriter(
+        user,
+        WriteSettings(mix="create=1", batch_size=3, collection_id="c", run_id="r"),
+        ItemIdAllocator("r", 0),
+        ItemGenerator(list(load_sample_items()), seed=1),
+    )
+
+
+def test_created_items_are_updated_then_deleted_oldest_first(writer):
+    """Users only update and delete the items they created."""
+    writer.create()
+    writer.create()
+    writer.update()
+    writer.delete()
+    writer.delete()
+    writer.delete()  # Nothing left to delete, so an item is created
+
+    requests = [(method, url, name) for method, url, name, _ in writer.client.requests]
+    assert requests[:2] == [
+        ("POST", "/collections/c/items", "post-create-item"),
+        ("POST", "/collections/c/items", "post-create-item"),
+    ]
+    assert requests[2][0] == "PUT"
+    assert requests[2][1] in {
+        "/collections/c/items/write-r-0-0",
+        "/collections/c/items/write-r-0-1",
+    }
+    assert requests[3:] == [
+        ("DELETE", "/collections/c/items/write-r-0-0", "delete-item"),
+        ("DELETE", "/collections/c/items/write-r-0-1", "delete-item"),
+        ("POST", "/collections/c/items", "post-create-item"),
+    ]
+    created = writer.client.requests[0][3]
+    assert (created["id"], created["collection"]) == ("write-r-0-0", "c")
+    assert "updated" in writer.client.requests[2][3]["properties"]
+
+
+def test_bulk_inserts_fresh_items(writer):
+    """Bulk inserts post a batch of new ids and own them once accepted."""
+    writer.bulk()
+    writer.client.ok = False
+    writer.bulk()
+
+    _, url, name, body = writer.client.requests[0]
+    assert (url, name) == ("/collections/c/bulk_items", "post-bulk-items")
+    assert list(body["items"]) == ["write-r-0-0", "write-r-0-1", "write-r-0-2"]
+    assert list(writer.client.requests[1][3]["items"]) == [
+        "write-r-0-3",
+        "write-r-0-4",
+        "write-r-0-5",
+    ]
+    assert list(writer.owned) == [0, 1, 2]